@@ -0,0 +1,30 @@
+"""add keyset pagination indexes
+
+Revision ID: 5c2e8f1a9b47
+Revises: d714afe55bd8
+Create Date: 2026-10-18 15:02:11.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8f1a9b47'
+down_revision: Union[str, Sequence[str], None] = 'd714afe55bd8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_projects_created_at_id', 'projects', ['created_at', 'id'], unique=False)
+    op.create_index('ix_materials_created_at_id', 'materials', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_materials_created_at_id', table_name='materials')
+    op.drop_index('ix_projects_created_at_id', table_name='projects')
@@ -0,0 +1,38 @@
+"""unique project assignment per user
+
+Revision ID: a3d91c7e4f20
+Revises: 5c2e8f1a9b47
+Create Date: 2026-10-18 15:31:47.902164
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d91c7e4f20'
+down_revision: Union[str, Sequence[str], None] = '5c2e8f1a9b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Hapus assignment ganda (hasil race sebelum ada constraint), simpan id terkecil
+    op.execute(
+        "DELETE FROM project_assignments WHERE id NOT IN ("
+        "SELECT MIN(id) FROM project_assignments GROUP BY user_id, project_id)"
+    )
+    op.create_index(
+        'uq_project_assignments_user_id_project_id',
+        'project_assignments',
+        ['user_id', 'project_id'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_project_assignments_user_id_project_id', table_name='project_assignments')
@@ -0,0 +1,38 @@
+"""add change counters for http caching
+
+Revision ID: b6f0c4d2e918
+Revises: e81b6d2f0c93
+Create Date: 2026-10-18 16:12:05.331870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6f0c4d2e918'
+down_revision: Union[str, Sequence[str], None] = 'e81b6d2f0c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    change_counters = op.create_table(
+        'change_counters',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(
+        change_counters,
+        [{'name': name, 'version': 0} for name in ('projects', 'materials', 'project_assignments')],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('change_counters')
@@ -0,0 +1,46 @@
+"""add composite indexes for scoped list queries
+
+Revision ID: d8f3a61c2e57
+Revises: c5a7e2b9d130
+Create Date: 2026-10-18 20:05:37.902146
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8f3a61c2e57'
+down_revision: Union[str, Sequence[str], None] = 'c5a7e2b9d130'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQLite: keyset diurutkan lewat datetime(created_at), jadi butuh index ekspresi
+SQLITE_INDEXES = (
+    ('ix_projects_created_at_id_sqlite', 'projects', ()),
+    ('ix_projects_owner_id_created_at_id_sqlite', 'projects', ('owner_id',)),
+    ('ix_materials_created_at_id_sqlite', 'materials', ()),
+    ('ix_materials_project_id_created_at_id_sqlite', 'materials', ('project_id',)),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_projects_owner_id_created_at_id', 'projects', ['owner_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_materials_project_id_created_at_id', 'materials', ['project_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_project_assignments_project_id_user_id', 'project_assignments', ['project_id', 'user_id'], unique=False)
+    if op.get_bind().dialect.name == 'sqlite':
+        for name, table, prefix in SQLITE_INDEXES:
+            op.create_index(name, table, [*prefix, sa.text('datetime(created_at)'), 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        for name, table, _ in reversed(SQLITE_INDEXES):
+            op.drop_index(name, table_name=table)
+    op.drop_index('ix_project_assignments_project_id_user_id', table_name='project_assignments')
+    op.drop_index('ix_materials_project_id_created_at_id', table_name='materials')
+    op.drop_index('ix_projects_owner_id_created_at_id', table_name='projects')
@@ -0,0 +1,48 @@
+"""add trigram search indexes
+
+Revision ID: e81b6d2f0c93
+Revises: a3d91c7e4f20
+Create Date: 2026-10-18 16:05:29.117640
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e81b6d2f0c93'
+down_revision: Union[str, Sequence[str], None] = 'a3d91c7e4f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRGM_INDEXES = [
+    ('ix_projects_title_trgm', 'projects', 'title'),
+    ('ix_projects_description_trgm', 'projects', 'description'),
+    ('ix_materials_title_trgm', 'materials', 'title'),
+    ('ix_materials_content_trgm', 'materials', 'content'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Index trigram hanya tersedia di PostgreSQL; dialect lain dilewati
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRGM_INDEXES:
+        op.create_index(
+            name, table, [column],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for name, table, _ in reversed(TRGM_INDEXES):
+        op.drop_index(name, table_name=table)
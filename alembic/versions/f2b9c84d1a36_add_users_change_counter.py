@@ -0,0 +1,29 @@
+"""add users change counter for cached assignee data
+
+Revision ID: f2b9c84d1a36
+Revises: d8f3a61c2e57
+Create Date: 2026-10-18 21:14:52.604318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b9c84d1a36'
+down_revision: Union[str, Sequence[str], None] = 'd8f3a61c2e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    change_counters = sa.table('change_counters', sa.column('name', sa.String), sa.column('version', sa.Integer))
+    op.bulk_insert(change_counters, [{'name': 'users', 'version': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM change_counters WHERE name = 'users'")
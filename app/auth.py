@@ -1,21 +1,29 @@
-from datetime import datetime, timedelta
+import os
+from datetime import timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app import database, models
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from app import database, models, sessions, tokens, utils
+from app.cache import TTLCache
 
-SECRET_KEY = "supersecret"  # ganti dengan env var di production
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Konfigurasi JWT ada di app/tokens.py (keyring + cache claims)
+SECRET_KEY = tokens.SECRET_KEY
+ALGORITHM = tokens.ALGORITHM
+ACCESS_TOKEN_EXPIRE_MINUTES = tokens.ACCESS_TOKEN_EXPIRE_MINUTES
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Cache principal (user yang sudah login), key = claim "sub" (email)
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+
+pwd_context = utils.pwd_context
 
 # OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+
 # --- Password helper ---
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -25,34 +33,110 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 # --- JWT helper ---
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return tokens.create_access_token(data, expires_delta)
+
+# --- Principal cache helper ---
+def _snapshot_user(user: models.User) -> models.User:
+    # Salinan transient (tidak terikat session) supaya aman dipakai lintas request.
+    # hashed_password sengaja tidak ikut disimpan di cache.
+    return models.User(
+        id=user.id,
+        email=user.email,
+        full_name=user.full_name,
+        role=user.role,
+        created_at=user.created_at,
+    )
+
+def invalidate_principal(email: Optional[str] = None):
+    if email is None:
+        principal_cache.clear()
+    else:
+        principal_cache.pop(email)
+
+# Invalidasi dilakukan setelah commit supaya request lain tidak sempat
+# membaca ulang data lama lalu menyimpannya lagi ke cache.
+_PENDING_INVALIDATION = "pending_principal_invalidation"
+_ALL_PRINCIPALS = object()
+
+def _mark_pending(session: Optional[Session], *keys):
+    if session is None:
+        for key in keys:
+            invalidate_principal(None if key is _ALL_PRINCIPALS else key)
+        return
+    session.info.setdefault(_PENDING_INVALIDATION, set()).update(keys)
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _user_changed(mapper, connection, target):
+    # email lama juga di-invalidate kalau email ikut berubah
+    emails = {target.email, *inspect(target).attrs.email.history.deleted}
+    _mark_pending(object_session(target), *emails)
+
+@event.listens_for(Session, "do_orm_execute")
+def _bulk_user_changed(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if any(m.class_ is models.User for m in orm_execute_state.all_mappers):
+        _mark_pending(orm_execute_state.session, _ALL_PRINCIPALS)
+
+@event.listens_for(Session, "after_commit")
+def _flush_principal_invalidation(session):
+    pending = session.info.pop(_PENDING_INVALIDATION, None)
+    if not pending:
+        return
+    if _ALL_PRINCIPALS in pending:
+        invalidate_principal()
+        return
+    for email in pending:
+        invalidate_principal(email)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_principal_invalidation(session):
+    session.info.pop(_PENDING_INVALIDATION, None)
 
 # --- Dependency: get current user ---
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    db: Session = database.SessionLocal()
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise HTTPException(status_code=401, detail="Invalid credentials")
-        user = db.query(models.User).filter(models.User.email == email).first()
-        if user is None:
-            raise HTTPException(status_code=401, detail="Invalid credentials")
+def get_user_by_email(db: Session, email: str):
+    return db.query(models.User).filter(models.User.email == email).first()
+
+async def _load_principal(claims: dict, db: Session) -> models.User:
+    email: str = claims["sub"]
+    user = principal_cache.get(email)
+    if user is not None:
         return user
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Could not validate credentials")
-    finally:
-        db.close()
+
+    user = await database.run_sync(db, get_user_by_email, email)
+    if user is None:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    principal = _snapshot_user(user)
+    principal_cache.set(email, principal)
+    return principal
+
+async def verify_token(token: str, db: Optional[Session] = None) -> dict:
+    # Claims token + cek sesi (claim "sid") belum di-logout/revoke; db request
+    # dipakai ulang untuk cek revoke supaya tidak membuka session DB kedua
+    claims = tokens.verify(token)
+    sid = claims.get("sid")
+    if sid is not None and await sessions.is_revoked(sid, db):
+        raise HTTPException(status_code=401, detail="Session revoked")
+    return claims
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
+    return await _load_principal(await verify_token(token, db), db)
 
 def require_roles(*roles):
-    def wrapper(current_user: models.User = Depends(get_current_user)):
+    async def wrapper(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
+        claims = await verify_token(token, db)
+        # Principal di cache (selalu terbaru) > claim token (kalau policy mengizinkan) > DB
+        current_user = principal_cache.get(claims["sub"])
+        if current_user is None and tokens.AUTH_TRUST_TOKEN_ROLE:
+            current_user = tokens.principal_from_claims(claims)
+        if current_user is None:
+            current_user = await _load_principal(claims, db)
         if current_user.role not in roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Forbidden"   # BUKAN "Forbidden"
             )
         return current_user
-    return wrapper
\ No newline at end of file
+    return wrapper
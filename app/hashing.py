@@ -0,0 +1,88 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi import HTTPException, status
+from app import utils
+
+# Worker pool khusus bcrypt supaya hashing tidak memakan threadpool request
+HASH_POOL_KIND = os.getenv("HASH_POOL_KIND", "process")  # process / thread
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Maksimal job yang sedang jalan + antre; lebih dari ini langsung 429
+HASH_POOL_MAX_QUEUE = int(os.getenv("HASH_POOL_MAX_QUEUE", "64"))
+HASH_POOL_RETRY_AFTER = os.getenv("HASH_POOL_RETRY_AFTER", "1")
+
+
+class HashingPool:
+    def __init__(self, workers: int, max_queue: int, kind: str = "process"):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.kind = kind
+        self.pending = 0
+        self.rejected = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "thread":
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers, thread_name_prefix="bcrypt"
+                        )
+                    else:
+                        # spawn: worker hanya import passlib, tidak mewarisi thread/lock parent
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.workers,
+                            mp_context=multiprocessing.get_context("spawn"),
+                        )
+        return self._executor
+
+    def _acquire(self):
+        with self._lock:
+            if self.pending >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many authentication requests",
+                    headers={"Retry-After": HASH_POOL_RETRY_AFTER},
+                )
+            self.pending += 1
+
+    def _release(self):
+        with self._lock:
+            self.pending -= 1
+
+    async def run(self, fn, *args):
+        self._acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._release()
+
+    async def hash(self, password: str) -> str:
+        return await self.run(utils.hash_password, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str):
+        return await self.run(utils.verify_and_update, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+pool = HashingPool(HASH_POOL_WORKERS, HASH_POOL_MAX_QUEUE, HASH_POOL_KIND)
@@ -0,0 +1,103 @@
+import hashlib
+import os
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+from app import database, models, versioning
+
+# Conditional GET untuk list/detail endpoint. ETag dihitung dari versi tabel
+# (change_counters) + user + path + query string, jadi 304 bisa dijawab hanya
+# dengan satu query kecil tanpa menjalankan query list maupun serialisasi body.
+# If-None-Match: * dan If-Modified-Since tidak terikat ke URL/user, jadi baru
+# dijawab 304 setelah resource terbukti ada & terlihat (lihat response_cache.serve).
+
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Tabel yang mempengaruhi hasil tiap resource (termasuk scoping & include=;
+# users untuk email/nama di include=assignees)
+RESOURCE_TABLES = {
+    "projects": ("projects", "materials", "project_assignments", "users"),
+    "materials": ("materials", "project_assignments"),
+}
+
+# Mahasiswa hanya membaca, data boleh dipakai ulang sebentar tanpa revalidasi;
+# admin/dosen selalu revalidasi supaya perubahan sendiri langsung terlihat.
+CACHE_CONTROL = {
+    "mahasiswa": f"private, max-age={int(os.getenv('HTTP_CACHE_MAX_AGE_MAHASISWA', '30'))}",
+    "dosen": "private, no-cache",
+    "admin": "private, no-cache",
+}
+DEFAULT_CACHE_CONTROL = "private, no-cache"
+
+
+def compute_etag(resource: str, versions: dict, current_user: models.User, path: str, query: str) -> str:
+    parts = [resource, path, str(current_user.id), current_user.role or "", query]
+    # updated_at ikut (sama seperti response_cache.cache_key): counter yang di-reset
+    # lalu naik lagi ke angka yang sama tidak boleh memvalidasi ETag lama
+    parts += ["{}:{}@{}".format(name, *versions.get(name, (0, None))) for name in RESOURCE_TABLES[resource]]
+    return '"' + hashlib.sha1("|".join(parts).encode()).hexdigest() + '"'
+
+
+def _etag_matches(if_none_match: str, etag: str, visible: bool) -> bool:
+    # Perbandingan lemah (RFC 9110): prefix W/ diabaikan
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if (candidate == "*" and visible) or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _not_modified_since(if_modified_since: str, last_modified) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return last_modified is not None and last_modified.replace(microsecond=0) <= since
+
+
+def _read_versions(db: Session, resource: str) -> dict:
+    return versioning.get_versions(db, RESOURCE_TABLES[resource])
+
+
+async def load_versions(db: Session, resource: str) -> dict:
+    return await database.run_sync(db, _read_versions, resource)
+
+
+def check_not_modified(
+    request: Request,
+    response: Response,
+    current_user: models.User,
+    resource: str,
+    versions: dict,
+    visible: bool = False,
+) -> Optional[Response]:
+    # Return Response 304 kalau data client masih sama; kalau tidak, header
+    # cache di-set ke `response` dan handler lanjut membangun body.
+    # visible=False: resource belum tentu ada/terlihat → hanya ETag spesifik yang dicocokkan.
+    if not HTTP_CACHE_ENABLED:
+        return None
+
+    etag = compute_etag(resource, versions, current_user, request.url.path, request.url.query)
+    last_modified = versioning.last_modified(versions)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": CACHE_CONTROL.get(current_user.role, DEFAULT_CACHE_CONTROL),
+        "Vary": "Authorization",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag, visible)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        not_modified = (
+            visible and if_modified_since is not None and _not_modified_since(if_modified_since, last_modified)
+        )
+
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -1,6 +1,12 @@
+import atexit
+import copy
+import itertools
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
+import queue
+from collections import defaultdict
 
 # Buat folder logs jika belum ada
 os.makedirs("logs", exist_ok=True)
@@ -8,14 +14,103 @@ os.makedirs("logs", exist_ok=True)
 # Ambil level log dari ENV (default: INFO)
 log_level = os.getenv("LOG_LEVEL", "INFO").upper()
 
+# text / json
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+# Kapasitas antrian log; kalau penuh berlaku LOG_OVERFLOW
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# drop = buang record baru, sample = simpan 1 dari LOG_OVERFLOW_SAMPLE, block = tunggu
+LOG_OVERFLOW = os.getenv("LOG_OVERFLOW", "drop").lower()
+LOG_OVERFLOW_SAMPLE = int(os.getenv("LOG_OVERFLOW_SAMPLE", "10"))
+# Sampling log INFO/DEBUG per modul, mis. "auth:100,projects:10" = simpan 1 dari N
+LOG_SAMPLING = os.getenv("LOG_SAMPLING", "")
+
+# Atribut bawaan LogRecord; sisanya dianggap field "extra" untuk output JSON
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    # Per (modul, baris kode) hanya 1 dari N record INFO/DEBUG yang lolos;
+    # WARNING ke atas selalu lolos.
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = rates
+        self._counters = defaultdict(itertools.count)
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        every = self.rates.get(record.module)
+        if not every or every <= 1:
+            return True
+        return next(self._counters[(record.module, record.lineno)]) % every == 0
+
+
+def parse_sampling(spec: str) -> dict:
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        module, _, every = item.partition(":")
+        rates[module.strip()] = int(every or 1)
+    return rates
+
+
+class BoundedQueueHandler(QueueHandler):
+    def __init__(self, log_queue, overflow: str = "drop", sample_every: int = 10):
+        super().__init__(log_queue)
+        self.overflow = overflow
+        self.sample_every = max(sample_every, 1)
+        self.dropped = 0
+        self._overflow_counter = itertools.count()
+
+    def prepare(self, record):
+        # Di thread pemanggil hanya render pesan (%-args); timestamp, JSON dan
+        # traceback diformat oleh thread listener.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        if self.overflow == "block" or (
+            self.overflow == "sample" and next(self._overflow_counter) % self.sample_every == 0
+        ):
+            self.queue.put(record)
+            return
+        self.dropped += 1
+
+
+def _build_formatter():
+    if LOG_FORMAT == "json":
+        return JsonFormatter()
+    # Format log
+    return logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+
+
 # Setup logger utama
 logger = logging.getLogger("pjblms_logger")
 logger.setLevel(getattr(logging, log_level, logging.INFO))
 
-# Format log
-formatter = logging.Formatter(
-    "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
-)
+formatter = _build_formatter()
 
 # --- File handler dengan rotasi ---
 file_handler = RotatingFileHandler("logs/app.log", maxBytes=5*1024*1024, backupCount=5)
@@ -25,9 +120,19 @@ file_handler.setFormatter(formatter)
 console_handler = logging.StreamHandler()
 console_handler.setFormatter(formatter)
 
+# --- Antrian: request thread / event loop hanya enqueue, I/O di thread listener ---
+log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+queue_handler = BoundedQueueHandler(log_queue, LOG_OVERFLOW, LOG_OVERFLOW_SAMPLE)
+sampling = parse_sampling(LOG_SAMPLING)
+if sampling:
+    queue_handler.addFilter(SamplingFilter(sampling))
+
+listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+listener.start()
+atexit.register(listener.stop)
+
 # Tambahkan handler ke logger
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
+logger.addHandler(queue_handler)
 
 # Supaya tidak double log
-logger.propagate = False
\ No newline at end of file
+logger.propagate = False
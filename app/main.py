@@ -1,8 +1,13 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
-from app import models, database
-from app.routes import users, auth, projects, materials
+from app import models, database, hashing, sessions
+from app.routes import users, auth, projects, materials, search, export, metrics
+from app.middleware.compression import CompressionMiddleware
 from app.middleware.log_requests import LoggingMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.query_audit import QueryAuditMiddleware
 from app.middleware.error_handler import http_exception_handler, validation_exception_handler, generic_exception_handler
 from starlette.exceptions import HTTPException as HTTPException
 from fastapi.exceptions import RequestValidationError
@@ -10,10 +15,27 @@ from fastapi.exceptions import RequestValidationError
 # Inisialisasi database
 models.Base.metadata.create_all(bind=database.engine)
 
-app = FastAPI(title="PJBLMS Backend")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Hapus sesi refresh token yang sudah kedaluwarsa secara berkala
+    sweeper = asyncio.create_task(sessions.sweep_forever())
+    yield
+    sweeper.cancel()
+    # Matikan worker pool bcrypt saat server berhenti
+    hashing.pool.shutdown()
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
 
+app = FastAPI(title="PJBLMS Backend", lifespan=lifespan)
+
+# Kompresi gzip/brotli (paling dalam: metrics/log melihat ukuran yang dikirim)
+app.add_middleware(CompressionMiddleware)
 # Tambahkan middleware logging
 app.add_middleware(LoggingMiddleware)
+# Metrics (latency per route, status, query DB per request) → GET /metrics
+app.add_middleware(MetricsMiddleware)
+# Audit query per request (QUERY_AUDIT=true, untuk dev)
+app.add_middleware(QueryAuditMiddleware)
 
 # Registrasi global exception handler
 app.add_exception_handler(HTTPException, http_exception_handler)
@@ -25,6 +47,9 @@ app.include_router(users.router)
 app.include_router(auth.router) 
 app.include_router(projects.router)
 app.include_router(materials.router)
+app.include_router(search.router)
+app.include_router(export.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 def read_root():
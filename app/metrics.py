@@ -0,0 +1,246 @@
+import bisect
+import os
+import threading
+import time
+from contextvars import ContextVar
+from sqlalchemy import event
+from app import database
+
+# Metrics format teks Prometheus tanpa dependency prometheus_client.
+# Semua update cukup increment di bawah lock; render hanya saat /metrics di-scrape.
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # [count per bucket (non-kumulatif) ..., +Inf], sum
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def count(self, *labels):
+        state = self._values.get(labels)
+        return sum(state[0]) if state else 0
+
+    def render(self):
+        with self._lock:
+            items = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._values.items())
+        lines = self.header()
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = _labels(self.labelnames, labels, extra=[("le", _number(float(bound)))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        # fungsi tanpa argumen → list (nama, tipe, help, nilai); dipanggil saat scrape
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        self.collectors.append(collector)
+        return collector
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for collector in self.collectors:
+            for name, kind, documentation, value in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# --- HTTP ---
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "Total HTTP request per route template dan status.", ("method", "route", "status")
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "Latency HTTP request per route template.", ("method", "route")
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "Jumlah request yang sedang diproses.", ("method",)
+))
+
+# --- Database (per request) ---
+db_queries_total = registry.register(Counter(
+    "db_queries_total", "Total query SQL yang dijalankan per route template.", ("route",)
+))
+db_query_duration_seconds = registry.register(Histogram(
+    "db_query_duration_seconds", "Total waktu query SQL per request.", ("route",)
+))
+db_queries_per_request = registry.register(Histogram(
+    "db_queries_per_request", "Jumlah query SQL per request.", ("route",), buckets=QUERY_COUNT_BUCKETS
+))
+
+
+# --- Statistik query per request ---
+# Diisi middleware metrics; event engine menambah counter di objek yang sama.
+# ContextVar ikut ter-copy ke threadpool (run_in_threadpool) dan greenlet AsyncSession.
+class RequestDBStats:
+    __slots__ = ("queries", "duration")
+
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+
+
+current_db_stats: ContextVar = ContextVar("current_db_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_db_stats.get() is not None:
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_db_stats.get()
+    starts = conn.info.get("metrics_query_start")
+    if stats is None or not starts:
+        return
+    stats.queries += 1
+    stats.duration += time.perf_counter() - starts.pop()
+
+
+def instrument_engine(engine):
+    # AsyncEngine: event dipasang di sync_engine di baliknya
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+if METRICS_ENABLED:
+    instrument_engine(database.engine)
+    if database.async_engine is not None:
+        instrument_engine(database.async_engine)
+
+
+# --- Collector: pool DB, cache principal, pool bcrypt, antrian log ---
+def _collect_runtime():
+    # Import lokal supaya app.metrics bisa di-import tanpa memicu setup auth/logger
+    from app import auth, hashing, ratelimit, response_cache, tokens
+    from app.logger import queue_handler
+
+    pool = database.pool_stats()
+    cache = auth.principal_cache.stats()
+    token_cache = tokens.claims_cache.stats()
+    limiter = ratelimit.stats.snapshot()
+    hashing_stats = hashing.pool.stats()
+    response_stats = response_cache.stats.snapshot()
+    samples = [
+        ("db_pool_acquisitions_total", "counter", "Total checkout koneksi dari pool.", pool["acquisitions"]),
+        ("db_pool_timeouts_total", "counter", "Total timeout menunggu koneksi pool.", pool["timeouts"]),
+        ("db_pool_wait_seconds_total", "counter", "Total waktu menunggu koneksi pool.", pool["wait_time_total_ms"] / 1000),
+        ("principal_cache_hits_total", "counter", "Cache hit principal (get_current_user).", cache["hits"]),
+        ("principal_cache_misses_total", "counter", "Cache miss principal.", cache["misses"]),
+        ("principal_cache_size", "gauge", "Jumlah principal di cache.", cache["size"]),
+        ("token_cache_hits_total", "counter", "Token JWT yang claims-nya diambil dari cache.", token_cache["hits"]),
+        ("token_cache_misses_total", "counter", "Token JWT yang di-decode dan diverifikasi ulang.", token_cache["misses"]),
+        ("response_cache_hits_total", "counter", "Response list/detail yang dilayani dari cache.", response_stats["hits"]),
+        ("response_cache_misses_total", "counter", "Response list/detail yang dihitung ulang.", response_stats["misses"]),
+        ("login_rate_limited_ip_total", "counter", "Login ditolak karena batas per IP.", limiter["rejected_ip"]),
+        ("login_rate_limited_account_total", "counter", "Login ditolak karena terlalu banyak gagal per akun.", limiter["rejected_account"]),
+        ("hashing_pool_pending", "gauge", "Job bcrypt yang sedang jalan atau antre.", hashing_stats["pending"]),
+        ("hashing_pool_rejected_total", "counter", "Job bcrypt yang ditolak (429).", hashing_stats["rejected"]),
+        ("log_records_dropped_total", "counter", "Record log yang dibuang karena antrian penuh.", queue_handler.dropped),
+    ]
+    if "checked_out" in pool:
+        samples.append(("db_pool_checked_out", "gauge", "Koneksi pool yang sedang dipakai.", pool["checked_out"]))
+        samples.append(("db_pool_overflow", "gauge", "Koneksi overflow yang sedang terbuka.", pool["overflow"]))
+    return samples
+
+
+registry.add_collector(_collect_runtime)
+
+
+def render() -> str:
+    return registry.render()
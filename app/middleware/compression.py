@@ -0,0 +1,94 @@
+from starlette.datastructures import Headers, MutableHeaders
+from app import compression
+
+# Middleware ASGI murni untuk kompresi gzip/brotli sesuai Accept-Encoding.
+# - Body < COMPRESSION_MIN_SIZE dikirim apa adanya.
+# - Response yang sudah punya Content-Encoding (mis. dari response cache yang
+#   menyimpan varian terkompresi) diteruskan tanpa diproses ulang.
+# - Response streaming dikompres per chunk; chunk awal ditahan sampai ukuran
+#   minimum tercapai supaya stream kecil tidak ikut dikompres.
+
+
+class CompressionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not compression.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        encoding = compression.negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSender(send, encoding))
+
+
+class _CompressingSender:
+    def __init__(self, send, encoding: str):
+        self.send = send
+        self.encoding = encoding
+        self.start = None
+        self.passthrough = False
+        self.buffer = []
+        self.buffered = 0
+        self.compressor = None
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message.get("headers", []))
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] < 200
+                or message["status"] in (204, 304)
+                or not compression.is_compressible(headers.get("content-type", ""))
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                self.start = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is not None:
+            payload = self.compressor.compress(body)
+            if not more_body:
+                payload += self.compressor.finish()
+            if payload or not more_body:
+                await self.send({"type": "http.response.body", "body": payload, "more_body": more_body})
+            return
+
+        self.buffer.append(body)
+        self.buffered += len(body)
+        if more_body and self.buffered < compression.COMPRESSION_MIN_SIZE:
+            return  # tunggu chunk berikutnya
+
+        data = b"".join(self.buffer)
+        self.buffer = []
+        if self.buffered < compression.COMPRESSION_MIN_SIZE:
+            # stream selesai tapi masih kecil: kirim tanpa kompresi
+            await self.send(self.start)
+            await self.send({"type": "http.response.body", "body": data, "more_body": False})
+            return
+
+        headers = MutableHeaders(raw=self.start["headers"])
+        compression.mark_encoded(headers, self.encoding)
+        if not more_body:
+            payload = compression.compress(data, self.encoding)
+            headers["Content-Length"] = str(len(payload))
+            await self.send(self.start)
+            await self.send({"type": "http.response.body", "body": payload, "more_body": False})
+            return
+
+        # streaming: panjang akhir tidak diketahui
+        if "content-length" in headers:
+            del headers["Content-Length"]
+        self.compressor = compression.StreamCompressor(self.encoding)
+        await self.send(self.start)
+        await self.send({"type": "http.response.body", "body": self.compressor.compress(data), "more_body": True})
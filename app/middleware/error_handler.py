@@ -5,21 +5,22 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 from app.logger import logger
 
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
-    logger.error(f"HTTP error {exc.status_code}: {exc.detail}")
+    logger.error("HTTP error %s: %s", exc.status_code, exc.detail)
     return JSONResponse(
         status_code=exc.status_code,
-        content={"success": False, "error": exc.detail, "code": exc.status_code}
+        content={"success": False, "error": exc.detail, "code": exc.status_code},
+        headers=getattr(exc, "headers", None)
     )
 
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    logger.error(f"Validation error: {exc.errors()}")
+    logger.error("Validation error: %s", exc.errors())
     return JSONResponse(
         status_code=422,
         content={"success": False, "error": exc.errors(), "code": 422}
     )
 
 async def generic_exception_handler(request: Request, exc: Exception):
-    logger.exception(f"Unhandled exception: {str(exc)}")
+    logger.exception("Unhandled exception: %s", exc)
     return JSONResponse(
         status_code=500,
         content={"success": False, "error": "Internal Server Error", "code": 500}
@@ -1,26 +1,79 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import Request
-from app.logger import logger
+import itertools
+import logging
+import os
 import time
-import uuid
+from app.logger import logger
+
+# Middleware ASGI murni (tanpa BaseHTTPMiddleware): tidak membungkus request/response
+# dalam task & stream tambahan, jadi aman untuk StreamingResponse.
+
+REQUEST_ID_HEADER = b"x-request-id"
+MAX_REQUEST_ID_LENGTH = 128
+
+# Request ID murah: prefix acak per proses + counter (tanpa uuid4 per request)
+_id_prefix = os.urandom(4).hex()
+_id_counter = itertools.count(1)
+
+
+def new_request_id() -> str:
+    return f"{_id_prefix}-{next(_id_counter):x}"
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        request_id = str(uuid.uuid4())
-        start_time = time.time()
+
+def _incoming_request_id(headers):
+    for name, value in headers:
+        if name == REQUEST_ID_HEADER:
+            request_id = value.decode("latin-1")
+            if 0 < len(request_id) <= MAX_REQUEST_ID_LENGTH and request_id.isprintable():
+                return request_id
+            return None
+    return None
+
+
+class LoggingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _incoming_request_id(scope["headers"]) or new_request_id()
+        # bisa dibaca handler lewat request.state.request_id
+        scope.setdefault("state", {})["request_id"] = request_id
+        raw_request_id = request_id.encode("latin-1")
+        start = time.perf_counter_ns()
+        status_code = 500
+
+        async def send_with_request_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", ()), (REQUEST_ID_HEADER, raw_request_id)]
+            await send(message)
 
         try:
-            response = await call_next(request)
-            process_time = (time.time() - start_time) * 1000
-            logger.info(
-                f"[{request_id}] {request.method} {request.url.path} | "
-                f"Status: {response.status_code} | "
-                f"Time: {process_time:.2f}ms"
-            )
-
-            return response
-            
-        except Exception as e:
-            logger.exception(
-                f"[{request_id}] Exception handling {request.method} {request.url.path}: {str(e)}"
-            )
\ No newline at end of file
+            await self.app(scope, receive, send_with_request_id)
+        except Exception:
+            # Traceback dicatat oleh generic_exception_handler; di sini cukup access log-nya
+            self._log(logging.ERROR, request_id, scope, status_code, start)
+            raise
+        self._log(logging.INFO, request_id, scope, status_code, start)
+
+    @staticmethod
+    def _log(level, request_id, scope, status_code, start):
+        if not logger.isEnabledFor(level):
+            return
+        duration_ms = (time.perf_counter_ns() - start) / 1_000_000
+        logger.log(
+            level,
+            "[%s] %s %s | Status: %d | Time: %.2fms",
+            request_id, scope["method"], scope["path"], status_code, duration_ms,
+            extra={
+                "request_id": request_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": duration_ms,
+            },
+        )
@@ -0,0 +1,45 @@
+import time
+from app import metrics
+
+# Middleware ASGI murni untuk metrics. Label route memakai template path
+# (mis. /projects/{project_id}) dari scope["route"] yang diisi router Starlette,
+# jadi jumlah label tetap terbatas. Request yang tidak cocok route → "unmatched".
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not metrics.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        db_stats = metrics.RequestDBStats()
+        token = metrics.current_db_stats.set(db_stats)
+        metrics.http_requests_in_flight.inc(method)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            metrics.current_db_stats.reset(token)
+            metrics.http_requests_in_flight.dec(method)
+            route = scope.get("route")
+            route = getattr(route, "path", None) or UNMATCHED_ROUTE
+            metrics.http_requests_total.inc(method, route, str(status_code))
+            metrics.http_request_duration_seconds.observe(method, route, value=duration)
+            metrics.db_queries_total.inc(route, amount=db_stats.queries)
+            metrics.db_queries_per_request.observe(route, value=db_stats.queries)
+            metrics.db_query_duration_seconds.observe(route, value=db_stats.duration)
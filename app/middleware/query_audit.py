@@ -0,0 +1,50 @@
+from app import query_audit
+from app.logger import logger
+
+# Middleware ASGI murni, hanya aktif kalau QUERY_AUDIT=true (mode dev).
+# Header ditambahkan saat http.response.start: X-Query-Count selalu,
+# X-Query-Warning kalau budget route terlampaui atau ada statement berulang.
+
+MAX_WARNING_LENGTH = 512
+
+
+def _warning(audit, budget):
+    problems = []
+    if budget and audit.count > budget:
+        problems.append(f"budget exceeded ({audit.count} > {budget})")
+    for shape, count in audit.repeated().items():
+        problems.append(f"repeated x{count}: {shape}")
+    return "; ".join(problems)
+
+
+class QueryAuditMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not query_audit.QUERY_AUDIT:
+            await self.app(scope, receive, send)
+            return
+
+        audit = query_audit.QueryAudit()
+        token = query_audit.current_audit.set(audit)
+
+        async def send_with_audit(message):
+            if message["type"] == "http.response.start":
+                route = getattr(scope.get("route"), "path", scope["path"])
+                budget = query_audit.budget_for(scope["method"], route)
+                headers = [*message.get("headers", ()), (b"x-query-count", str(audit.count).encode())]
+                warning = _warning(audit, budget)
+                if warning:
+                    logger.warning(
+                        "Query audit %s %s: %s\n%s", scope["method"], route, warning, audit.report()
+                    )
+                    value = warning[:MAX_WARNING_LENGTH].encode("latin-1", errors="replace")
+                    headers.append((b"x-query-warning", value))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_audit)
+        finally:
+            query_audit.current_audit.reset(token)
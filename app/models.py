@@ -1,8 +1,21 @@
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Integer, String, DateTime, func, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, func, Text, ForeignKey, Index, DDL, event
 from sqlalchemy.orm import relationship
 from app.database import Base
 
+def _sqlite_keyset_index(name, *columns):
+    # SQLite mengurutkan keyset lewat datetime(created_at) (lihat pagination._normalize),
+    # jadi index biasa (created_at, id) tidak terpakai di sana; buat versi ekspresi.
+    return Index(name, *columns).ddl_if(dialect="sqlite")
+
+def _trgm_index(name, column):
+    # Index GIN trigram untuk pencarian ILIKE '%kw%'; hanya dibuat di PostgreSQL
+    return Index(
+        name, column,
+        postgresql_using="gin",
+        postgresql_ops={column: "gin_trgm_ops"},
+    ).ddl_if(dialect="postgresql")
+
 class User(Base):
     __tablename__ = "users"
 
@@ -19,6 +32,14 @@ class User(Base):
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        # untuk keyset pagination (created_at, id)
+        Index("ix_projects_created_at_id", "created_at", "id"),
+        # list project dosen: WHERE owner_id = ? ORDER BY created_at, id
+        Index("ix_projects_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        _trgm_index("ix_projects_title_trgm", "title"),
+        _trgm_index("ix_projects_description_trgm", "description"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -37,6 +58,13 @@ class Project(Base):
 
 class Material(Base):
     __tablename__ = "materials"
+    __table_args__ = (
+        Index("ix_materials_created_at_id", "created_at", "id"),
+        # list material per project, include=materials (selectin), EXISTS scope mahasiswa
+        Index("ix_materials_project_id_created_at_id", "project_id", "created_at", "id"),
+        _trgm_index("ix_materials_title_trgm", "title"),
+        _trgm_index("ix_materials_content_trgm", "content"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"))
@@ -46,9 +74,25 @@ class Material(Base):
 
     project = relationship("Project", back_populates="materials")
 
+_sqlite_keyset_index("ix_projects_created_at_id_sqlite", func.datetime(Project.created_at), Project.id)
+_sqlite_keyset_index(
+    "ix_projects_owner_id_created_at_id_sqlite", Project.owner_id, func.datetime(Project.created_at), Project.id
+)
+_sqlite_keyset_index("ix_materials_created_at_id_sqlite", func.datetime(Material.created_at), Material.id)
+_sqlite_keyset_index(
+    "ix_materials_project_id_created_at_id_sqlite",
+    Material.project_id, func.datetime(Material.created_at), Material.id,
+)
 
 class ProjectAssignment(Base):
     __tablename__ = "project_assignments"
+    __table_args__ = (
+        # satu mahasiswa hanya bisa di-assign sekali per project;
+        # sekaligus index untuk cek visibilitas (EXISTS) per user
+        Index("uq_project_assignments_user_id_project_id", "user_id", "project_id", unique=True),
+        # assignees per project (selectin), scope dosen, hapus project
+        Index("ix_project_assignments_project_id_user_id", "project_id", "user_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"))
@@ -57,3 +101,45 @@ class ProjectAssignment(Base):
 
     project = relationship("Project", back_populates="assignments")
     user = relationship("User")
+
+# Counter versi per tabel untuk ETag / conditional GET (lihat app/versioning.py).
+# Di-increment dalam transaksi yang sama dengan perubahan datanya.
+VERSIONED_TABLES = ("projects", "materials", "project_assignments", "users")
+
+class ChangeCounter(Base):
+    __tablename__ = "change_counters"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+event.listen(
+    ChangeCounter.__table__,
+    "after_create",
+    DDL(
+        "INSERT INTO change_counters (name, version, updated_at) VALUES "
+        + ", ".join(f"('{name}', 0, CURRENT_TIMESTAMP)" for name in VERSIONED_TABLES)
+    ),
+)
+
+# Sesi refresh token (lihat app/sessions.py, SESSION_STORE=sql).
+# Yang disimpan hanya hash SHA-256 dari secret refresh token.
+class UserSession(Base):
+    __tablename__ = "user_sessions"
+
+    sid = Column(String, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    email = Column(String, nullable=False)
+    refresh_hash = Column(String, nullable=False)
+    # hash sebelum rotasi terakhir; dipakai ulang = token dicuri → sesi di-revoke
+    previous_hash = Column(String, nullable=True)
+    expires_at = Column(DateTime(timezone=True), index=True, nullable=False)  # untuk sweep
+    revoked = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# Extension pg_trgm harus ada sebelum index trigram dibuat lewat create_all
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
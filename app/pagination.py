@@ -0,0 +1,60 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import func, literal, tuple_
+from sqlalchemy.orm import Session
+
+# Keyset (cursor) pagination berdasarkan (created_at, id), urutan terbaru dulu.
+# Cursor bersifat opaque bagi client: base64 dari [created_at, id] baris terakhir.
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _normalize(db: Session, expr):
+    # SQLite menyimpan CURRENT_TIMESTAMP tanpa mikrodetik sedangkan parameter
+    # di-bind dengan mikrodetik, jadi perbandingan string bisa salah.
+    # Normalisasi kedua sisi ke format datetime() SQLite.
+    if db.get_bind().dialect.name == "sqlite":
+        return func.datetime(expr)
+    return expr
+
+
+def order_keys(db: Session, model):
+    return _normalize(db, model.created_at), model.id
+
+
+def paginate_offset(query, db: Session, model, skip: int, limit: int):
+    created_at, row_id = order_keys(db, model)
+    return query.order_by(created_at.desc(), row_id.desc()).offset(skip).limit(limit).all()
+
+
+def paginate_keyset(query, db: Session, model, limit: int, cursor: Optional[str]):
+    created_at, row_id = order_keys(db, model)
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(created_at, row_id)
+            < tuple_(_normalize(db, literal(cursor_created_at, model.created_at.type)), cursor_id)
+        )
+
+    # Ambil satu baris ekstra untuk tahu apakah masih ada halaman berikutnya
+    rows = query.order_by(created_at.desc(), row_id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return rows[:limit], next_cursor
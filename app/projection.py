@@ -0,0 +1,42 @@
+from typing import Optional
+from fastapi import HTTPException
+from app import schemas
+
+# Sparse fieldset untuk list endpoint: hanya kolom yang diminta yang di-SELECT,
+# hasilnya Row tuple (tanpa identity map / change tracking ORM) dan langsung
+# diserialisasi per nama kolom. id & created_at selalu ikut karena dipakai
+# sebagai kunci urutan / cursor.
+ALWAYS_INCLUDED = ("id", "created_at")
+
+VIEWS = {
+    "projects": {
+        "full": schemas.ProjectResponse,
+        "summary": schemas.ProjectSummary,
+    },
+    "materials": {
+        "full": schemas.MaterialResponse,
+        "summary": schemas.MaterialSummary,
+    },
+}
+
+
+def parse_fields(resource: str, fields: Optional[str], view: Optional[str]):
+    # Return tuple nama kolom, atau None = mode entity penuh (perilaku lama)
+    if fields is None and view in (None, "full"):
+        return None
+    views = VIEWS[resource]
+    if view is not None and view not in views:
+        raise HTTPException(status_code=400, detail=f"Invalid view: {view}")
+    allowed = tuple(views["full"].model_fields)
+    if fields is None:
+        requested = tuple(views[view].model_fields)
+    else:
+        requested = tuple(dict.fromkeys(part.strip() for part in fields.split(",") if part.strip()))
+        unknown = [name for name in requested if name not in allowed]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Invalid fields: {', '.join(unknown)}")
+    return ALWAYS_INCLUDED + tuple(name for name in requested if name not in ALWAYS_INCLUDED)
+
+
+def columns(model, names):
+    return [getattr(model, name) for name in names]
@@ -0,0 +1,155 @@
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from app import database
+
+# Instrumentasi query per request (opt-in): catat semua statement SQL, deteksi
+# bentuk statement yang berulang (indikasi N+1) dan cek budget query per route.
+# Dev: QUERY_AUDIT=true → header X-Query-Count / X-Query-Warning di response.
+# CI: pakai assert_max_queries() di test.
+
+QUERY_AUDIT = os.getenv("QUERY_AUDIT", "false").lower() in ("1", "true", "yes")
+# Bentuk statement yang muncul >= N kali dalam satu request dianggap N+1
+QUERY_AUDIT_REPEAT_THRESHOLD = int(os.getenv("QUERY_AUDIT_REPEAT_THRESHOLD", "3"))
+# Budget default untuk route yang tidak ada di ROUTE_BUDGETS (0 = tanpa batas)
+QUERY_BUDGET_DEFAULT = int(os.getenv("QUERY_BUDGET_DEFAULT", "10"))
+# Override budget per route, mis. "GET /projects/=2,POST /projects/assign=5"
+QUERY_BUDGETS = os.getenv("QUERY_BUDGETS", "")
+
+# Budget per (method, route template) = jumlah query kasus terburuk: cache
+# principal kosong (+1 lookup user di get_current_user/require_roles) dan
+# response cache miss. Write endpoint termasuk 1 UPDATE change_counters saat
+# commit. Cek revoke sesi (claim "sid") tidak dihitung: hasilnya di-cache per
+# worker (REVOCATION_CACHE_TTL). Semua entry dicek test_query_audit.py.
+ROUTE_BUDGETS = {
+    ("GET", "/projects/"): 5,   # user + versi ETag + list + include=materials,assignees (selectin)
+    ("GET", "/projects/{project_id}"): 5,   # user + versi + project + materials + assignees
+    ("GET", "/materials/"): 3,   # user + versi + list
+    ("GET", "/search/"): 3,   # user + project + materi
+    ("POST", "/projects/"): 4,   # user + insert + versi + refresh
+    ("PUT", "/projects/{project_id}"): 5,   # user + select + update + versi + refresh
+    ("DELETE", "/projects/{project_id}"): 8,   # user + select + load cascade materials/assignments + 3 delete + versi
+    ("POST", "/projects/assign"): 7,   # user + cek user/project/existing + insert + versi + refresh
+    ("POST", "/projects/{project_id}/assign/bulk"): 5,   # user + project + users + insert ON CONFLICT + versi
+    ("POST", "/materials/"): 5,   # user + project + insert + versi + refresh
+    ("PUT", "/materials/{material_id}"): 6,   # user + material + project + update + versi + refresh
+    ("DELETE", "/materials/{material_id}"): 4,   # user + select + delete + versi
+    ("POST", "/auth/login"): 2,   # user + insert sesi (tanpa token/principal)
+    ("POST", "/auth/refresh"): 3,   # sesi + swap hash + user
+    ("POST", "/auth/register"): 4,   # cek email + insert + versi users + refresh
+}
+
+
+def parse_budgets(spec: str) -> dict:
+    budgets = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        route, _, budget = item.rpartition("=")
+        method, _, path = route.strip().partition(" ")
+        budgets[(method.upper(), path.strip())] = int(budget)
+    return budgets
+
+
+ROUTE_BUDGETS.update(parse_budgets(QUERY_BUDGETS))
+
+
+def budget_for(method: str, route: str) -> int:
+    return ROUTE_BUDGETS.get((method, route), QUERY_BUDGET_DEFAULT)
+
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%s|\$\d+|:\w+)\s*,)+\s*(?:\?|%s|\$\d+|:\w+)\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+def statement_shape(statement: str) -> str:
+    # Samakan statement yang hanya beda parameter: literal → ?, IN (?, ?, ?) → (?)
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _LITERAL.sub("?", shape)
+    return _PLACEHOLDER_LIST.sub("(?)", shape)
+
+
+class QueryAudit:
+    def __init__(self):
+        # list (statement, durasi detik)
+        self.statements = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def duration(self) -> float:
+        return sum(duration for _, duration in self.statements)
+
+    def repeated(self, threshold: int = None) -> dict:
+        # {shape: jumlah} untuk bentuk statement yang berulang >= threshold kali
+        threshold = threshold or QUERY_AUDIT_REPEAT_THRESHOLD
+        shapes = Counter(statement_shape(statement) for statement, _ in self.statements)
+        return {shape: count for shape, count in shapes.items() if count >= threshold}
+
+    def report(self) -> str:
+        lines = [f"{self.count} queries ({self.duration * 1000:.2f}ms)"]
+        lines += [f"  {i}. {statement}" for i, (statement, _) in enumerate(self.statements, start=1)]
+        for shape, count in self.repeated().items():
+            lines.append(f"  repeated x{count}: {shape}")
+        return "\n".join(lines)
+
+
+current_audit: ContextVar = ContextVar("current_query_audit", default=None)
+# Audit aktif lintas thread (dipakai capture_queries di test, di mana request
+# dijalankan TestClient di thread lain sehingga ContextVar tidak ikut)
+_global_audits = []
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_audit.get() is not None or _global_audits:
+        conn.info.setdefault("audit_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("audit_query_start")
+    if not starts:
+        return
+    entry = (statement, time.perf_counter() - starts.pop())
+    audit = current_audit.get()
+    if audit is not None:
+        audit.statements.append(entry)
+    for audit in _global_audits:
+        audit.statements.append(entry)
+
+
+def instrument_engine(engine):
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+instrument_engine(database.engine)
+if database.async_engine is not None:
+    instrument_engine(database.async_engine)
+
+
+# --- Helper test ---
+@contextmanager
+def capture_queries():
+    audit = QueryAudit()
+    _global_audits.append(audit)
+    try:
+        yield audit
+    finally:
+        _global_audits.remove(audit)
+
+
+@contextmanager
+def assert_max_queries(budget: int, allow_repeated: bool = False):
+    with capture_queries() as audit:
+        yield audit
+    if audit.count > budget:
+        raise AssertionError(f"Query budget exceeded: {audit.count} > {budget}\n{audit.report()}")
+    if not allow_repeated and audit.repeated():
+        raise AssertionError(f"Repeated query shapes (possible N+1)\n{audit.report()}")
@@ -0,0 +1,324 @@
+import hashlib
+import math
+import os
+import secrets
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from fastapi import HTTPException, status
+
+# Rate limit login sebelum query DB / bcrypt:
+# - per IP: token bucket (setiap percobaan memakai 1 token)
+# - per akun: sliding window jumlah login GAGAL, supaya tebak password untuk
+#   satu email ditolak tanpa membakar CPU bcrypt, tanpa mengganggu login sukses.
+# Backend memory: token bucket dengan LRU terbatas dan sliding window di atas
+# count-min sketch (memori tetap berapa pun jumlah key — cocok untuk email
+# acak dari credential stuffing; hanya bisa overestimate, tidak pernah kurang).
+# Backend shared (redis:// atau fake://): sliding window counter INCR/EXPIRE.
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+# "jumlah/detik"
+LOGIN_IP_LIMIT = os.getenv("LOGIN_IP_LIMIT", "20/60")
+LOGIN_ACCOUNT_LIMIT = os.getenv("LOGIN_ACCOUNT_LIMIT", "5/300")
+# memory / fake:// / redis://...
+RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "memory")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+RATE_LIMIT_SKETCH_WIDTH = int(os.getenv("RATE_LIMIT_SKETCH_WIDTH", "16384"))
+RATE_LIMIT_SKETCH_DEPTH = int(os.getenv("RATE_LIMIT_SKETCH_DEPTH", "4"))
+
+
+def parse_rate(spec: str) -> tuple:
+    count, _, seconds = spec.partition("/")
+    try:
+        limit, window = int(count), float(seconds)
+    except ValueError:
+        raise ValueError(f"Format rate tidak valid: {spec!r} (harus jumlah/detik)")
+    if limit <= 0 or window <= 0:
+        raise ValueError(f"Rate harus positif: {spec!r}")
+    return limit, window
+
+
+# --- Struktur data ---
+class CountMinSketch:
+    """Estimasi frekuensi key dengan memori tetap (depth x width counter)."""
+
+    def __init__(self, width: int, depth: int):
+        if not 1 <= depth <= 16:
+            raise ValueError("depth harus 1..16")
+        self.width = width
+        self.depth = depth
+        self.rows = [array("L", [0]) * width for _ in range(depth)]
+        # hash ber-key acak per proses supaya collision tidak bisa direkayasa
+        self._salt = secrets.token_bytes(16)
+
+    def _indexes(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=4 * self.depth, key=self._salt).digest()
+        return [int.from_bytes(digest[i * 4:i * 4 + 4], "little") % self.width for i in range(self.depth)]
+
+    def add(self, key: str, amount: int = 1) -> int:
+        # conservative update: hanya counter terkecil yang dinaikkan → overestimate lebih kecil
+        indexes = self._indexes(key)
+        target = min(row[i] for row, i in zip(self.rows, indexes)) + amount
+        for row, i in zip(self.rows, indexes):
+            if row[i] < target:
+                row[i] = target
+        return target
+
+    def estimate(self, key: str) -> int:
+        return min(row[i] for row, i in zip(self.rows, self._indexes(key)))
+
+    def clear(self):
+        for row in self.rows:
+            row[:] = array("L", [0]) * self.width
+
+
+# --- Limiter ---
+# API bersama (async): check(key) / hit(key) / add(key) → retry_after detik (0 = boleh).
+# check: tanpa mencatat; hit: catat kalau masih boleh; add: selalu catat.
+class TokenBucketLimiter:
+    def __init__(self, capacity: int, window: float, maxsize: int = RATE_LIMIT_MAX_KEYS):
+        self.capacity = capacity
+        self.rate = capacity / window  # token per detik
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _tokens(self, key: str, now: float) -> float:
+        tokens, updated = self._buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - updated) * self.rate)
+
+    def _store(self, key: str, tokens: float, now: float):
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.maxsize:
+            # key terlama dilupakan (= bucket penuh lagi); memori tetap terbatas
+            self._buckets.popitem(last=False)
+
+    def _retry_after(self, tokens: float) -> float:
+        return (1 - tokens) / self.rate
+
+    async def check(self, key: str) -> float:
+        with self._lock:
+            tokens = self._tokens(key, time.monotonic())
+        return 0.0 if tokens >= 1 else self._retry_after(tokens)
+
+    async def hit(self, key: str) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._tokens(key, now)
+            if tokens < 1:
+                return self._retry_after(tokens)
+            self._store(key, tokens - 1, now)
+        return 0.0
+
+    async def add(self, key: str) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._tokens(key, now) - 1
+            self._store(key, max(tokens, 0.0), now)
+        return 0.0 if tokens >= 0 else self._retry_after(tokens + 1)
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+def _sliding_estimate(current: int, previous: int, elapsed: float, window: float) -> float:
+    # Sliding window counter: window sebelumnya diberi bobot sisa overlap
+    return current + previous * (1 - elapsed / window)
+
+
+def _sliding_retry_after(current: int, previous: int, elapsed: float, window: float, limit: int) -> float:
+    if current >= limit:
+        # tunggu sampai window berikutnya, lalu sampai bobot window ini cukup turun
+        return (window - elapsed) + window * (1 - limit / current) + 1e-3
+    # previous * (1 - t/window) + current < limit  →  t > window * (1 - (limit - current) / previous)
+    return max(window * (1 - (limit - current) / previous) - elapsed, 1e-3)
+
+
+class SketchWindowLimiter:
+    # Dua count-min sketch (window sekarang + sebelumnya); memori tetap
+    def __init__(self, limit: int, window: float,
+                 width: int = RATE_LIMIT_SKETCH_WIDTH, depth: int = RATE_LIMIT_SKETCH_DEPTH):
+        self.limit = limit
+        self.window = window
+        self.current = CountMinSketch(width, depth)
+        self.previous = CountMinSketch(width, depth)
+        self._index = None
+        self._lock = threading.Lock()
+
+    def _advance(self, now: float) -> float:
+        index = int(now // self.window)
+        if index != self._index:
+            if self._index is not None and index == self._index + 1:
+                self.previous, self.current = self.current, self.previous
+                self.current.clear()
+            else:
+                self.current.clear()
+                self.previous.clear()
+            self._index = index
+        return now - index * self.window  # elapsed di window sekarang
+
+    def _retry_after(self, key: str, elapsed: float) -> float:
+        current, previous = self.current.estimate(key), self.previous.estimate(key)
+        if _sliding_estimate(current, previous, elapsed, self.window) < self.limit:
+            return 0.0
+        return _sliding_retry_after(current, previous, elapsed, self.window, self.limit)
+
+    async def check(self, key: str) -> float:
+        with self._lock:
+            return self._retry_after(key, self._advance(time.time()))
+
+    async def hit(self, key: str) -> float:
+        with self._lock:
+            elapsed = self._advance(time.time())
+            retry_after = self._retry_after(key, elapsed)
+            if not retry_after:
+                self.current.add(key)
+            return retry_after
+
+    async def add(self, key: str) -> float:
+        with self._lock:
+            elapsed = self._advance(time.time())
+            self.current.add(key)
+            return self._retry_after(key, elapsed)
+
+    def reset(self):
+        with self._lock:
+            self.current.clear()
+            self.previous.clear()
+
+
+class RedisWindowLimiter:
+    # Sliding window counter di store bersama (semua worker/instance).
+    # client: redis.asyncio.Redis atau FakeRedis (get/incr/expire + pipeline).
+    # hit/add: INCR dulu lalu keputusan diambil dari nilai hasil INCR, jadi dua
+    # worker tidak bisa sama-sama lolos dengan membaca hitungan yang sama.
+    def __init__(self, client, limit: int, window: float, prefix: str):
+        self.client = client
+        self.limit = limit
+        self.window = window
+        self.prefix = prefix
+
+    def _keys(self, key: str, index: int):
+        return f"{self.prefix}{key}:{index}", f"{self.prefix}{key}:{index - 1}"
+
+    async def _counts(self, key: str, now: float):
+        index = int(now // self.window)
+        current_key, previous_key = self._keys(key, index)
+        current = int(await self.client.get(current_key) or 0)
+        previous = int(await self.client.get(previous_key) or 0)
+        return current, previous, now - index * self.window, current_key
+
+    def _retry_after(self, current: int, previous: int, elapsed: float) -> float:
+        if _sliding_estimate(current, previous, elapsed, self.window) < self.limit:
+            return 0.0
+        return _sliding_retry_after(current, previous, elapsed, self.window, self.limit)
+
+    async def _incr(self, key: str, now: float):
+        # GET window sebelumnya + INCR/EXPIRE window sekarang dalam satu MULTI/EXEC:
+        # key counter tidak pernah ada tanpa TTL. → (current setelah INCR, previous, elapsed, key)
+        index = int(now // self.window)
+        current_key, previous_key = self._keys(key, index)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.get(previous_key)
+            pipe.incr(current_key)
+            pipe.expire(current_key, math.ceil(self.window * 2))
+            previous, current, _ = await pipe.execute()
+        return current, int(previous or 0), now - index * self.window, current_key
+
+    async def check(self, key: str) -> float:
+        current, previous, elapsed, _ = await self._counts(key, time.time())
+        return self._retry_after(current, previous, elapsed)
+
+    async def hit(self, key: str) -> float:
+        current, previous, elapsed, current_key = await self._incr(key, time.time())
+        # lolos kalau hitungan sebelum hit ini masih di bawah limit
+        retry_after = self._retry_after(current - 1, previous, elapsed)
+        if retry_after:
+            # request yang ditolak tidak ikut dihitung (sama seperti limiter memory)
+            await self.client.incr(current_key, -1)
+        return retry_after
+
+    async def add(self, key: str) -> float:
+        current, previous, elapsed, _ = await self._incr(key, time.time())
+        return self._retry_after(current, previous, elapsed)
+
+    def reset(self):
+        pass  # key kedaluwarsa sendiri lewat EXPIRE
+
+
+def create_limiters(spec: str = RATE_LIMIT_STORE) -> tuple:
+    # → (limiter per IP, limiter login gagal per akun)
+    ip_limit, ip_window = parse_rate(LOGIN_IP_LIMIT)
+    account_limit, account_window = parse_rate(LOGIN_ACCOUNT_LIMIT)
+    if spec == "memory":
+        return TokenBucketLimiter(ip_limit, ip_window), SketchWindowLimiter(account_limit, account_window)
+    if spec == "fake://":
+        from app.response_cache import FakeRedis
+
+        client = FakeRedis()
+    elif spec.startswith(("redis://", "rediss://")):
+        # Import di sini supaya mode default tidak butuh paket redis
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(spec)
+    else:
+        raise ValueError(f"RATE_LIMIT_STORE tidak dikenal: {spec!r}")
+    return (
+        RedisWindowLimiter(client, ip_limit, ip_window, "pjblms:rl:login-ip:"),
+        RedisWindowLimiter(client, account_limit, account_window, "pjblms:rl:login-account:"),
+    )
+
+
+login_ip_limiter, login_account_limiter = create_limiters()
+
+
+class LimiterStats:
+    def __init__(self):
+        self.rejected_ip = 0
+        self.rejected_account = 0
+
+    def snapshot(self) -> dict:
+        return {"rejected_ip": self.rejected_ip, "rejected_account": self.rejected_account}
+
+
+stats = LimiterStats()
+
+
+def reset():
+    login_ip_limiter.reset()
+    login_account_limiter.reset()
+
+
+# --- Dipakai endpoint login ---
+def _account_key(email: str) -> str:
+    return email.strip().lower()
+
+
+def _too_many(retry_after: float):
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many login attempts",
+        headers={"Retry-After": str(max(math.ceil(retry_after), 1))},
+    )
+
+
+async def check_login(ip: str, email: str):
+    # Dipanggil sebelum query user & bcrypt; 429 kalau IP/akun melewati batas
+    if not RATE_LIMIT_ENABLED:
+        return
+    retry_after = await login_ip_limiter.hit(ip)
+    if retry_after:
+        stats.rejected_ip += 1
+        raise _too_many(retry_after)
+    retry_after = await login_account_limiter.check(_account_key(email))
+    if retry_after:
+        stats.rejected_account += 1
+        raise _too_many(retry_after)
+
+
+async def record_login_failure(email: str):
+    if RATE_LIMIT_ENABLED:
+        await login_account_limiter.add(_account_key(email))
@@ -0,0 +1,322 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Optional
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+from app import compression, http_cache, models, serialization
+from app.cache import TTLCache
+
+# Cache response list/detail di sisi server (body JSON sudah jadi, dalam bytes).
+# Key = resource + versi tabel (change_counters) + scope role + query string
+# yang dinormalisasi. Setiap commit yang mengubah projects/materials/assignment
+# (create/update/delete/assign, termasuk bulk) meng-increment versi tabelnya
+# dalam transaksi yang sama, jadi entry lama otomatis tidak terpakai lagi —
+# berlaku juga lintas worker — dan sisa entry lama habis oleh LRU/TTL.
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "2048"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+# Kosong = LRU in-process; redis://... = backend Redis (butuh paket redis)
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "")
+
+# WATCH/EXEC yang gagal; FakeRedis memakai class yang sama dengan redis-py
+try:
+    from redis.exceptions import WatchError
+except ImportError:  # paket redis opsional
+    class WatchError(Exception):
+        pass
+
+
+# --- Backend ---
+class LocalBackend:
+    def __init__(self, maxsize: int, ttl: float):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.cache.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        self.cache.set(key, value, ttl)
+
+    async def clear(self):
+        self.cache.clear()
+
+
+class RedisBackend:
+    # client: redis.asyncio.Redis atau objek lain dengan API yang sama (get/set/delete/scan_iter)
+    def __init__(self, client, prefix: str = "pjblms:resp:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        await self.client.set(self.prefix + key, value, ex=max(int(ttl), 1))
+
+    async def clear(self):
+        async for key in self.client.scan_iter(match=self.prefix + "*"):
+            await self.client.delete(key)
+
+
+class FakeRedis:
+    # Pengganti redis.asyncio.Redis untuk dev/test (subset perintah yang dipakai).
+    # Setiap perintah jalan di bawah satu lock; pipeline() meniru MULTI/EXEC + WATCH.
+    def __init__(self):
+        self._data = {}
+        self._versions = {}  # jumlah tulis per key, untuk WATCH
+        self._lock = threading.Lock()
+
+    def _run(self, command, *args, **kwargs):
+        with self._lock:
+            return getattr(self, f"_{command}")(*args, **kwargs)
+
+    def _touch(self, name):
+        self._versions[name] = self._versions.get(name, 0) + 1
+
+    def _get(self, name):
+        entry = self._data.get(name)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[name]
+            return None
+        return value
+
+    def _set(self, name, value, ex=None):
+        self._data[name] = (value, time.monotonic() + ex if ex else None)
+        self._touch(name)
+        return True
+
+    def _incr(self, name, amount=1):
+        value = int(self._get(name) or 0) + amount
+        expires_at = self._data[name][1] if name in self._data else None
+        self._data[name] = (value, expires_at)
+        self._touch(name)
+        return value
+
+    def _expire(self, name, seconds):
+        if self._get(name) is None:
+            return False
+        self._data[name] = (self._data[name][0], time.monotonic() + seconds)
+        self._touch(name)
+        return True
+
+    def _delete(self, *names):
+        removed = 0
+        for name in names:
+            if self._data.pop(name, None) is not None:
+                self._touch(name)
+                removed += 1
+        return removed
+
+    async def get(self, name):
+        return self._run("get", name)
+
+    async def set(self, name, value, ex=None):
+        return self._run("set", name, value, ex=ex)
+
+    async def incr(self, name, amount=1):
+        return self._run("incr", name, amount)
+
+    async def expire(self, name, seconds):
+        return self._run("expire", name, seconds)
+
+    async def delete(self, *names):
+        return self._run("delete", *names)
+
+    async def scan_iter(self, match: str = "*"):
+        prefix = match.rstrip("*")
+        with self._lock:
+            keys = [key for key in self._data if key.startswith(prefix)]
+        for key in keys:
+            yield key
+
+    def pipeline(self, transaction: bool = True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    # Seperti redis.asyncio Pipeline: setelah watch() perintah langsung jalan
+    # sampai multi(); selain itu perintah diantrikan dan dijalankan atomik oleh
+    # execute(). execute() gagal dengan WatchError kalau key yang di-WATCH berubah.
+    def __init__(self, client: FakeRedis):
+        self._client = client
+        self.reset()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.reset()
+
+    def reset(self):
+        self._watched = None
+        self._explicit = False
+        self._queue = []
+
+    async def watch(self, *names):
+        with self._client._lock:
+            self._watched = {name: self._client._versions.get(name, 0) for name in names}
+
+    def multi(self):
+        self._explicit = True
+
+    def __getattr__(self, command):
+        if self._watched is not None and not self._explicit:
+            return getattr(self._client, command)
+
+        def queue(*args, **kwargs):
+            self._queue.append((command, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        client = self._client
+        try:
+            with client._lock:
+                for name, version in (self._watched or {}).items():
+                    if client._versions.get(name, 0) != version:
+                        raise WatchError("Watched variable changed.")
+                return [getattr(client, f"_{command}")(*args, **kwargs) for command, args, kwargs in self._queue]
+        finally:
+            self.reset()
+
+
+def create_backend(url: str = RESPONSE_CACHE_URL):
+    if not url:
+        return LocalBackend(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+    if url == "fake://":
+        return RedisBackend(FakeRedis())
+    # Import di sini supaya mode default tidak butuh paket redis
+    import redis.asyncio
+
+    return RedisBackend(redis.asyncio.Redis.from_url(url))
+
+
+backend = create_backend()
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def snapshot(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+stats = CacheStats()
+
+
+# --- Key ---
+def scope_key(current_user: models.User) -> str:
+    # Hasil list hanya bergantung pada scope (lihat app/scoping.py): semua admin
+    # berbagi entry, dosen per owner, mahasiswa per user. Versi project_assignments
+    # sudah ada di key, jadi assignment mahasiswa tidak perlu di-query di sini.
+    if current_user.role == "mahasiswa":
+        return f"user:{current_user.id}"
+    if current_user.role == "dosen":
+        return f"owner:{current_user.id}"
+    return current_user.role or "anonymous"
+
+
+def normalize_params(request: Request) -> str:
+    items = sorted(request.query_params.multi_items())
+    return "&".join(f"{name}={value}" for name, value in items)
+
+
+def cache_key(resource: str, path: str, versions: dict, scope: str, params: str) -> str:
+    # updated_at ikut supaya counter yang di-reset (tabel dibuat ulang) tidak bentrok dengan entry lama
+    version_part = ",".join(
+        "{}@{}".format(*versions.get(name, (0, None))) for name in http_cache.RESOURCE_TABLES[resource]
+    )
+    params_hash = hashlib.sha1(f"{path}?{params}".encode()).hexdigest()
+    return f"{resource}:{version_part}:{scope}:{params_hash}"
+
+
+# --- Dipakai endpoint list/detail ---
+# APIRoute.unique_id → renderer response_model (TypeAdapter dibuat sekali per route)
+_renderers = {}
+
+
+def _route_renderer(route):
+    render = _renderers.get(route.unique_id)
+    if render is None:
+        render = serialization.model_renderer(route.response_model, route.response_model_exclude_unset)
+        _renderers[route.unique_id] = render
+    return render
+
+
+async def serve(
+    request: Request,
+    response: Response,
+    db: Session,
+    current_user: models.User,
+    resource: str,
+    compute,
+    render=None,
+):
+    # 304 (ETag) → cache hit (varian terkompresi dulu) → hitung ulang lewat compute() dan simpan.
+    # If-None-Match: * / If-Modified-Since baru dijawab 304 setelah body didapat: entry cache
+    # atau compute() yang tidak 404 membuktikan resource ada dan terlihat oleh user ini.
+    # compute: coroutine function tanpa argumen; render: hasil → bytes JSON.
+    # Default render = response_model route (validasi + filter seperti FastAPI).
+    # Opt-in render=serialization.dumps melewati validasi — hanya untuk compute yang
+    # mengembalikan baris ORM/Row dari query aplikasi sendiri.
+    if render is None:
+        render = _route_renderer(request.scope["route"])
+    versions = {}
+    if http_cache.HTTP_CACHE_ENABLED or RESPONSE_CACHE_ENABLED:
+        versions = await http_cache.load_versions(db, resource)
+    not_modified = http_cache.check_not_modified(request, response, current_user, resource, versions)
+    if not_modified:
+        return not_modified
+
+    def resolved(cached: Response) -> Response:
+        return http_cache.check_not_modified(
+            request, response, current_user, resource, versions, visible=True
+        ) or cached
+
+    key = None
+    body = None
+    encoding = None
+    if RESPONSE_CACHE_ENABLED:
+        scope = scope_key(current_user)
+        key = cache_key(resource, request.url.path, versions, scope, normalize_params(request))
+        # Varian terkompresi disimpan di key terpisah: hit tidak perlu kompres ulang
+        encoding = compression.negotiate(request.headers.get("accept-encoding", ""))
+        if encoding is not None:
+            encoded = await backend.get(f"{key}:{encoding}")
+            if encoded is not None:
+                stats.hits += 1
+                return resolved(_cached_response(encoded, response, encoding))
+        body = await backend.get(key)
+
+    if body is None:
+        stats.misses += key is not None
+        result = await compute()
+        body = render(result)
+        if key is not None:
+            await backend.set(key, body, RESPONSE_CACHE_TTL)
+    else:
+        stats.hits += 1
+
+    if encoding is not None and len(body) >= compression.COMPRESSION_MIN_SIZE:
+        # CompressionMiddleware melewati response yang sudah ber-Content-Encoding
+        encoded = compression.compress(body, encoding)
+        await backend.set(f"{key}:{encoding}", encoded, RESPONSE_CACHE_TTL)
+        return resolved(_cached_response(encoded, response, encoding))
+    return resolved(_cached_response(body, response))
+
+
+def _cached_response(body: bytes, response: Response, encoding: Optional[str] = None) -> Response:
+    cached = Response(content=body, media_type="application/json")
+    cached.headers.update(response.headers)
+    if encoding is not None:
+        compression.mark_encoded(cached.headers, encoding)
+    return cached
@@ -1,8 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from jose import JWTError, jwt
-from fastapi.security import OAuth2PasswordBearer
-from app import schemas, models, database, auth
+from app import schemas, models, database, auth, hashing, ratelimit, sessions, tokens
 from app.logger import logger
 
 # Konfigurasi router
@@ -11,84 +9,96 @@ router = APIRouter(
     tags=["Authentication"],
 )
 
-# OAuth2
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
-
-# Constants (ambil dari auth.py supaya konsisten)
-SECRET_KEY = auth.SECRET_KEY
-ALGORITHM = auth.ALGORITHM
-
-# Dependency untuk ambil DB session
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def _save(db: Session, obj):
+    db.add(obj)
+    db.commit()
+    db.refresh(obj)
+    return obj
 
 # --- Register ---
+# Endpoint async: query DB lewat database.run_sync, bcrypt jalan di hashing pool
 @router.post("/register", response_model=schemas.UserResponse)
-def register_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(models.User).filter(models.User.email == user.email).first()
+async def register_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)):
+    existing_user = await database.run_sync(db, auth.get_user_by_email, user.email)
     if existing_user:
-        logger.warning(f"Gagal register: email {user.email} sudah terdaftar")
+        logger.warning("Gagal register: email %s sudah terdaftar", user.email)
         raise HTTPException(status_code=400, detail="Email sudah terdaftar")
 
-    hashed_password = auth.hash_password(user.password)
+    hashed_password = await hashing.pool.hash(user.password)
     new_user = models.User(
         email=user.email,
         hashed_password=hashed_password,
         full_name=user.full_name
     )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    new_user = await database.run_sync(db, _save, new_user)
 
-    logger.info(f"User baru terdaftar: id={new_user.id}, email={new_user.email}")
+    logger.info("User baru terdaftar: id=%s, email=%s", new_user.id, new_user.email)
     return new_user
 
 
 # --- Login ---
+# Rate limit per IP & per akun dicek sebelum query DB dan bcrypt (app/ratelimit.py)
 @router.post("/login")
-def login(user: schemas.UserLogin, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
+async def login(user: schemas.UserLogin, request: Request, db: Session = Depends(database.get_db)):
+    client_ip = request.client.host if request.client else "unknown"
+    try:
+        await ratelimit.check_login(client_ip, user.email)
+    except HTTPException:
+        logger.warning("Login ditolak rate limit: ip=%s, email=%s", client_ip, user.email)
+        raise
+
+    db_user = await database.run_sync(db, auth.get_user_by_email, user.email)
     if not db_user:
-        logger.warning(f"Gagal login: email {user.email} tidak ditemukan")
+        await ratelimit.record_login_failure(user.email)
+        logger.warning("Gagal login: email %s tidak ditemukan", user.email)
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    if not auth.verify_password(user.password, db_user.hashed_password):
-        logger.warning(f"Gagal login: password salah untuk email {user.email}")
+    valid, new_hash = await hashing.pool.verify_and_update(user.password, db_user.hashed_password)
+    if not valid:
+        await ratelimit.record_login_failure(user.email)
+        logger.warning("Gagal login: password salah untuk email %s", user.email)
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    token = auth.create_access_token({"sub": db_user.email})
-    logger.info(f"User login sukses: id={db_user.id}, email={db_user.email}")
-    return {"access_token": token, "token_type": "bearer"}
+    # Rehash transparan kalau hash lama tidak sesuai policy (mis. BCRYPT_ROUNDS dinaikkan)
+    if new_hash:
+        db_user.hashed_password = new_hash
+        await database.run_sync(db, Session.commit)
+        logger.info("Password hash diperbarui: id=%s", db_user.id)
+
+    sid, refresh_token = await sessions.create_session(db_user)
+    logger.info("User login sukses: id=%s, email=%s", db_user.id, db_user.email)
+    return _token_pair(db_user, sid, refresh_token)
+
+def _token_pair(user: models.User, sid: str, refresh_token: str) -> dict:
+    # uid/role ikut di token untuk jalur cepat require_roles (lihat app/tokens.py);
+    # sid menghubungkan access token dengan sesinya supaya logout langsung berlaku
+    token = auth.create_access_token({**tokens.user_claims(user), "sid": sid})
+    return {"access_token": token, "token_type": "bearer", "refresh_token": refresh_token}
+
+# --- Refresh ---
+# Tukar refresh token dengan pasangan token baru (rotasi), tanpa bcrypt
+@router.post("/refresh")
+async def refresh(body: schemas.RefreshRequest, db: Session = Depends(database.get_db)):
+    record, refresh_token = await sessions.rotate(body.refresh_token)
+    user = auth.principal_cache.get(record.email)
+    if user is None:
+        user = await database.run_sync(db, auth.get_user_by_email, record.email)
+    if user is None:
+        await sessions.revoke(record.sid)
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    logger.info("Refresh token dirotasi: id=%s, sid=%s", user.id, record.sid)
+    return _token_pair(user, record.sid, refresh_token)
+
+# --- Logout ---
+# Revoke sesi dari access token; refresh token dan access token lain di sesi yang sama ikut mati
+@router.post("/logout", status_code=204)
+async def logout(token: str = Depends(auth.oauth2_scheme)):
+    claims = await auth.verify_token(token)
+    if claims.get("sid") is not None:
+        await sessions.revoke(claims["sid"])
+        logger.info("User logout: email=%s, sid=%s", claims["sub"], claims["sid"])
 
 # --- Get Current User ---
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    db: Session = database.SessionLocal()
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            logger.warning("Token tidak valid atau sub kosong")
-            raise HTTPException(status_code=401, detail="Invalid token")
-
-        user = db.query(models.User).filter(models.User.email == email).first()
-        if user is None:
-            logger.warning(f"Token valid tapi user tidak ditemukan: {email}")
-            raise HTTPException(status_code=401, detail="User not found")
-
-        logger.info(f"Current user token valid: id={user.id}, email={user.email}")
-        return user
-
-    except JWTError:
-        logger.warning("JWT decode error: token invalid")
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    finally:
-        db.close()
-
 @router.get("/me", response_model=schemas.UserResponse)
-def read_users_me(current_user: models.User = Depends(auth.get_current_user)):
+async def read_users_me(current_user: models.User = Depends(auth.get_current_user)):
     return current_user
\ No newline at end of file
@@ -0,0 +1,83 @@
+import csv
+import io
+from typing import Literal
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from app import models, database, auth, scoping, serialization
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+# Export data besar secara streaming (NDJSON / CSV).
+# Baris dibaca dengan server-side cursor (yield_per) dan ditulis per batch,
+# jadi server tidak pernah menampung seluruh hasil di memori.
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+EXPORTS = {
+    "projects": (
+        (models.Project.id, models.Project.title, models.Project.description,
+         models.Project.owner_id, models.Project.created_at),
+        scoping.scope_projects,
+    ),
+    "materials": (
+        (models.Material.id, models.Material.project_id, models.Material.title,
+         models.Material.content, models.Material.created_at),
+        scoping.scope_materials,
+    ),
+    "assignments": (
+        (models.ProjectAssignment.id, models.ProjectAssignment.project_id,
+         models.ProjectAssignment.user_id, models.ProjectAssignment.assigned_at),
+        scoping.scope_assignments,
+    ),
+}
+
+def _encode(rows, keys, fmt: str) -> bytes:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+    return b"".join(serialization.dumps(dict(zip(keys, row))) + b"\n" for row in rows)
+
+def _statement(resource: str, current_user: models.User):
+    columns, scope = EXPORTS[resource]
+    stmt = scope(select(*columns), current_user).order_by(columns[0])
+    return stmt.execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+# Session dibuka di dalam generator (bukan dari dependency) supaya tetap hidup
+# selama response di-stream dan langsung ditutup begitu stream selesai/putus.
+def _stream_sync(resource: str, current_user: models.User, fmt: str):
+    keys = [c.key for c in EXPORTS[resource][0]]
+    if fmt == "csv":
+        yield _encode([keys], keys, fmt)
+    db = database.SessionLocal()
+    try:
+        result = db.execute(_statement(resource, current_user))
+        for rows in result.partitions():
+            yield _encode(rows, keys, fmt)
+    finally:
+        db.close()
+
+async def _stream_async(resource: str, current_user: models.User, fmt: str):
+    keys = [c.key for c in EXPORTS[resource][0]]
+    if fmt == "csv":
+        yield _encode([keys], keys, fmt)
+    async with database.AsyncSessionLocal() as db:
+        result = await db.stream(_statement(resource, current_user))
+        async for rows in result.partitions():
+            yield _encode(rows, keys, fmt)
+
+# --- Export Project / Material / Assignment (Role-based) ---
+@router.get("/{resource}")
+async def export_resource(
+    resource: Literal["projects", "materials", "assignments"],
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: models.User = Depends(auth.get_current_user),
+):
+    stream = _stream_async if database.DB_ASYNC else _stream_sync
+    return StreamingResponse(
+        stream(resource, current_user, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{resource}.{format}"'},
+    )
@@ -1,24 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import ValidationError
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from app import models, schemas, database, auth
+from typing import List, Literal, Optional, Union
+from app import models, schemas, database, auth, pagination, scoping, response_cache, projection, serialization
 
 router = APIRouter(prefix="/materials", tags=["Materials"])
 
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # --- Create Material (Admin/Dosen only) ---
-@router.post("/", response_model=schemas.MaterialResponse)
-def create_material(
-    material: schemas.MaterialCreate,
-    current_user: models.User = Depends(auth.require_roles("admin", "dosen")),
-    db: Session = Depends(get_db)
-):
+def _create_material(db: Session, material: schemas.MaterialCreate):
     project = db.query(models.Project).filter(models.Project.id == material.project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -33,14 +23,16 @@ def create_material(
     db.refresh(new_material)
     return new_material
 
-# --- Update Material (Admin/Dosen only) ---
-@router.put("/{material_id}", response_model=schemas.MaterialResponse)
-def update_material(
-    material_id: int,
+@router.post("/", response_model=schemas.MaterialResponse)
+async def create_material(
     material: schemas.MaterialCreate,
     current_user: models.User = Depends(auth.require_roles("admin", "dosen")),
-    db: Session = Depends(get_db)
+    db: Session = Depends(database.get_db)
 ):
+    return await database.run_sync(db, _create_material, material)
+
+# --- Update Material (Admin/Dosen only) ---
+def _update_material(db: Session, material_id: int, material: schemas.MaterialCreate):
     existing = db.query(models.Material).filter(models.Material.id == material_id).first()
     if not existing:
         raise HTTPException(status_code=404, detail="Material not found")
@@ -56,40 +48,201 @@ def update_material(
     db.refresh(existing)
     return existing
 
-# --- Delete Material (Admin/Dosen only) ---
-@router.delete("/{material_id}", status_code=204)
-def delete_material(
+@router.put("/{material_id}", response_model=schemas.MaterialResponse)
+async def update_material(
     material_id: int,
+    material: schemas.MaterialCreate,
     current_user: models.User = Depends(auth.require_roles("admin", "dosen")),
-    db: Session = Depends(get_db)
+    db: Session = Depends(database.get_db)
 ):
+    return await database.run_sync(db, _update_material, material_id, material)
+
+# --- Delete Material (Admin/Dosen only) ---
+def _delete_material(db: Session, material_id: int):
     material = db.query(models.Material).filter(models.Material.id == material_id).first()
     if not material:
         raise HTTPException(status_code=404, detail="Material not found")
     db.delete(material)
     db.commit()
+
+@router.delete("/{material_id}", status_code=204)
+async def delete_material(
+    material_id: int,
+    current_user: models.User = Depends(auth.require_roles("admin", "dosen")),
+    db: Session = Depends(database.get_db)
+):
+    await database.run_sync(db, _delete_material, material_id)
     return
 
 # --- List Materials (Role-based + pagination/filter) ---
-@router.get("/", response_model=List[schemas.MaterialResponse])
-def list_materials(
+def _list_materials(
+    db: Session,
+    current_user: models.User,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    project_id: Optional[int],
+    fields=None,
+):
+    if fields:
+        # Mode proyeksi: hanya kolom yang diminta (mis. tanpa content), hasil Row tuple
+        query = db.query(*projection.columns(models.Material, fields))
+    else:
+        query = db.query(models.Material)
+
+    if project_id:
+        query = query.filter(models.Material.project_id == project_id)
+
+    query = scoping.scope_materials(query, current_user)
+
+    # Mode cursor aktif kalau parameter cursor dikirim (kosong = halaman pertama)
+    if cursor is not None:
+        items, next_cursor = pagination.paginate_keyset(query, db, models.Material, limit, cursor)
+        return {"items": items, "next_cursor": next_cursor}
+
+    return pagination.paginate_offset(query, db, models.Material, skip, limit)
+
+@router.get(
+    "/",
+    response_model=Union[List[schemas.MaterialResponse], schemas.MaterialPage, List[schemas.MaterialSummary]],
+)
+async def list_materials(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = Query(default=10, lte=50),
+    cursor: Optional[str] = None,
     project_id: Optional[int] = None,
+    fields: Optional[str] = Query(default=None, description="mis. title,project_id (id & created_at selalu ikut)"),
+    view: Optional[Literal["full", "summary"]] = None,
     current_user: models.User = Depends(auth.get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(database.get_db)
 ):
-    query = db.query(models.Material)
+    fields = projection.parse_fields("materials", fields, view)
+    # Halaman list (sampai 50 baris): opt-in jalur cepat orjson tanpa validasi response_model
+    return await response_cache.serve(
+        request, response, db, current_user, "materials",
+        lambda: database.run_sync(db, _list_materials, current_user, skip, limit, cursor, project_id, fields),
+        render=serialization.dumps,
+    )
 
-    if project_id:
-        query = query.filter(models.Material.project_id == project_id)
+# --- Bulk Create/Upsert Material dari NDJSON (Admin/Dosen only) ---
+# Body dibaca bertahap per chunk dan diproses per batch, jadi pemakaian memori
+# tetap datar berapapun ukuran upload. Satu baris = satu material; baris dengan
+# "id" meng-update material yang sudah ada. Commit dilakukan per batch.
+BULK_BATCH_SIZE = 500
+MAX_LINE_BYTES = 1024 * 1024
+MAX_REPORTED_ERRORS = 1000
+
+async def _iter_ndjson_lines(stream):
+    # Yield (nomor_baris, bytes | None); None = baris terlalu panjang
+    buffer = b""
+    line_no = 0
+    skipping = False
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if skipping:
+                # sisa dari baris kepanjangan yang sudah dilaporkan
+                skipping = False
+                continue
+            line_no += 1
+            yield line_no, line
+        if len(buffer) > MAX_LINE_BYTES and not skipping:
+            line_no += 1
+            yield line_no, None
+            skipping = True
+        if skipping:
+            buffer = b""
+    if buffer.strip() and not skipping:
+        yield line_no + 1, buffer
+
+def _ingest_batch(db: Session, batch):
+    # batch: list (nomor_baris, MaterialBulkItem); return (created, updated, errors)
+    errors = []
+    project_ids = {item.project_id for _, item in batch}
+    existing_projects = {
+        project_id for (project_id,) in
+        db.query(models.Project.id).filter(models.Project.id.in_(project_ids))
+    }
+    update_ids = {item.id for _, item in batch if item.id is not None}
+    existing_materials = set()
+    if update_ids:
+        existing_materials = {
+            material_id for (material_id,) in
+            db.query(models.Material.id).filter(models.Material.id.in_(update_ids))
+        }
+
+    inserts, updates = [], []
+    for line, item in batch:
+        if item.project_id not in existing_projects:
+            errors.append({"line": line, "error": "Project not found"})
+            continue
+        row = item.model_dump(exclude={"id"})
+        if item.id is None:
+            inserts.append(row)
+        elif item.id in existing_materials:
+            updates.append({"id": item.id, **row})
+        else:
+            errors.append({"line": line, "error": "Material not found"})
+
+    # executemany: satu round-trip per batch (insertmanyvalues di PostgreSQL)
+    if inserts:
+        db.execute(insert(models.Material), inserts)
+    if updates:
+        db.execute(update(models.Material), updates)
+    db.commit()
+    return len(inserts), len(updates), errors
+
+@router.post(
+    "/bulk",
+    response_model=schemas.MaterialBulkSummary,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/x-ndjson": {"schema": schemas.MaterialBulkItem.model_json_schema()}},
+        }
+    },
+)
+async def bulk_ingest_materials(
+    request: Request,
+    current_user: models.User = Depends(auth.require_roles("admin", "dosen")),
+    db: Session = Depends(database.get_db)
+):
+    summary = {"lines": 0, "created": 0, "updated": 0, "failed": 0, "errors": [], "errors_truncated": False}
+
+    def add_errors(errors):
+        summary["failed"] += len(errors)
+        room = MAX_REPORTED_ERRORS - len(summary["errors"])
+        summary["errors"].extend(errors[:max(room, 0)])
+        if len(errors) > room:
+            summary["errors_truncated"] = True
+
+    async def flush(batch):
+        created, updated, errors = await database.run_sync(db, _ingest_batch, batch)
+        summary["created"] += created
+        summary["updated"] += updated
+        add_errors(errors)
 
-    # Mahasiswa hanya boleh lihat materi dari project yang dia assign
-    if current_user.role == "mahasiswa":
-        assignments = db.query(models.ProjectAssignment).filter(
-            models.ProjectAssignment.user_id == current_user.id
-        ).all()
-        project_ids = [a.project_id for a in assignments]
-        query = query.filter(models.Material.project_id.in_(project_ids))
+    batch = []
+    async for line_no, raw in _iter_ndjson_lines(request.stream()):
+        if raw is not None and not raw.strip():
+            continue
+        summary["lines"] += 1
+        if raw is None:
+            add_errors([{"line": line_no, "error": "Line too long"}])
+            continue
+        try:
+            batch.append((line_no, schemas.MaterialBulkItem.model_validate_json(raw)))
+        except ValidationError as e:
+            add_errors([{"line": line_no, "error": e.errors(include_url=False)[0]["msg"]}])
+            continue
+        if len(batch) >= BULK_BATCH_SIZE:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
 
-    return query.offset(skip).limit(limit).all()
\ No newline at end of file
+    summary["errors"].sort(key=lambda e: e["line"])
+    return summary
@@ -1,43 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import ValidationError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Literal, Optional, Union
 from datetime import datetime
-from app import models, schemas, database, auth
+from sqlalchemy.exc import IntegrityError
+from app import models, schemas, database, auth, pagination, scoping, search, response_cache, serialization, projection
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Semua endpoint async; query ORM dijalankan lewat database.run_sync
+# (threadpool di mode sync, AsyncSession di mode DB_ASYNC)
 
 # --- Create Project (Admin/Dosen only) ---
-@router.post("/", response_model=schemas.ProjectResponse)
-def create_project(
-    project: schemas.ProjectCreate,
-    current_user: models.User = Depends(auth.require_roles("admin", "dosen")),
-    db: Session = Depends(get_db)
-):
+def _create_project(db: Session, project: schemas.ProjectCreate, owner_id: int):
     new_project = models.Project(
         title=project.title,
         description=project.description,
-        owner_id=current_user.id
+        owner_id=owner_id
     )
     db.add(new_project)
     db.commit()
     db.refresh(new_project)
     return new_project
 
-# --- Update Project (Admin/Dosen only) ---
-@router.put("/{project_id}", response_model=schemas.ProjectResponse)
-def update_project(
-    project_id: int,
+@router.post("/", response_model=schemas.ProjectResponse)
+async def create_project(
     project: schemas.ProjectCreate,
     current_user: models.User = Depends(auth.require_roles("admin", "dosen")),
-    db: Session = Depends(get_db)
+    db: Session = Depends(database.get_db)
 ):
+    return await database.run_sync(db, _create_project, project, current_user.id)
+
+# --- Update Project (Admin/Dosen only) ---
+def _update_project(db: Session, project_id: int, project: schemas.ProjectCreate):
     existing = db.query(models.Project).filter(models.Project.id == project_id).first()
     if not existing:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -47,41 +45,109 @@ def update_project(
     db.refresh(existing)
     return existing
 
-# --- Delete Project (Admin/Dosen only) ---
-@router.delete("/{project_id}", status_code=204)
-def delete_project(
+@router.put("/{project_id}", response_model=schemas.ProjectResponse)
+async def update_project(
     project_id: int,
+    project: schemas.ProjectCreate,
     current_user: models.User = Depends(auth.require_roles("admin", "dosen")),
-    db: Session = Depends(get_db)
+    db: Session = Depends(database.get_db)
 ):
+    return await database.run_sync(db, _update_project, project_id, project)
+
+# --- Delete Project (Admin/Dosen only) ---
+def _delete_project(db: Session, project_id: int):
     project = db.query(models.Project).filter(models.Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     db.delete(project)
     db.commit()
+
+@router.delete("/{project_id}", status_code=204)
+async def delete_project(
+    project_id: int,
+    current_user: models.User = Depends(auth.require_roles("admin", "dosen")),
+    db: Session = Depends(database.get_db)
+):
+    await database.run_sync(db, _delete_project, project_id)
     return
 
+# --- Include relasi (materials, assignees) ---
+# Relasi di-load dengan selectinload: satu query tambahan per relasi untuk
+# seluruh halaman (bukan per project), dan tidak menggandakan baris seperti
+# joinedload pada dua koleksi sekaligus.
+INCLUDE_OPTIONS = ("materials", "assignees")
+
+def _parse_include(include: Optional[str], current_user: models.User, default=()):
+    if include is None:
+        requested = set(default)
+    else:
+        requested = {part.strip() for part in include.split(",") if part.strip()}
+    unknown = requested - set(INCLUDE_OPTIONS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Invalid include: {', '.join(sorted(unknown))}")
+    if "assignees" in requested and current_user.role == "mahasiswa":
+        if include is None:
+            requested.discard("assignees")
+        else:
+            raise HTTPException(status_code=403, detail="Forbidden")
+    return requested
+
+def _include_options(include):
+    options = []
+    if "materials" in include:
+        options.append(selectinload(models.Project.materials))
+    if "assignees" in include:
+        options.append(
+            selectinload(models.Project.assignments).joinedload(models.ProjectAssignment.user)
+        )
+    return options
+
+def _project_out(project: models.Project, include):
+    # Dibangun di dalam session; hanya relasi yang sudah di-load yang disentuh
+    out = serialization.project_encoder(project)
+    if "materials" in include:
+        out["materials"] = [
+            serialization.material_encoder(material)
+            for material in sorted(project.materials, key=lambda m: m.id)
+        ]
+    if "assignees" in include:
+        out["assignees"] = [
+            {
+                "user_id": assignment.user_id,
+                "email": assignment.user.email,
+                "full_name": assignment.user.full_name,
+                "assigned_at": assignment.assigned_at,
+            }
+            for assignment in sorted(project.assignments, key=lambda a: a.id)
+        ]
+    return out
+
 # --- List Projects (Role-based + pagination/filter) ---
-@router.get("/", response_model=List[schemas.ProjectResponse])
-def list_projects(
-    skip: int = 0,
-    limit: int = Query(default=10, lte=50),
-    owner_id: Optional[int] = None,
-    keyword: Optional[str] = None,
-    date_from: Optional[datetime] = None,
-    date_to: Optional[datetime] = None,
-    current_user: models.User = Depends(auth.get_current_user),
-    db: Session = Depends(get_db)
+def _list_projects(
+    db: Session,
+    current_user: models.User,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    owner_id: Optional[int],
+    keyword: Optional[str],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    include=(),
+    fields=None,
 ):
-    query = db.query(models.Project)
+    if fields:
+        # Mode proyeksi: hanya kolom yang diminta, hasil berupa Row tuple
+        query = db.query(*projection.columns(models.Project, fields))
+    else:
+        query = db.query(models.Project).options(*_include_options(include))
 
     if owner_id:
         query = query.filter(models.Project.owner_id == owner_id)
-    
+
     if keyword:
         query = query.filter(
-            (models.Project.title.ilike(f"%{keyword}%")) |
-            (models.Project.description.ilike(f"%{keyword}%"))
+            search.keyword_filter(db, keyword, models.Project.title, models.Project.description)
         )
 
     if date_from:
@@ -89,26 +155,79 @@ def list_projects(
     if date_to:
         query = query.filter(models.Project.created_at <= date_to)
 
-    # Mahasiswa hanya boleh lihat project yang dia assign
-    if current_user.role == "mahasiswa":
-        assignments = db.query(models.ProjectAssignment).filter(
-            models.ProjectAssignment.user_id == current_user.id
-        ).all()
-        project_ids = [a.project_id for a in assignments]
-        query = query.filter(models.Project.id.in_(project_ids))
-    elif current_user.role == "dosen":
-        query = query.filter(models.Project.owner_id == current_user.id)
+    query = scoping.scope_projects(query, current_user)
+
+    # Mode cursor aktif kalau parameter cursor dikirim (kosong = halaman pertama)
+    if cursor is not None:
+        items, next_cursor = pagination.paginate_keyset(query, db, models.Project, limit, cursor)
+    else:
+        items = pagination.paginate_offset(query, db, models.Project, skip, limit)
+    if not fields:
+        items = [_project_out(p, include) for p in items]
+    if cursor is not None:
+        return {"items": items, "next_cursor": next_cursor}
+    return items
+
+@router.get(
+    "/",
+    response_model=Union[List[schemas.ProjectDetail], schemas.ProjectPage, List[schemas.ProjectSummary]],
+    response_model_exclude_unset=True,
+)
+async def list_projects(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(default=10, lte=50),
+    cursor: Optional[str] = None,
+    owner_id: Optional[int] = None,
+    keyword: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    include: Optional[str] = Query(default=None, description="materials,assignees"),
+    fields: Optional[str] = Query(default=None, description="mis. title,owner_id (id & created_at selalu ikut)"),
+    view: Optional[Literal["full", "summary"]] = None,
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(database.get_db)
+):
+    include = _parse_include(include, current_user)
+    fields = projection.parse_fields("projects", fields, view)
+    if fields and include:
+        raise HTTPException(status_code=400, detail="include tidak bisa dipakai bersama fields/view")
+    # Halaman list (sampai 50 baris): opt-in jalur cepat orjson tanpa validasi response_model
+    return await response_cache.serve(
+        request, response, db, current_user, "projects",
+        lambda: database.run_sync(
+            db, _list_projects, current_user, skip, limit, cursor, owner_id, keyword, date_from, date_to,
+            include, fields,
+        ),
+        render=serialization.dumps,
+    )
 
+# --- Detail Project + materials & assignees dalam satu request ---
+def _get_project(db: Session, current_user: models.User, project_id: int, include):
+    query = db.query(models.Project).options(*_include_options(include)).filter(models.Project.id == project_id)
+    project = scoping.scope_projects(query, current_user).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return _project_out(project, include)
 
-    return query.offset(skip).limit(limit).all()
+@router.get("/{project_id}", response_model=schemas.ProjectDetail, response_model_exclude_unset=True)
+async def get_project(
+    project_id: int,
+    request: Request,
+    response: Response,
+    include: Optional[str] = Query(default=None, description="materials,assignees (default: semua)"),
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(database.get_db)
+):
+    include = _parse_include(include, current_user, default=INCLUDE_OPTIONS)
+    return await response_cache.serve(
+        request, response, db, current_user, "projects",
+        lambda: database.run_sync(db, _get_project, current_user, project_id, include),
+    )
 
 # --- Assign Project to Mahasiswa (Admin/Dosen only) ---
-@router.post("/assign", response_model=schemas.ProjectAssignResponse)
-def assign_project(
-    assign: schemas.ProjectAssign,
-    current_user: models.User = Depends(auth.require_roles("admin", "dosen")),
-    db: Session = Depends(get_db)
-):
+def _assign_project(db: Session, assign: schemas.ProjectAssign):
     user = db.query(models.User).filter(models.User.id == assign.user_id).first()
     project = db.query(models.Project).filter(models.Project.id == assign.project_id).first()
     if not user or not project:
@@ -123,6 +242,178 @@ def assign_project(
 
     assignment = models.ProjectAssignment(user_id=assign.user_id, project_id=assign.project_id)
     db.add(assignment)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # request paralel sudah lebih dulu meng-assign (unique user_id, project_id)
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Project already assigned to this student")
     db.refresh(assignment)
-    return assignment
\ No newline at end of file
+    return assignment
+
+@router.post("/assign", response_model=schemas.ProjectAssignResponse)
+async def assign_project(
+    assign: schemas.ProjectAssign,
+    current_user: models.User = Depends(auth.require_roles("admin", "dosen")),
+    db: Session = Depends(database.get_db)
+):
+    return await database.run_sync(db, _assign_project, assign)
+
+# --- Bulk Assign Project ke banyak Mahasiswa (Admin/Dosen only) ---
+# Body: JSON {"user_ids": [...]}, CSV (satu user_id per baris, header opsional)
+# atau NDJSON ({"user_id": n} / angka per baris). Semua id divalidasi dalam satu
+# query, pasangan yang sudah ada dilewati via ON CONFLICT DO NOTHING, commit sekali.
+MAX_BULK_ASSIGN = 5000
+
+def _parse_bulk_user_ids(body: bytes, content_type: str):
+    # Return list (line, user_id, error) sesuai urutan input
+    if content_type.startswith("application/json"):
+        try:
+            payload = schemas.BulkAssignRequest.model_validate_json(body)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+        return [(i, user_id, None) for i, user_id in enumerate(payload.user_ids, start=1)]
+
+    ndjson = content_type.startswith(("application/x-ndjson", "application/ndjson"))
+    if not ndjson and not content_type.startswith("text/csv"):
+        raise HTTPException(status_code=415, detail="Unsupported content type")
+
+    entries = []
+    # utf-8-sig: BOM dari export Excel dibuang dulu supaya header tetap dikenali
+    for i, raw in enumerate(body.decode("utf-8-sig", errors="replace").splitlines(), start=1):
+        value = raw.strip()
+        if not value or (i == 1 and _is_header(value)):
+            continue
+        try:
+            if ndjson:
+                value = json.loads(value)
+                if isinstance(value, dict):
+                    value = value["user_id"]
+            else:
+                value = value.split(",", 1)[0]
+            if isinstance(value, (bool, float)):
+                raise ValueError(value)
+            entries.append((i, int(value), None))
+        except (ValueError, TypeError, KeyError):
+            entries.append((i, None, "Invalid user_id"))
+    return entries
+
+def _is_header(line: str) -> bool:
+    # Baris pertama "user_id" (kolom pertama, tanpa peduli spasi/kutip/huruf besar)
+    return line.split(",", 1)[0].strip().strip('"').strip().lower() == "user_id"
+
+# ON CONFLICT DO NOTHING hanya ada di insert() dialect PostgreSQL & SQLite
+DIALECT_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+def _insert_on_conflict(db: Session, insert, project_id: int, user_ids):
+    stmt = (
+        insert(models.ProjectAssignment)
+        .values([{"project_id": project_id, "user_id": user_id} for user_id in user_ids])
+        .on_conflict_do_nothing(index_elements=["user_id", "project_id"])
+        .returning(models.ProjectAssignment.user_id)
+    )
+    return set(db.execute(stmt).scalars())
+
+def _insert_missing(db: Session, project_id: int, user_ids):
+    # Fallback portabel (dialect tanpa ON CONFLICT): pasangan yang sudah ada di-skip,
+    # sisanya di-insert sekaligus dalam savepoint. Kalau request paralel lebih dulu
+    # meng-assign (IntegrityError), ulang per baris: yang bentrok = sudah di-assign.
+    assigned = {
+        user_id for (user_id,) in
+        db.query(models.ProjectAssignment.user_id).filter(
+            models.ProjectAssignment.project_id == project_id,
+            models.ProjectAssignment.user_id.in_(user_ids),
+        )
+    }
+    missing = sorted(set(user_ids) - assigned)
+    if not missing:
+        return set()
+    try:
+        with db.begin_nested():
+            db.add_all([models.ProjectAssignment(project_id=project_id, user_id=user_id) for user_id in missing])
+        return set(missing)
+    except IntegrityError:
+        pass
+    inserted = set()
+    for user_id in missing:
+        try:
+            with db.begin_nested():
+                db.add(models.ProjectAssignment(project_id=project_id, user_id=user_id))
+            inserted.add(user_id)
+        except IntegrityError:
+            pass
+    return inserted
+
+def _bulk_assign(db: Session, project_id: int, entries):
+    project = db.query(models.Project.id).filter(models.Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    candidate_ids = {user_id for _, user_id, error in entries if error is None}
+    existing_users = set()
+    if candidate_ids:
+        existing_users = {
+            user_id for (user_id,) in
+            db.query(models.User.id).filter(models.User.id.in_(candidate_ids))
+        }
+
+    inserted = set()
+    if existing_users:
+        insert = DIALECT_INSERTS.get(db.get_bind().dialect.name)
+        if insert is not None:
+            inserted = _insert_on_conflict(db, insert, project_id, existing_users)
+        else:
+            inserted = _insert_missing(db, project_id, existing_users)
+        db.commit()
+
+    results = []
+    seen = set()
+    for line, user_id, error in entries:
+        if error:
+            status = "invalid"
+        elif user_id in seen:
+            status = "duplicate"
+        elif user_id not in existing_users:
+            status = "user_not_found"
+        elif user_id in inserted:
+            status = "assigned"
+        else:
+            status = "already_assigned"
+        if user_id is not None:
+            seen.add(user_id)
+        results.append({"line": line, "user_id": user_id, "status": status, "error": error})
+
+    assigned = len(inserted)
+    failed = sum(r["status"] in ("invalid", "user_not_found") for r in results)
+    return {
+        "project_id": project_id,
+        "assigned": assigned,
+        "skipped": len(results) - assigned - failed,
+        "failed": failed,
+        "results": results,
+    }
+
+@router.post(
+    "/{project_id}/assign/bulk",
+    response_model=schemas.BulkAssignResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": schemas.BulkAssignRequest.model_json_schema()},
+                "text/csv": {"schema": {"type": "string"}},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def bulk_assign_project(
+    project_id: int,
+    request: Request,
+    current_user: models.User = Depends(auth.require_roles("admin", "dosen")),
+    db: Session = Depends(database.get_db)
+):
+    entries = _parse_bulk_user_ids(await request.body(), request.headers.get("content-type", ""))
+    if len(entries) > MAX_BULK_ASSIGN:
+        raise HTTPException(status_code=413, detail=f"Maksimal {MAX_BULK_ASSIGN} user per request")
+    return await database.run_sync(db, _bulk_assign, project_id, entries)
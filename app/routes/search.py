@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Literal
+from app import models, schemas, database, auth, search, serialization
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+def _search(db: Session, current_user: models.User, q: str, type: str, limit: int):
+    result = {"projects": [], "materials": []}
+    if type in ("all", "projects"):
+        result["projects"] = [
+            dict(serialization.project_encoder(project), rank=rank)
+            for project, rank in search.search_projects(db, current_user, q, limit)
+        ]
+    if type in ("all", "materials"):
+        result["materials"] = [
+            dict(serialization.material_encoder(material), rank=rank)
+            for material, rank in search.search_materials(db, current_user, q, limit)
+        ]
+    return result
+
+# --- Search Project & Material (Role-based, ranked) ---
+@router.get("/", response_model=schemas.SearchResults)
+async def search_all(
+    q: str = Query(min_length=2, max_length=100),
+    type: Literal["all", "projects", "materials"] = "all",
+    limit: int = Query(default=10, lte=50),
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(database.get_db)
+):
+    return await database.run_sync(db, _search, current_user, q, type, limit)
@@ -4,15 +4,7 @@ from app import models, schemas, database, auth
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
-# Dependency DB
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # --- Get current user ---
 @router.get("/me", response_model=schemas.UserResponse)
-def read_current_user(current_user: models.User = Depends(auth.get_current_user)):
+async def read_current_user(current_user: models.User = Depends(auth.get_current_user)):
     return current_user
\ No newline at end of file
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, EmailStr
+from typing import List, Optional
 from datetime import datetime
 
 class UserCreate(BaseModel):
@@ -11,14 +11,16 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
 class UserResponse(BaseModel):
     id: int
     email: EmailStr
     full_name: str | None = None
     role: str   # ✅ ditambahkan supaya tidak KeyError di test
 
-    class Config:
-        from_attributes = True  # ganti orm_mode
+    model_config = ConfigDict(from_attributes=True)
 
 # ------------------- Project -------------------
 class ProjectBase(BaseModel):
@@ -33,8 +35,14 @@ class ProjectResponse(ProjectBase):
     created_at: datetime
     owner_id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+# view=summary: tanpa description
+class ProjectSummary(BaseModel):
+    id: int
+    title: str
+    owner_id: int
+    created_at: datetime
 
 # ------------------- Material -------------------
 class MaterialCreate(BaseModel):
@@ -46,8 +54,34 @@ class MaterialResponse(MaterialCreate):
     id: int
     created_at: datetime   # ✅ perbaikan: sebelumnya str → datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+# view=summary: tanpa content
+class MaterialSummary(BaseModel):
+    id: int
+    project_id: int
+    title: str
+    created_at: datetime
+
+class MaterialPage(BaseModel):
+    items: List[MaterialResponse]
+    next_cursor: Optional[str] = None
+
+class MaterialBulkItem(MaterialCreate):
+    id: Optional[int] = None   # diisi = update material yang sudah ada
+    content: Optional[str] = None
+
+class BulkLineError(BaseModel):
+    line: int
+    error: str
+
+class MaterialBulkSummary(BaseModel):
+    lines: int
+    created: int
+    updated: int
+    failed: int
+    errors: List[BulkLineError]
+    errors_truncated: bool = False
 
 # ------------------- Project Assignment -------------------
 class ProjectAssign(BaseModel):
@@ -58,5 +92,47 @@ class ProjectAssignResponse(ProjectAssign):
     id: int
     assigned_at: datetime   # ✅ sudah benar
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class BulkAssignRequest(BaseModel):
+    user_ids: List[int]
+
+class BulkAssignResult(BaseModel):
+    line: int
+    user_id: Optional[int] = None
+    status: str   # assigned / already_assigned / user_not_found / duplicate / invalid
+    error: Optional[str] = None
+
+class BulkAssignResponse(BaseModel):
+    project_id: int
+    assigned: int
+    skipped: int
+    failed: int
+    results: List[BulkAssignResult]
+
+# ------------------- Project Detail -------------------
+class AssigneeResponse(BaseModel):
+    user_id: int
+    email: EmailStr
+    full_name: Optional[str] = None
+    assigned_at: datetime
+
+# Detail project; materials/assignees hanya ada kalau diminta lewat include=
+class ProjectDetail(ProjectResponse):
+    materials: Optional[List[MaterialResponse]] = None
+    assignees: Optional[List[AssigneeResponse]] = None
+
+class ProjectPage(BaseModel):
+    items: List[ProjectDetail]
+    next_cursor: Optional[str] = None
+
+# ------------------- Search -------------------
+class ProjectSearchHit(ProjectResponse):
+    rank: float
+
+class MaterialSearchHit(MaterialResponse):
+    rank: float
+
+class SearchResults(BaseModel):
+    projects: List[ProjectSearchHit] = []
+    materials: List[MaterialSearchHit] = []
@@ -0,0 +1,44 @@
+from sqlalchemy import exists
+from app import models
+
+# Filter visibilitas berbasis role, dipakai ulang oleh list/detail/export.
+# Cek assignment mahasiswa dilakukan di SQL (EXISTS) supaya tidak perlu
+# load semua ProjectAssignment lalu kirim balik sebagai IN (...).
+
+
+def assigned_to(user_id: int, project_id_column):
+    return exists().where(
+        models.ProjectAssignment.user_id == user_id,
+        models.ProjectAssignment.project_id == project_id_column,
+    )
+
+
+def scope_projects(query, current_user: models.User):
+    # Mahasiswa hanya boleh lihat project yang dia assign
+    if current_user.role == "mahasiswa":
+        return query.filter(assigned_to(current_user.id, models.Project.id))
+    # Dosen hanya lihat project miliknya
+    if current_user.role == "dosen":
+        return query.filter(models.Project.owner_id == current_user.id)
+    return query
+
+
+def scope_materials(query, current_user: models.User):
+    # Mahasiswa hanya boleh lihat materi dari project yang dia assign
+    if current_user.role == "mahasiswa":
+        return query.filter(assigned_to(current_user.id, models.Material.project_id))
+    return query
+
+
+def scope_assignments(query, current_user: models.User):
+    # Mahasiswa hanya assignment miliknya, dosen hanya untuk project miliknya
+    if current_user.role == "mahasiswa":
+        return query.filter(models.ProjectAssignment.user_id == current_user.id)
+    if current_user.role == "dosen":
+        return query.filter(
+            exists().where(
+                models.Project.id == models.ProjectAssignment.project_id,
+                models.Project.owner_id == current_user.id,
+            )
+        )
+    return query
@@ -0,0 +1,76 @@
+from sqlalchemy import case, func, literal, or_
+from sqlalchemy.orm import Session
+from app import models, scoping
+
+# Pencarian keyword untuk project & materi.
+# keyword_filter: substring ILIKE (dipakai juga filter `keyword` list project);
+# index GIN pg_trgm di PostgreSQL ikut melayani ILIKE '%kw%'.
+# fuzzy_filter (hanya /search): di PostgreSQL ditambah operator % (toleran typo),
+# diurutkan dengan word_similarity. Dialect lain (SQLite untuk test): ILIKE biasa,
+# rank sederhana (match di judul > isi).
+
+TITLE_WEIGHT = 1.0
+BODY_WEIGHT = 0.5
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _like_pattern(keyword: str) -> str:
+    escaped = keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _ilike_clauses(keyword: str, title_column, body_column):
+    pattern = _like_pattern(keyword)
+    return [
+        title_column.ilike(pattern, escape="\\"),
+        body_column.ilike(pattern, escape="\\"),
+    ]
+
+
+def keyword_filter(db: Session, keyword: str, title_column, body_column):
+    return or_(*_ilike_clauses(keyword, title_column, body_column))
+
+
+def fuzzy_filter(db: Session, keyword: str, title_column, body_column):
+    clauses = _ilike_clauses(keyword, title_column, body_column)
+    if _is_postgres(db):
+        # toleran typo pada judul (similarity >= pg_trgm.similarity_threshold)
+        clauses.append(title_column.op("%")(keyword))
+    return or_(*clauses)
+
+
+def rank_expression(db: Session, keyword: str, title_column, body_column):
+    if _is_postgres(db):
+        return (
+            func.word_similarity(keyword, title_column) * TITLE_WEIGHT
+            + func.word_similarity(keyword, func.coalesce(body_column, "")) * BODY_WEIGHT
+        )
+    pattern = _like_pattern(keyword)
+    return (
+        case((title_column.ilike(pattern, escape="\\"), literal(TITLE_WEIGHT)), else_=literal(0.0))
+        + case((body_column.ilike(pattern, escape="\\"), literal(BODY_WEIGHT)), else_=literal(0.0))
+    )
+
+
+def _search(db: Session, query, model, body_column, keyword: str, limit: int):
+    rank = rank_expression(db, keyword, model.title, body_column).label("rank")
+    return (
+        query.add_columns(rank)
+        .filter(fuzzy_filter(db, keyword, model.title, body_column))
+        .order_by(rank.desc(), model.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def search_projects(db: Session, current_user: models.User, keyword: str, limit: int):
+    query = scoping.scope_projects(db.query(models.Project), current_user)
+    return _search(db, query, models.Project, models.Project.description, keyword, limit)
+
+
+def search_materials(db: Session, current_user: models.User, keyword: str, limit: int):
+    query = scoping.scope_materials(db.query(models.Material), current_user)
+    return _search(db, query, models.Material, models.Material.content, keyword, limit)
@@ -0,0 +1,78 @@
+import json
+from datetime import date, datetime
+from operator import attrgetter
+from pydantic import TypeAdapter
+from sqlalchemy.engine import Row
+from app import models, schemas
+
+# Serialisasi JSON cepat untuk data yang sudah dipercaya (baris ORM / Row hasil
+# query sendiri): atribut dibaca langsung sesuai field schema lalu di-encode
+# orjson ke bytes, tanpa membuat model pydantic per baris.
+# orjson opsional; tanpa orjson jatuh ke json stdlib.
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class RowEncoder:
+    """Baca field schema dari objek ORM (attrgetter) menjadi dict siap encode."""
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        self._get = attrgetter(*self.fields)
+
+    def __call__(self, obj) -> dict:
+        values = self._get(obj)
+        if len(self.fields) == 1:
+            values = (values,)
+        return dict(zip(self.fields, values))
+
+
+# ORM class → RowEncoder; dipakai dumps() saat menemukan objek ORM
+_encoders = {}
+
+
+def register(model, schema) -> RowEncoder:
+    encoder = RowEncoder(schema.model_fields)
+    _encoders[model] = encoder
+    return encoder
+
+
+def _default(value):
+    encoder = _encoders.get(type(value))
+    if encoder is not None:
+        return encoder(value)
+    if isinstance(value, Row):
+        return value._asdict()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return _default(value)
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        # OPT_UTC_Z: format datetime UTC sama dengan pydantic ("...Z")
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(content, default=_json_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def model_renderer(response_model, exclude_unset: bool = False):
+    # Jalur default response_cache.serve: validasi + filter lewat response_model
+    # endpoint (seperti FastAPI), hasilnya langsung bytes JSON dari pydantic-core.
+    adapter = TypeAdapter(response_model)
+
+    def render(content) -> bytes:
+        return adapter.dump_json(adapter.validate_python(content, from_attributes=True), exclude_unset=exclude_unset)
+
+    return render
+
+
+# --- Encoder untuk model ORM aplikasi ---
+project_encoder = register(models.Project, schemas.ProjectResponse)
+material_encoder = register(models.Material, schemas.MaterialResponse)
+assignment_encoder = register(models.ProjectAssignment, schemas.ProjectAssignResponse)
@@ -0,0 +1,345 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import delete, update
+from starlette.concurrency import run_in_threadpool
+from app import database, models, tokens
+from app.response_cache import WatchError
+from app.cache import TTLCache
+from app.logger import logger
+
+# Sesi login + refresh token dengan rotasi. Refresh token = "<sid>.<secret>":
+# sesi dicari lewat sid (primary key / key Redis, O(1)) lalu hash secret
+# dibandingkan constant-time. Setiap refresh menerbitkan secret baru; secret
+# lama yang dipakai lagi (reuse) berarti token bocor → seluruh sesi di-revoke.
+# Access token membawa claim "sid", jadi logout/revoke juga mematikan access
+# token yang masih berlaku (dicek lewat is_revoked, di-cache singkat per worker).
+
+# memory / sql / fake:// / redis://...
+SESSION_STORE = os.getenv("SESSION_STORE", "sql")
+REFRESH_TOKEN_EXPIRE_DAYS = float(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+# Interval hapus sesi kedaluwarsa (memory/sql; Redis memakai TTL key)
+SESSION_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", "3600"))
+# Umur cache hasil cek revoke per worker; revoke di worker yang sama langsung berlaku
+REVOCATION_CACHE_TTL = float(os.getenv("REVOCATION_CACHE_TTL", "5"))
+REVOCATION_CACHE_SIZE = int(os.getenv("REVOCATION_CACHE_SIZE", "4096"))
+
+
+class SessionRecord:
+    __slots__ = ("sid", "user_id", "email", "refresh_hash", "previous_hash", "expires_at", "revoked")
+
+    def __init__(self, sid, user_id, email, refresh_hash, expires_at, previous_hash=None, revoked=False):
+        self.sid = sid
+        self.user_id = user_id
+        self.email = email
+        self.refresh_hash = refresh_hash
+        self.previous_hash = previous_hash
+        self.expires_at = expires_at  # unix timestamp (detik)
+        self.revoked = revoked
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _hash(secret: str) -> str:
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+
+# --- Store ---
+# Semua store punya API async yang sama: add / get / swap / revoke / sweep.
+# swap = compare-and-set hash refresh (gagal kalau sudah dirotasi request lain).
+# get(sid, db): db = session request yang sedang berjalan (boleh None); hanya
+# SQLSessionStore yang memakainya supaya cek revoke tidak checkout koneksi kedua.
+class MemorySessionStore:
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    async def add(self, record: SessionRecord):
+        with self._lock:
+            self._data[record.sid] = record
+
+    async def get(self, sid: str, db=None) -> Optional[SessionRecord]:
+        with self._lock:
+            record = self._data.get(sid)
+            return SessionRecord(**record.to_dict()) if record else None
+
+    async def swap(self, sid: str, expected_hash: str, new_hash: str, expires_at: float) -> bool:
+        with self._lock:
+            record = self._data.get(sid)
+            if record is None or record.revoked or record.refresh_hash != expected_hash:
+                return False
+            record.previous_hash, record.refresh_hash, record.expires_at = expected_hash, new_hash, expires_at
+            return True
+
+    async def revoke(self, sid: str):
+        with self._lock:
+            record = self._data.get(sid)
+            if record is not None:
+                record.revoked = True
+
+    async def sweep(self, now: float) -> int:
+        with self._lock:
+            expired = [sid for sid, record in self._data.items() if record.expires_at <= now]
+            for sid in expired:
+                del self._data[sid]
+        return len(expired)
+
+
+def _utc(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+def _timestamp(value: datetime) -> float:
+    # SQLite mengembalikan datetime naive (UTC)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _sql_add(db, record: SessionRecord):
+    db.add(models.UserSession(
+        sid=record.sid, user_id=record.user_id, email=record.email, refresh_hash=record.refresh_hash,
+        expires_at=_utc(record.expires_at), revoked=False,
+    ))
+    db.commit()
+
+
+def _sql_get(db, sid: str):
+    row = db.get(models.UserSession, sid)
+    if row is None:
+        return None
+    return SessionRecord(
+        sid=row.sid, user_id=row.user_id, email=row.email, refresh_hash=row.refresh_hash,
+        previous_hash=row.previous_hash, expires_at=_timestamp(row.expires_at), revoked=row.revoked,
+    )
+
+
+def _sql_swap(db, sid: str, expected_hash: str, new_hash: str, expires_at: float) -> bool:
+    # UPDATE bersyarat: atomik walau dua worker merotasi token yang sama bersamaan
+    result = db.execute(
+        update(models.UserSession)
+        .where(
+            models.UserSession.sid == sid,
+            models.UserSession.refresh_hash == expected_hash,
+            models.UserSession.revoked.is_(False),
+        )
+        .values(previous_hash=expected_hash, refresh_hash=new_hash, expires_at=_utc(expires_at))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def _sql_revoke(db, sid: str):
+    db.execute(
+        update(models.UserSession).where(models.UserSession.sid == sid).values(revoked=True)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def _sql_sweep(db, now: float) -> int:
+    # memakai index ix_user_sessions_expires_at
+    result = db.execute(
+        delete(models.UserSession).where(models.UserSession.expires_at <= _utc(now))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+class SQLSessionStore:
+    # Session DB sendiri supaya bisa dipakai dari mana saja (rotate/revoke/sweep);
+    # get() memakai session request kalau diberikan
+    async def _run(self, fn, *args):
+        if database.AsyncSessionLocal is not None:
+            async with database.AsyncSessionLocal() as db:
+                return await db.run_sync(fn, *args)
+        db = database.SessionLocal()
+        try:
+            return await run_in_threadpool(fn, db, *args)
+        finally:
+            db.close()
+
+    async def add(self, record: SessionRecord):
+        await self._run(_sql_add, record)
+
+    async def get(self, sid: str, db=None) -> Optional[SessionRecord]:
+        if db is not None:
+            return await database.run_sync(db, _sql_get, sid)
+        return await self._run(_sql_get, sid)
+
+    async def swap(self, sid: str, expected_hash: str, new_hash: str, expires_at: float) -> bool:
+        return await self._run(_sql_swap, sid, expected_hash, new_hash, expires_at)
+
+    async def revoke(self, sid: str):
+        await self._run(_sql_revoke, sid)
+
+    async def sweep(self, now: float) -> int:
+        return await self._run(_sql_sweep, now)
+
+
+class RedisSessionStore:
+    # client: redis.asyncio.Redis atau FakeRedis (app/response_cache.py).
+    # Record disimpan sebagai JSON dengan TTL = sisa umur sesi; sweep tidak perlu.
+    # swap/revoke = WATCH + GET + MULTI/SET/EXEC: kalau key berubah di antara GET
+    # dan EXEC (rotasi/revoke bersamaan), EXEC gagal dengan WatchError.
+    def __init__(self, client, prefix: str = "pjblms:session:"):
+        self.client = client
+        self.prefix = prefix
+
+    def _encode(self, record: SessionRecord) -> tuple:
+        # → (json, ttl detik)
+        return json.dumps(record.to_dict()), max(int(record.expires_at - time.time()), 1)
+
+    async def add(self, record: SessionRecord):
+        value, ttl = self._encode(record)
+        await self.client.set(self.prefix + record.sid, value, ex=ttl)
+
+    async def get(self, sid: str, db=None) -> Optional[SessionRecord]:
+        raw = await self.client.get(self.prefix + sid)
+        return SessionRecord(**json.loads(raw)) if raw else None
+
+    async def _update(self, sid: str, change) -> bool:
+        # change(record) mengubah record in-place; False = tidak ada yang ditulis
+        key = self.prefix + sid
+        async with self.client.pipeline(transaction=True) as pipe:
+            await pipe.watch(key)
+            raw = await pipe.get(key)
+            record = SessionRecord(**json.loads(raw)) if raw else None
+            if record is None or not change(record):
+                return False
+            value, ttl = self._encode(record)
+            pipe.multi()
+            pipe.set(key, value, ex=ttl)
+            await pipe.execute()
+            return True
+
+    async def swap(self, sid: str, expected_hash: str, new_hash: str, expires_at: float) -> bool:
+        def change(record):
+            if record.revoked or record.refresh_hash != expected_hash:
+                return False
+            record.previous_hash, record.refresh_hash, record.expires_at = expected_hash, new_hash, expires_at
+            return True
+
+        try:
+            return await self._update(sid, change)
+        except WatchError:
+            return False  # sudah dirotasi/di-revoke request lain
+
+    async def revoke(self, sid: str):
+        def change(record):
+            record.revoked = True
+            return True
+
+        # revoke harus menang atas rotasi bersamaan: ulangi sampai EXEC berhasil
+        while True:
+            try:
+                await self._update(sid, change)
+                return
+            except WatchError:
+                continue
+
+    async def sweep(self, now: float) -> int:
+        return 0
+
+
+def create_store(spec: str = SESSION_STORE):
+    if spec == "memory":
+        return MemorySessionStore()
+    if spec == "sql":
+        return SQLSessionStore()
+    if spec == "fake://":
+        from app.response_cache import FakeRedis
+
+        return RedisSessionStore(FakeRedis())
+    if spec.startswith(("redis://", "rediss://")):
+        # Import di sini supaya mode default tidak butuh paket redis
+        import redis.asyncio
+
+        return RedisSessionStore(redis.asyncio.Redis.from_url(spec))
+    raise ValueError(f"SESSION_STORE tidak dikenal: {spec!r}")
+
+
+store = create_store()
+revocation_cache = TTLCache(maxsize=REVOCATION_CACHE_SIZE, ttl=REVOCATION_CACHE_TTL)
+# Sesi yang sudah revoked tidak akan aktif lagi: cukup diingat selama umur access token
+_REVOKED_TTL = tokens.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+
+# --- Operasi sesi ---
+def _invalid_refresh():
+    return HTTPException(status_code=401, detail="Invalid refresh token")
+
+
+async def create_session(user: models.User) -> tuple:
+    # → (sid, refresh_token)
+    sid = secrets.token_urlsafe(16)
+    secret = secrets.token_urlsafe(32)
+    expires_at = time.time() + REFRESH_TOKEN_EXPIRE_DAYS * 86400
+    await store.add(SessionRecord(sid, user.id, user.email, _hash(secret), expires_at))
+    return sid, f"{sid}.{secret}"
+
+
+async def rotate(refresh_token: str) -> tuple:
+    # → (SessionRecord, refresh_token_baru); 401 kalau tidak valid/kedaluwarsa/revoked
+    sid, _, secret = refresh_token.partition(".")
+    if not sid or not secret:
+        raise _invalid_refresh()
+    record = await store.get(sid)
+    if record is None or record.revoked or record.expires_at <= time.time():
+        raise _invalid_refresh()
+
+    presented = _hash(secret)
+    if not hmac.compare_digest(presented, record.refresh_hash):
+        if record.previous_hash and hmac.compare_digest(presented, record.previous_hash):
+            logger.warning("Refresh token lama dipakai ulang, sesi di-revoke: sid=%s user_id=%s", sid, record.user_id)
+            await revoke(sid)
+        raise _invalid_refresh()
+
+    new_secret = secrets.token_urlsafe(32)
+    expires_at = time.time() + REFRESH_TOKEN_EXPIRE_DAYS * 86400
+    if not await store.swap(sid, record.refresh_hash, _hash(new_secret), expires_at):
+        raise _invalid_refresh()  # sudah dirotasi request lain
+    return record, f"{sid}.{new_secret}"
+
+
+async def revoke(sid: str):
+    await store.revoke(sid)
+    revocation_cache.set(sid, True, ttl=_REVOKED_TTL)
+
+
+async def is_revoked(sid: str, db=None) -> bool:
+    # db: session request (opsional), dipakai store SQL saat cache miss
+    revoked = revocation_cache.get(sid)
+    if revoked is None:
+        record = await store.get(sid, db)
+        # sesi yang sudah hilang (expired + di-sweep, user dihapus) dianggap revoked
+        revoked = record is None or record.revoked or record.expires_at <= time.time()
+        revocation_cache.set(sid, revoked, ttl=_REVOKED_TTL if revoked else REVOCATION_CACHE_TTL)
+    return revoked
+
+
+async def sweep() -> int:
+    return await store.sweep(time.time())
+
+
+async def sweep_forever(interval: float = SESSION_SWEEP_INTERVAL):
+    # Dijalankan sebagai background task dari lifespan app
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed = await sweep()
+            if removed:
+                logger.info("Sweep sesi: %s sesi kedaluwarsa dihapus", removed)
+        except Exception:
+            logger.exception("Sweep sesi gagal")
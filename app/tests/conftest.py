@@ -1,8 +1,15 @@
 import pytest
 from sqlalchemy.orm import sessionmaker
 from app.database import engine, Base
+from app import ratelimit
 from app.tests.utils import create_user
 
+# Semua test login dari IP "testclient": rate limiter di-reset per test
+@pytest.fixture(autouse=True)
+def reset_rate_limit():
+    ratelimit.reset()
+    yield
+
 # Fixture untuk membuat session database
 @pytest.fixture(scope="function")
 def db_session():
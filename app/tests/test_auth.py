@@ -2,7 +2,7 @@
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
-from app import database, models, auth
+from app import database, models, auth, hashing
 
 client = TestClient(app)
 
@@ -124,4 +124,60 @@ def test_role_access_denied_for_mahasiswa():
         json={"project_id": 1, "student_id": 1}
     )
     assert response.status_code == 403
-    assert response.json()["detail"] == "Forbidden"
\ No newline at end of file
+    assert response.json()["detail"] == "Forbidden"
+# ===== Tests principal cache =====
+def test_current_user_served_from_principal_cache():
+    create_user_helper("cached@example.com", "cachepass")
+    token = get_token("cached@example.com", "cachepass")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    client.get("/auth/me", headers=headers)
+    before = auth.principal_cache.stats()
+    response = client.get("/auth/me", headers=headers)
+    after = auth.principal_cache.stats()
+
+    assert response.status_code == 200
+    assert after["hits"] == before["hits"] + 1
+    assert after["misses"] == before["misses"]
+
+def test_principal_cache_invalidated_on_role_change():
+    create_user_helper("promote@example.com", "promotepass")
+    token = get_token("promote@example.com", "promotepass")
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/auth/me", headers=headers).json()["role"] == "mahasiswa"
+
+    db = database.SessionLocal()
+    user = db.query(models.User).filter(models.User.email == "promote@example.com").first()
+    user.role = "dosen"
+    db.commit()
+    db.close()
+
+    assert client.get("/auth/me", headers=headers).json()["role"] == "dosen"
+
+# ===== Tests hashing pool =====
+def test_login_rehashes_outdated_password_hash():
+    from passlib.hash import bcrypt
+    db = database.SessionLocal()
+    db.add(models.User(
+        email="rehash@example.com",
+        hashed_password=bcrypt.using(rounds=4).hash("rehashpass"),
+        role="mahasiswa"
+    ))
+    db.commit()
+    db.close()
+
+    response = client.post("/auth/login", json={"email": "rehash@example.com", "password": "rehashpass"})
+    assert response.status_code == 200
+
+    db = database.SessionLocal()
+    user = db.query(models.User).filter(models.User.email == "rehash@example.com").first()
+    db.close()
+    assert not auth.pwd_context.needs_update(user.hashed_password)
+    assert auth.verify_password("rehashpass", user.hashed_password)
+
+def test_login_rejected_when_hashing_pool_saturated(monkeypatch):
+    create_user_helper("busy@example.com", "busypass")
+    monkeypatch.setattr(hashing.pool, "max_queue", 0)
+    response = client.post("/auth/login", json={"email": "busy@example.com", "password": "busypass"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == hashing.HASH_POOL_RETRY_AFTER
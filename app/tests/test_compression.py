@@ -0,0 +1,115 @@
+# app/tests/test_compression.py
+import gzip
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app import compression, database, models, response_cache
+from app.auth import create_access_token
+
+client = TestClient(app)
+
+# ===== Fixture setup/teardown DB =====
+@pytest.fixture(autouse=True)
+def setup_db():
+    db = database.SessionLocal()
+    db.query(models.ProjectAssignment).delete()
+    db.query(models.Material).delete()
+    db.query(models.Project).delete()
+    db.query(models.User).delete()
+    db.commit()
+    db.close()
+    yield
+    db = database.SessionLocal()
+    db.query(models.ProjectAssignment).delete()
+    db.query(models.Material).delete()
+    db.query(models.Project).delete()
+    db.query(models.User).delete()
+    db.commit()
+    db.close()
+
+# ===== Helper buat user/project/material =====
+def create_user_helper(email, role="admin"):
+    db = database.SessionLocal()
+    user = models.User(email=email, full_name="Test User", hashed_password="fakehash", role=role)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.close()
+    token = create_access_token({"sub": email})
+    return {"Authorization": f"Bearer {token}"}, user
+
+def create_materials_helper(owner_id, count=20):
+    db = database.SessionLocal()
+    project = models.Project(title="Proj", description="Desc", owner_id=owner_id)
+    db.add(project)
+    db.flush()
+    db.add_all([
+        models.Material(project_id=project.id, title=f"Materi {i}", content="Isi materi " * 20)
+        for i in range(count)
+    ])
+    db.commit()
+    db.refresh(project)
+    db.close()
+    return project
+
+# ===== Tests =====
+def test_negotiate_respects_q_values():
+    assert compression.negotiate("") is None
+    assert compression.negotiate("identity") is None
+    assert compression.negotiate("gzip;q=0, deflate") is None
+    assert compression.negotiate("deflate, gzip;q=0.5") == "gzip"
+    assert compression.negotiate("*") == compression.supported_encodings()[0]
+    assert compression.negotiate("*, gzip;q=0") == ("br" if compression.brotli else None)
+
+def test_large_list_is_gzipped():
+    headers, admin = create_user_helper("admin@example.com")
+    create_materials_helper(admin.id)
+    response = client.get("/materials/", headers={**headers, "Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.headers["etag"].startswith("W/")
+    assert len(response.json()) == 10
+
+def test_small_response_not_compressed():
+    headers, _ = create_user_helper("admin@example.com")
+    response = client.get("/materials/", headers={**headers, "Accept-Encoding": "gzip"})
+    assert response.json() == []
+    assert "content-encoding" not in response.headers
+
+def test_identity_when_not_accepted():
+    headers, admin = create_user_helper("admin@example.com")
+    create_materials_helper(admin.id)
+    response = client.get("/materials/", headers={**headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert len(response.json()) == 10
+
+def test_compressed_variant_cached(monkeypatch):
+    headers, admin = create_user_helper("admin@example.com")
+    create_materials_helper(admin.id)
+    headers = {**headers, "Accept-Encoding": "gzip"}
+    first = client.get("/materials/", headers=headers)
+
+    calls = []
+    original = compression.compress
+    monkeypatch.setattr(compression, "compress", lambda body, encoding: calls.append(encoding) or original(body, encoding))
+    hits = response_cache.stats.hits
+    again = client.get("/materials/", headers=headers)
+    assert response_cache.stats.hits == hits + 1
+    assert calls == []  # bytes gzip diambil dari cache, tidak dikompres ulang
+    assert again.headers["content-encoding"] == "gzip"
+    assert again.content == first.content
+
+def test_streaming_export_compressed():
+    headers, admin = create_user_helper("admin@example.com")
+    create_materials_helper(admin.id, count=50)
+    with client.stream(
+        "GET", "/export/materials?format=ndjson", headers={**headers, "Accept-Encoding": "gzip"}
+    ) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        raw = b"".join(response.iter_raw())
+    lines = gzip.decompress(raw).decode().splitlines()
+    assert len(lines) == 50
+    assert json.loads(lines[0])["title"] == "Materi 0"
@@ -0,0 +1,123 @@
+# app/tests/test_database.py
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.pool import NullPool
+from app.main import app
+from app import database, models
+from app.auth import create_access_token
+
+# ===== Helper =====
+def metrics_delta(before, key):
+    return database.pool_metrics.snapshot()[key] - before[key]
+
+# ===== Tests =====
+def test_pool_kwargs_internal_mode(monkeypatch):
+    monkeypatch.setattr(database, "DB_POOL_MODE", "internal")
+    monkeypatch.setattr(database, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(database, "DB_MAX_OVERFLOW", 3)
+    kwargs = database._pool_kwargs("postgresql://u:p@db/app", database.TimedQueuePool)
+    assert kwargs["poolclass"] is database.TimedQueuePool
+    assert (kwargs["pool_size"], kwargs["max_overflow"]) == (7, 3)
+    assert kwargs["pool_timeout"] == database.DB_POOL_TIMEOUT
+    assert kwargs["pool_recycle"] == database.DB_POOL_RECYCLE
+    assert kwargs["pool_pre_ping"] == database.DB_POOL_PRE_PING
+
+def test_pool_kwargs_external_mode(monkeypatch):
+    monkeypatch.setattr(database, "DB_POOL_MODE", "external")
+    kwargs = database._pool_kwargs("postgresql://u:p@pgbouncer/app", database.TimedQueuePool)
+    assert kwargs["poolclass"] is NullPool
+    assert "pool_size" not in kwargs and "max_overflow" not in kwargs
+
+def test_pool_kwargs_memory_sqlite_uses_default_pool(monkeypatch):
+    monkeypatch.setattr(database, "DB_POOL_MODE", "internal")
+    assert "poolclass" not in database._pool_kwargs("sqlite:///:memory:", database.TimedQueuePool)
+
+def test_pool_stats_reports_checkout_and_wait(monkeypatch, tmp_path):
+    monkeypatch.setattr(database, "DB_POOL_MODE", "internal")
+    monkeypatch.setattr(database, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(database, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(database, "DB_POOL_TIMEOUT", 0.05)
+    engine = database.create_db_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(database, "DB_ASYNC", False)
+    before = database.pool_metrics.snapshot()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            stats = database.pool_stats()
+            assert stats["pool_class"] == "TimedQueuePool"
+            assert (stats["size"], stats["checked_out"], stats["overflow"]) == (1, 1, 0)
+            assert metrics_delta(before, "acquisitions") == 1
+
+            # pool penuh → menunggu sampai DB_POOL_TIMEOUT lalu TimeoutError
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+            assert metrics_delta(before, "timeouts") == 1
+            assert database.pool_metrics.snapshot()["wait_time_max_ms"] >= 50
+
+        assert database.pool_stats()["checked_out"] == 0
+    finally:
+        engine.dispose()
+
+def test_async_connect_args_for_external_pooler(monkeypatch):
+    url = "postgresql+asyncpg://u:p@pgbouncer/app"
+    monkeypatch.setattr(database, "DB_POOL_MODE", "external")
+    args = database._async_connect_args(url)
+    assert args["statement_cache_size"] == 0
+    assert args["prepared_statement_cache_size"] == 0
+    assert database._async_connect_args("sqlite+aiosqlite:///./x.db") == {}
+
+    monkeypatch.setattr(database, "DB_POOL_MODE", "internal")
+    assert "statement_cache_size" not in database._async_connect_args(url)
+
+def test_routes_run_with_async_session(monkeypatch):
+    # NullPool: koneksi aiosqlite tidak dipakai lintas event loop (TestClient vs asyncio.run)
+    monkeypatch.setattr(database, "DB_POOL_MODE", "external")
+    async_engine = database.create_async_db_engine()
+    monkeypatch.setattr(
+        database, "AsyncSessionLocal", async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    )
+    route_sessions, orm_sessions = [], []
+
+    async def recording_async_db():
+        async for db in database.get_async_db():
+            route_sessions.append(db)
+            yield db
+
+    def list_titles(db):
+        orm_sessions.append(db)
+        return [p.title for p in db.query(models.Project).order_by(models.Project.id)]
+
+    db = database.SessionLocal()
+    db.query(models.Project).delete()
+    db.query(models.User).delete()
+    db.add(models.User(email="async@example.com", hashed_password="fakehash", role="admin"))
+    db.commit()
+    db.close()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'async@example.com'})}"}
+
+    app.dependency_overrides[database.get_db] = recording_async_db
+    try:
+        with TestClient(app) as client:
+            created = client.post("/projects/", json={"title": "Async", "description": "x"}, headers=headers)
+            assert created.status_code == 200
+            assert [p["title"] for p in client.get("/projects/", headers=headers).json()] == ["Async"]
+        assert route_sessions and all(isinstance(s, AsyncSession) for s in route_sessions)
+
+        async def scenario():
+            async with database.AsyncSessionLocal() as session:
+                return await database.run_sync(session, list_titles)
+
+        assert asyncio.run(scenario()) == ["Async"]
+        # fungsi ORM sync menerima Session milik AsyncSession (greenlet, bukan threadpool)
+        assert not isinstance(orm_sessions[0], AsyncSession)
+    finally:
+        app.dependency_overrides.pop(database.get_db, None)
+        db = database.SessionLocal()
+        db.query(models.Project).delete()
+        db.query(models.User).delete()
+        db.commit()
+        db.close()
@@ -0,0 +1,84 @@
+# app/tests/test_export.py
+import csv
+import io
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app import database, models
+from app.auth import create_access_token
+
+client = TestClient(app)
+
+# ===== Fixture setup/teardown DB =====
+@pytest.fixture(autouse=True)
+def setup_db():
+    db = database.SessionLocal()
+    db.query(models.ProjectAssignment).delete()
+    db.query(models.Material).delete()
+    db.query(models.Project).delete()
+    db.query(models.User).delete()
+    db.commit()
+    db.close()
+    yield
+    db = database.SessionLocal()
+    db.query(models.ProjectAssignment).delete()
+    db.query(models.Material).delete()
+    db.query(models.Project).delete()
+    db.query(models.User).delete()
+    db.commit()
+    db.close()
+
+# ===== Helper buat user/project/material =====
+def create_user_helper(email, role="admin"):
+    db = database.SessionLocal()
+    user = models.User(email=email, full_name="Test User", hashed_password="fakehash", role=role)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.close()
+    token = create_access_token({"sub": email})
+    return {"Authorization": f"Bearer {token}"}, user
+
+def create_project_helper(owner_id, title="Project Test"):
+    db = database.SessionLocal()
+    project = models.Project(title=title, description="Desc", owner_id=owner_id)
+    db.add(project)
+    db.commit()
+    db.refresh(project)
+    db.close()
+    return project
+
+# ===== Tests =====
+def test_export_projects_ndjson_scoped_for_mahasiswa():
+    _, admin = create_user_helper("adminexport@test.com")
+    headers_mhs, mahasiswa = create_user_helper("mhsexport@test.com", role="mahasiswa")
+    assigned = create_project_helper(admin.id, "Assigned")
+    create_project_helper(admin.id, "Hidden")
+
+    db = database.SessionLocal()
+    db.add(models.ProjectAssignment(user_id=mahasiswa.id, project_id=assigned.id))
+    db.commit()
+    db.close()
+
+    response = client.get("/export/projects", headers=headers_mhs)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [(r["id"], r["title"]) for r in rows] == [(assigned.id, "Assigned")]
+
+def test_export_assignments_csv_for_admin():
+    headers, admin = create_user_helper("adminexport2@test.com")
+    _, mahasiswa = create_user_helper("mhsexport2@test.com", role="mahasiswa")
+    project = create_project_helper(admin.id)
+
+    db = database.SessionLocal()
+    db.add(models.ProjectAssignment(user_id=mahasiswa.id, project_id=project.id))
+    db.commit()
+    db.close()
+
+    response = client.get("/export/assignments", params={"format": "csv"}, headers=headers)
+    assert response.status_code == 200
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "project_id", "user_id", "assigned_at"]
+    assert [(int(r[1]), int(r[2])) for r in rows[1:]] == [(project.id, mahasiswa.id)]
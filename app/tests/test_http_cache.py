@@ -0,0 +1,146 @@
+# app/tests/test_http_cache.py
+from datetime import datetime, timezone
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app import database, models, query_audit, versioning
+from app.auth import create_access_token
+
+client = TestClient(app)
+
+# ===== Fixture setup/teardown DB =====
+@pytest.fixture(autouse=True)
+def setup_db():
+    db = database.SessionLocal()
+    db.query(models.ProjectAssignment).delete()
+    db.query(models.Material).delete()
+    db.query(models.Project).delete()
+    db.query(models.User).delete()
+    db.commit()
+    db.close()
+    yield
+    db = database.SessionLocal()
+    db.query(models.ProjectAssignment).delete()
+    db.query(models.Material).delete()
+    db.query(models.Project).delete()
+    db.query(models.User).delete()
+    db.commit()
+    db.close()
+
+# ===== Helper buat user/project =====
+def create_user_helper(email, role="admin"):
+    db = database.SessionLocal()
+    user = models.User(email=email, full_name="Test User", hashed_password="fakehash", role=role)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.close()
+    token = create_access_token({"sub": email})
+    return {"Authorization": f"Bearer {token}"}, user
+
+def read_versions():
+    db = database.SessionLocal()
+    versions = versioning.get_versions(db, models.VERSIONED_TABLES)
+    db.close()
+    return {name: version for name, (version, _) in versions.items()}
+
+# ===== Tests =====
+def test_list_projects_conditional_get():
+    headers, _ = create_user_helper("admin@example.com")
+    client.post("/projects/", json={"title": "A", "description": "x"}, headers=headers)
+
+    response = client.get("/projects/", headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    assert "Last-Modified" in response.headers
+
+    # 304 cukup satu query versi, tanpa query list
+    with query_audit.assert_max_queries(1):
+        cached = client.get("/projects/", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    client.post("/projects/", json={"title": "B", "description": "y"}, headers=headers)
+    fresh = client.get("/projects/", headers={**headers, "If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+    assert len(fresh.json()) == 2
+
+def test_etag_invalid_after_counter_reset():
+    headers, _ = create_user_helper("admin@example.com")
+    client.post("/projects/", json={"title": "A", "description": "x"}, headers=headers)
+    etag = client.get("/projects/", headers=headers).headers["ETag"]
+
+    # counter di-reset (tabel dibuat ulang) lalu naik lagi ke versi yang sama
+    db = database.SessionLocal()
+    db.query(models.ChangeCounter).update({"updated_at": datetime(2000, 1, 1, tzinfo=timezone.utc)})
+    db.commit()
+    db.close()
+    response = client.get("/projects/", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+def test_etag_differs_per_query_and_user():
+    admin_headers, _ = create_user_helper("admin@example.com")
+    dosen_headers, _ = create_user_helper("dosen@example.com", role="dosen")
+    a = client.get("/projects/", headers=admin_headers).headers["ETag"]
+    b = client.get("/projects/?limit=5", headers=admin_headers).headers["ETag"]
+    c = client.get("/projects/", headers=dosen_headers).headers["ETag"]
+    assert len({a, b, c}) == 3
+
+def test_mahasiswa_cache_control_and_materials_etag():
+    headers, _ = create_user_helper("student@example.com", role="mahasiswa")
+    response = client.get("/materials/", headers=headers)
+    assert response.headers["Cache-Control"].startswith("private, max-age=")
+    assert client.get(
+        "/materials/", headers={**headers, "If-None-Match": response.headers["ETag"]}
+    ).status_code == 304
+
+def test_bulk_writes_bump_versions():
+    headers, admin = create_user_helper("admin@example.com")
+    project = client.post("/projects/", json={"title": "A", "description": "x"}, headers=headers).json()
+    before = read_versions()
+    body = b'{"project_id": %d, "title": "M1"}\n{"project_id": %d, "title": "M2"}\n' % (project["id"], project["id"])
+    client.post("/materials/bulk", content=body, headers={**headers, "Content-Type": "application/x-ndjson"})
+    after = read_versions()
+    assert after["materials"] > before["materials"]
+    assert after["projects"] == before["projects"]
+
+def test_rollback_does_not_bump_versions():
+    before = read_versions()
+    db = database.SessionLocal()
+    db.add(models.Project(title="Rolled back", description="x"))
+    db.flush()
+    db.rollback()
+    db.close()
+    assert read_versions() == before
+
+def test_etag_is_bound_to_path():
+    admin_headers, _ = create_user_helper("admin@example.com")
+    headers, student = create_user_helper("student@example.com", role="mahasiswa")
+    assigned = client.post("/projects/", json={"title": "A", "description": "x"}, headers=admin_headers).json()
+    hidden = client.post("/projects/", json={"title": "B", "description": "y"}, headers=admin_headers).json()
+    client.post("/projects/assign", json={"project_id": assigned["id"], "user_id": student.id}, headers=admin_headers)
+
+    list_etag = client.get("/projects/", headers=headers).headers["ETag"]
+    detail_etag = client.get(f"/projects/{assigned['id']}", headers=headers).headers["ETag"]
+    assert list_etag != detail_etag
+
+    # ETag URL lain tidak boleh membuat project yang tidak di-assign jadi 304
+    for etag in (list_etag, detail_etag):
+        response = client.get(f"/projects/{hidden['id']}", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 404
+
+def test_wildcard_and_if_modified_since_require_visible_resource():
+    admin_headers, _ = create_user_helper("admin@example.com")
+    headers, _ = create_user_helper("student@example.com", role="mahasiswa")
+    hidden = client.post("/projects/", json={"title": "A", "description": "x"}, headers=admin_headers).json()
+    last_modified = client.get("/projects/", headers=admin_headers).headers["Last-Modified"]
+
+    for conditional in ({"If-None-Match": "*"}, {"If-Modified-Since": last_modified}):
+        assert client.get("/projects/99999", headers={**admin_headers, **conditional}).status_code == 404
+        assert client.get(f"/projects/{hidden['id']}", headers={**headers, **conditional}).status_code == 404
+        # resource yang ada & terlihat tetap 304
+        assert client.get(f"/projects/{hidden['id']}", headers={**admin_headers, **conditional}).status_code == 304
@@ -0,0 +1,39 @@
+# app/tests/test_logger.py
+import json
+import logging
+import queue
+from app.logger import BoundedQueueHandler, JsonFormatter, SamplingFilter, parse_sampling
+
+def make_record(msg="hello %s", args=("world",), level=logging.INFO, module="auth", lineno=10, **extra):
+    record = logging.makeLogRecord({
+        "name": "pjblms_logger", "msg": msg, "args": args, "levelno": level,
+        "levelname": logging.getLevelName(level), "module": module, "lineno": lineno, **extra,
+    })
+    return record
+
+# ===== Tests =====
+def test_parse_sampling():
+    assert parse_sampling("auth:100, projects:5") == {"auth": 100, "projects": 5}
+    assert parse_sampling("") == {}
+
+def test_sampling_filter_keeps_one_in_n_info_and_all_warnings():
+    sampler = SamplingFilter({"auth": 10})
+    kept = sum(sampler.filter(make_record()) for _ in range(100))
+    assert kept == 10
+    assert all(sampler.filter(make_record(level=logging.WARNING)) for _ in range(5))
+    assert all(sampler.filter(make_record(module="projects")) for _ in range(5))
+
+def test_json_formatter_includes_extra_fields():
+    line = JsonFormatter().format(make_record(request_id="abc", status=200))
+    payload = json.loads(line)
+    assert payload["message"] == "hello world"
+    assert payload["request_id"] == "abc"
+    assert payload["status"] == 200
+
+def test_bounded_queue_handler_drops_on_overflow():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2), overflow="drop")
+    for _ in range(5):
+        handler.handle(make_record())
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+    assert handler.queue.get_nowait().msg == "hello world"
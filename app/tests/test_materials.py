@@ -107,4 +107,61 @@ def test_delete_material():
     db = database.SessionLocal()
     deleted = db.query(models.Material).filter_by(id=material.id).first()
     db.close()
-    assert deleted is None
\ No newline at end of file
+    assert deleted is None
+def test_bulk_ingest_materials_ndjson():
+    headers, user = create_user_helper("adminbulk@example.com", role="admin")
+    project = create_project_helper(user.id)
+    existing = create_material_helper(project.id)
+
+    body = "\n".join([
+        f'{{"project_id": {project.id}, "title": "Bab 1", "content": "Isi 1"}}',
+        "",
+        f'{{"project_id": {project.id}, "title": "Bab 2"}}',
+        '{"project_id": 999999, "title": "Salah project"}',
+        "bukan json",
+        f'{{"id": {existing.id}, "project_id": {project.id}, "title": "Materi diupdate", "content": "Baru"}}',
+    ]).encode()
+
+    def chunks():
+        # kirim bertahap supaya baris terpotong di tengah chunk
+        for i in range(0, len(body), 7):
+            yield body[i:i + 7]
+
+    response = client.post(
+        "/materials/bulk",
+        content=chunks(),
+        headers={**headers, "Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["lines"], data["created"], data["updated"], data["failed"]) == (5, 2, 1, 2)
+    assert [e["line"] for e in data["errors"]] == [4, 5]
+
+    db = database.SessionLocal()
+    titles = sorted(m.title for m in db.query(models.Material).filter_by(project_id=project.id))
+    db.close()
+    assert titles == ["Bab 1", "Bab 2", "Materi diupdate"]
+
+def test_list_materials_summary_view_omits_content():
+    headers, admin = create_user_helper("adminsummary@example.com", role="admin")
+    project = create_project_helper(admin.id)
+    material = create_material_helper(project.id)
+
+    response = client.get("/materials/?view=summary", headers=headers)
+    assert response.status_code == 200
+    item = response.json()[0]
+    assert item["id"] == material.id
+    assert set(item) == {"id", "created_at", "project_id", "title"}
+
+def test_list_materials_sparse_fields_with_cursor():
+    headers, admin = create_user_helper("adminfields@example.com", role="admin")
+    project = create_project_helper(admin.id)
+    for _ in range(3):
+        create_material_helper(project.id)
+
+    response = client.get("/materials/?fields=title&limit=2&cursor=", headers=headers)
+    data = response.json()
+    assert [set(item) for item in data["items"]] == [{"id", "created_at", "title"}] * 2
+    rest = client.get(f"/materials/?fields=title&limit=2&cursor={data['next_cursor']}", headers=headers)
+    assert len(rest.json()["items"]) == 1
+    assert client.get("/materials/?fields=secret", headers=headers).status_code == 400
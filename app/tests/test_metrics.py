@@ -0,0 +1,74 @@
+# app/tests/test_metrics.py
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app import database, metrics, models
+from app.auth import create_access_token
+
+client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def setup_db():
+    db = database.SessionLocal()
+    db.query(models.User).delete()
+    db.commit()
+    db.close()
+    yield
+
+# ===== Helper functions =====
+def create_user_helper(email, role="admin"):
+    db = database.SessionLocal()
+    db.add(models.User(email=email, full_name="Test User", hashed_password="fakehash", role=role))
+    db.commit()
+    db.close()
+    token = create_access_token({"sub": email})
+    return {"Authorization": f"Bearer {token}"}
+
+def register_user(email, password="password123", role="mahasiswa"):
+    return client.post("/auth/register", json={
+        "email": email, "password": password, "role": role, "name": "Test User"
+    })
+
+def login_user(email, password="password123"):
+    response = client.post("/auth/login", json={"email": email, "password": password})
+    return response.json()["access_token"]
+
+# ===== Tests =====
+def test_metrics_exposition_format():
+    client.get("/")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert 'http_requests_total{method="GET",route="/",status="200"}' in body
+    assert "db_pool_acquisitions_total" in body
+
+def test_metrics_use_route_template():
+    headers = create_user_helper("dosen@example.com", role="dosen")
+    before = metrics.http_requests_total.value("DELETE", "/projects/{project_id}", "404")
+    client.delete("/projects/12345", headers=headers)
+    after = metrics.http_requests_total.value("DELETE", "/projects/{project_id}", "404")
+    assert after == before + 1
+    assert "/projects/12345" not in client.get("/metrics").text
+
+def test_metrics_count_db_queries_per_request():
+    register_user("student@example.com")
+    before = metrics.db_queries_total.value("/auth/login")
+    login_user("student@example.com")
+    assert metrics.db_queries_total.value("/auth/login") > before
+
+def test_metrics_unmatched_route():
+    client.get("/does-not-exist")
+    assert metrics.http_requests_total.value("GET", "unmatched", "404") >= 1
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram("test_latency", "test", ("route",), buckets=(0.1, 1.0))
+    histogram.observe("/x", value=0.05)
+    histogram.observe("/x", value=0.5)
+    histogram.observe("/x", value=5)
+    lines = histogram.render()
+    assert 'test_latency_bucket{route="/x",le="0.1"} 1' in lines
+    assert 'test_latency_bucket{route="/x",le="1"} 2' in lines
+    assert 'test_latency_bucket{route="/x",le="+Inf"} 3' in lines
+    assert 'test_latency_count{route="/x"} 3' in lines
@@ -0,0 +1,19 @@
+# app/tests/test_middleware.py
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+
+# ===== Tests request ID =====
+def test_request_id_generated():
+    response = client.get("/")
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"]
+
+def test_request_id_propagated():
+    response = client.get("/", headers={"X-Request-ID": "abc-123"})
+    assert response.headers["X-Request-ID"] == "abc-123"
+
+def test_request_id_too_long_replaced():
+    response = client.get("/", headers={"X-Request-ID": "x" * 500})
+    assert response.headers["X-Request-ID"] != "x" * 500
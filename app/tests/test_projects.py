@@ -1,9 +1,12 @@
 # app/tests/test_projects.py
 import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 from fastapi.testclient import TestClient
 from app.main import app
-from app import database, models
+from app import database, models, query_audit
 from app.auth import create_access_token
+from app.routes import projects as projects_routes
 
 client = TestClient(app)
 
@@ -12,6 +15,7 @@ client = TestClient(app)
 def setup_db():
     db = database.SessionLocal()
     db.query(models.ProjectAssignment).delete()
+    db.query(models.Material).delete()
     db.query(models.Project).delete()
     db.query(models.User).delete()
     db.commit()
@@ -19,6 +23,7 @@ def setup_db():
     yield
     db = database.SessionLocal()
     db.query(models.ProjectAssignment).delete()
+    db.query(models.Material).delete()
     db.query(models.Project).delete()
     db.query(models.User).delete()
     db.commit()
@@ -129,6 +134,40 @@ def test_assign_project_duplicate():
     assert response.status_code == 400
     assert response.json()["detail"] == "Project already assigned to this student"
 
+def test_assign_project_concurrent_duplicate(monkeypatch):
+    headers, admin = create_user_helper("adminrace@example.com", role="admin")
+    _, mahasiswa = create_user_helper("studentrace@example.com", role="mahasiswa")
+    project = create_project_helper(admin.id)
+    raced = []
+
+    # Request paralel meng-assign pasangan yang sama tepat setelah pengecekan
+    # "existing" lolos → commit kena unique constraint (IntegrityError)
+    def insert_concurrently(session, flush_context, instances):
+        if raced or not any(isinstance(obj, models.ProjectAssignment) for obj in session.new):
+            return
+        raced.append(True)
+        other = database.SessionLocal()
+        other.add(models.ProjectAssignment(user_id=mahasiswa.id, project_id=project.id))
+        other.commit()
+        other.close()
+
+    event.listen(Session, "before_flush", insert_concurrently)
+    try:
+        response = client.post(
+            "/projects/assign",
+            json={"user_id": mahasiswa.id, "project_id": project.id},
+            headers=headers
+        )
+    finally:
+        event.remove(Session, "before_flush", insert_concurrently)
+
+    assert raced
+    assert response.status_code == 400
+    assert response.json()["error"] == "Project already assigned to this student"
+    db = database.SessionLocal()
+    assert db.query(models.ProjectAssignment).filter_by(project_id=project.id).count() == 1
+    db.close()
+
 def test_assign_project_not_found():
     headers, admin = create_user_helper("adminnf@example.com", role="admin")
     _, mahasiswa = create_user_helper("studentnf@example.com", role="mahasiswa")
@@ -150,4 +189,189 @@ def test_assign_project_forbidden_mahasiswa():
         headers=headers
     )
     assert response.status_code == 403
-    assert response.json()["detail"] == "Forbidden"
\ No newline at end of file
+    assert response.json()["detail"] == "Forbidden"
+# --- Test Cursor Pagination ---
+def test_list_projects_cursor_pagination():
+    headers, admin = create_user_helper("admincursor@example.com", role="admin")
+    created = [create_project_helper(admin.id).id for _ in range(5)]
+
+    seen = []
+    cursor = ""
+    while True:
+        response = client.get("/projects/", params={"limit": 2, "cursor": cursor}, headers=headers)
+        assert response.status_code == 200
+        page = response.json()
+        seen.extend(p["id"] for p in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    # urutan terbaru dulu, tanpa duplikat antar halaman
+    assert seen == sorted(created, reverse=True)
+
+def test_list_projects_invalid_cursor():
+    headers, _ = create_user_helper("admincursor2@example.com", role="admin")
+    response = client.get("/projects/", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert response.status_code == 400
+
+# --- Test Bulk Assign ---
+def test_bulk_assign_json_reports_per_row():
+    headers, admin = create_user_helper("adminbulk@example.com", role="admin")
+    _, m1 = create_user_helper("bulk1@example.com", role="mahasiswa")
+    _, m2 = create_user_helper("bulk2@example.com", role="mahasiswa")
+    project = create_project_helper(admin.id)
+
+    db = database.SessionLocal()
+    db.add(models.ProjectAssignment(user_id=m2.id, project_id=project.id))
+    db.commit()
+    db.close()
+
+    response = client.post(
+        f"/projects/{project.id}/assign/bulk",
+        json={"user_ids": [m1.id, m2.id, m1.id, 999999]},
+        headers=headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [r["status"] for r in data["results"]] == [
+        "assigned", "already_assigned", "duplicate", "user_not_found"
+    ]
+    assert (data["assigned"], data["skipped"], data["failed"]) == (1, 2, 1)
+
+    db = database.SessionLocal()
+    count = db.query(models.ProjectAssignment).filter_by(project_id=project.id).count()
+    db.close()
+    assert count == 2
+
+def test_bulk_assign_csv_upload():
+    headers, admin = create_user_helper("adminbulkcsv@example.com", role="admin")
+    _, m1 = create_user_helper("bulkcsv1@example.com", role="mahasiswa")
+    project = create_project_helper(admin.id)
+
+    response = client.post(
+        f"/projects/{project.id}/assign/bulk",
+        content=f"user_id\n{m1.id}\nabc\n".encode(),
+        headers={**headers, "Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(r["line"], r["status"]) for r in results] == [(2, "assigned"), (3, "invalid")]
+
+def test_bulk_assign_csv_header_with_bom_and_casing():
+    headers, admin = create_user_helper("adminbulkbom@example.com", role="admin")
+    _, m1 = create_user_helper("bulkbom1@example.com", role="mahasiswa")
+    project = create_project_helper(admin.id)
+
+    response = client.post(
+        f"/projects/{project.id}/assign/bulk",
+        content=f"\ufeff  User_ID , Nama \r\n{m1.id},Budi\r\n".encode(),
+        headers={**headers, "Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [(r["line"], r["status"]) for r in data["results"]] == [(2, "assigned")]
+    assert data["failed"] == 0
+
+def test_bulk_assign_portable_fallback(monkeypatch):
+    # Dialect tanpa ON CONFLICT → select pasangan yang ada lalu insert sisanya
+    monkeypatch.setattr(projects_routes, "DIALECT_INSERTS", {})
+    headers, admin = create_user_helper("adminbulkfb@example.com", role="admin")
+    students = [create_user_helper(f"bulkfb{i}@example.com", role="mahasiswa")[1] for i in range(3)]
+    project = create_project_helper(admin.id)
+    db = database.SessionLocal()
+    db.add(models.ProjectAssignment(user_id=students[0].id, project_id=project.id))
+    db.commit()
+    db.close()
+    raced = []
+
+    # request paralel meng-assign students[1] tepat sebelum insert → IntegrityError
+    def insert_concurrently(session, flush_context, instances):
+        if raced or not any(isinstance(obj, models.ProjectAssignment) for obj in session.new):
+            return
+        raced.append(True)
+        other = database.SessionLocal()
+        other.add(models.ProjectAssignment(user_id=students[1].id, project_id=project.id))
+        other.commit()
+        other.close()
+
+    event.listen(Session, "before_flush", insert_concurrently)
+    try:
+        response = client.post(
+            f"/projects/{project.id}/assign/bulk",
+            json={"user_ids": [s.id for s in students]},
+            headers=headers
+        )
+    finally:
+        event.remove(Session, "before_flush", insert_concurrently)
+
+    assert raced and response.status_code == 200
+    data = response.json()
+    assert [r["status"] for r in data["results"]] == ["already_assigned", "already_assigned", "assigned"]
+    assert (data["assigned"], data["skipped"], data["failed"]) == (1, 2, 0)
+    db = database.SessionLocal()
+    assert db.query(models.ProjectAssignment).filter_by(project_id=project.id).count() == 3
+    db.close()
+
+def _seed_detail(owner_id, student_id, projects=3):
+    db = database.SessionLocal()
+    ids = []
+    for i in range(projects):
+        project = models.Project(title=f"Proj {i}", description="Desc", owner_id=owner_id)
+        project.materials = [models.Material(title=f"Mat {i}-{j}", content="Isi") for j in range(2)]
+        project.assignments = [models.ProjectAssignment(user_id=student_id)]
+        db.add(project)
+        db.flush()
+        ids.append(project.id)
+    db.commit()
+    db.close()
+    return ids
+
+def test_get_project_detail_with_materials_and_assignees():
+    headers, admin = create_user_helper("admindetail@example.com", role="admin")
+    _, student = create_user_helper("studentdetail@example.com", role="mahasiswa")
+    project_id = _seed_detail(admin.id, student.id, projects=1)[0]
+    with query_audit.assert_max_queries(query_audit.budget_for("GET", "/projects/{project_id}")):
+        response = client.get(f"/projects/{project_id}", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert [m["title"] for m in data["materials"]] == ["Mat 0-0", "Mat 0-1"]
+    assert data["assignees"][0]["email"] == "studentdetail@example.com"
+
+def test_get_project_detail_scoped_for_mahasiswa():
+    _, admin = create_user_helper("admindetail2@example.com", role="admin")
+    headers, student = create_user_helper("studentdetail2@example.com", role="mahasiswa")
+    project_id = _seed_detail(admin.id, student.id, projects=1)[0]
+    other = create_project_helper(admin.id)
+
+    response = client.get(f"/projects/{project_id}", headers=headers)
+    assert response.status_code == 200
+    assert "assignees" not in response.json()
+    assert len(response.json()["materials"]) == 2
+    assert client.get(f"/projects/{project_id}?include=assignees", headers=headers).status_code == 403
+    assert client.get(f"/projects/{other.id}", headers=headers).status_code == 404
+
+def test_list_projects_include_without_n_plus_one():
+    headers, admin = create_user_helper("admininclude@example.com", role="admin")
+    _, student = create_user_helper("studentinclude@example.com", role="mahasiswa")
+    _seed_detail(admin.id, student.id, projects=5)
+    with query_audit.assert_max_queries(query_audit.budget_for("GET", "/projects/")):
+        response = client.get("/projects/?include=materials,assignees", headers=headers)
+    items = response.json()
+    assert len(items) == 5
+    assert all(len(p["materials"]) == 2 and len(p["assignees"]) == 1 for p in items)
+
+    plain = client.get("/projects/", headers=headers).json()
+    assert "materials" not in plain[0]
+    assert client.get("/projects/?include=owner", headers=headers).status_code == 400
+
+def test_list_projects_projection():
+    headers, admin = create_user_helper("adminprojection@example.com", role="admin")
+    project = create_project_helper(admin.id)
+
+    summary = client.get("/projects/?view=summary", headers=headers).json()
+    assert summary == [{
+        "id": project.id, "created_at": summary[0]["created_at"], "title": "Test Proj", "owner_id": admin.id,
+    }]
+    fields = client.get("/projects/?fields=description", headers=headers).json()
+    assert set(fields[0]) == {"id", "created_at", "description"}
+    assert client.get("/projects/?fields=title&include=materials", headers=headers).status_code == 400
@@ -0,0 +1,160 @@
+# app/tests/test_query_audit.py
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app import auth, database, models, query_audit, response_cache
+from app.auth import create_access_token
+
+client = TestClient(app)
+
+# ===== Fixture setup/teardown DB =====
+@pytest.fixture(autouse=True)
+def setup_db():
+    db = database.SessionLocal()
+    db.query(models.UserSession).delete()
+    db.query(models.ProjectAssignment).delete()
+    db.query(models.Material).delete()
+    db.query(models.Project).delete()
+    db.query(models.User).delete()
+    db.commit()
+    db.close()
+    yield
+    db = database.SessionLocal()
+    db.query(models.UserSession).delete()
+    db.query(models.ProjectAssignment).delete()
+    db.query(models.Material).delete()
+    db.query(models.Project).delete()
+    db.query(models.User).delete()
+    db.commit()
+    db.close()
+
+# ===== Helper buat user/project =====
+def create_user_helper(email, role="admin"):
+    db = database.SessionLocal()
+    user = models.User(email=email, full_name="Test User", hashed_password="fakehash", role=role)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.close()
+    token = create_access_token({"sub": email})
+    return {"Authorization": f"Bearer {token}"}, user
+
+def create_projects_helper(owner_id, count):
+    db = database.SessionLocal()
+    for i in range(count):
+        project = models.Project(title=f"Proj {i}", description="Desc", owner_id=owner_id)
+        project.materials.append(models.Material(title=f"Mat {i}", content="Isi"))
+        db.add(project)
+    db.commit()
+    db.close()
+
+def seed_routes_helper():
+    # admin + dosen (pemilik 3 project) + 2 mahasiswa, satu sudah di-assign
+    headers, admin = create_user_helper("admin@example.com")
+    dosen_headers, dosen = create_user_helper("dosen@example.com", role="dosen")
+    _, student = create_user_helper("mhs@example.com", role="mahasiswa")
+    _, extra = create_user_helper("mhs2@example.com", role="mahasiswa")
+    create_projects_helper(dosen.id, 3)
+    db = database.SessionLocal()
+    projects = [p.id for p in db.query(models.Project).order_by(models.Project.id)]
+    materials = [m.id for m in db.query(models.Material).order_by(models.Material.id)]
+    db.add(models.ProjectAssignment(project_id=projects[0], user_id=student.id))
+    db.commit()
+    db.close()
+    client.post("/auth/register", json={"email": "login@example.com", "password": "pass123"})
+    login = client.post("/auth/login", json={"email": "login@example.com", "password": "pass123"}).json()
+    return {"admin": headers, "dosen": dosen_headers, None: {}}, {
+        "project": projects[0], "other": projects[1], "doomed": projects[2], "material": materials[1],
+        "student": student.id, "extra": extra.id, "refresh_token": login["refresh_token"],
+    }
+
+# (method, route) → (role, url, body); body/url diisi dari ids seed_routes_helper
+ROUTE_SCENARIOS = {
+    ("GET", "/projects/"): ("admin", "/projects/?include=materials,assignees", None),
+    ("GET", "/projects/{project_id}"): ("admin", "/projects/{project}", None),
+    ("GET", "/materials/"): ("admin", "/materials/", None),
+    ("GET", "/search/"): ("admin", "/search/?q=Proj", None),
+    ("POST", "/projects/"): ("dosen", "/projects/", {"title": "Baru", "description": "Desc"}),
+    ("PUT", "/projects/{project_id}"): ("dosen", "/projects/{project}", {"title": "Ubah", "description": "Desc"}),
+    ("DELETE", "/projects/{project_id}"): ("admin", "/projects/{doomed}", None),
+    ("POST", "/projects/assign"): ("admin", "/projects/assign", {"project_id": "{other}", "user_id": "{extra}"}),
+    ("POST", "/projects/{project_id}/assign/bulk"): (
+        "admin", "/projects/{project}/assign/bulk", {"user_ids": ["{student}", "{extra}"]},
+    ),
+    ("POST", "/materials/"): ("dosen", "/materials/", {"project_id": "{project}", "title": "M", "content": "Isi"}),
+    ("PUT", "/materials/{material_id}"): (
+        "dosen", "/materials/{material}", {"project_id": "{other}", "title": "M", "content": "Isi"},
+    ),
+    ("DELETE", "/materials/{material_id}"): ("dosen", "/materials/{material}", None),
+    ("POST", "/auth/login"): (None, "/auth/login", {"email": "login@example.com", "password": "pass123"}),
+    ("POST", "/auth/refresh"): (None, "/auth/refresh", {"refresh_token": "{refresh_token}"}),
+    ("POST", "/auth/register"): (None, "/auth/register", {"email": "baru@example.com", "password": "pass123"}),
+}
+
+def fill(value, ids):
+    if isinstance(value, dict):
+        return {key: fill(item, ids) for key, item in value.items()}
+    if isinstance(value, list):
+        return [fill(item, ids) for item in value]
+    if isinstance(value, str) and value.startswith("{") and value.endswith("}") and value[1:-1] in ids:
+        return ids[value[1:-1]]
+    return value.format(**ids) if isinstance(value, str) else value
+
+# ===== Tests =====
+def test_statement_shape_ignores_parameters():
+    a = query_audit.statement_shape("SELECT * FROM projects WHERE id IN (?, ?, ?) LIMIT 10")
+    b = query_audit.statement_shape("SELECT *\n  FROM projects WHERE id IN (?, ?) LIMIT 20")
+    assert a == b == "SELECT * FROM projects WHERE id IN (?) LIMIT ?"
+
+def test_list_projects_within_budget():
+    headers, user = create_user_helper("admin@example.com")
+    create_projects_helper(user.id, 5)
+    client.get("/projects/", headers=headers)  # isi cache principal
+    with query_audit.assert_max_queries(query_audit.budget_for("GET", "/projects/")):
+        response = client.get("/projects/", headers=headers)
+    assert len(response.json()) == 5
+
+def test_every_route_budget_has_scenario():
+    assert set(ROUTE_SCENARIOS) == set(query_audit.ROUTE_BUDGETS)
+
+@pytest.mark.parametrize("method, route", list(ROUTE_SCENARIOS))
+def test_route_within_budget(method, route):
+    headers, ids = seed_routes_helper()
+    role, url, body = ROUTE_SCENARIOS[(method, route)]
+    # kasus terburuk: cache principal dan response cache kosong
+    auth.invalidate_principal()
+    asyncio.run(response_cache.backend.clear())
+    with query_audit.assert_max_queries(query_audit.budget_for(method, route)):
+        response = client.request(method, fill(url, ids), json=fill(body, ids), headers=headers[role])
+    assert response.status_code < 400, response.text
+
+def test_lazy_load_loop_flagged_as_repeated():
+    _, user = create_user_helper("admin@example.com")
+    create_projects_helper(user.id, 4)
+    db = database.SessionLocal()
+    with pytest.raises(AssertionError, match="possible N\\+1"):
+        with query_audit.assert_max_queries(100):
+            for project in db.query(models.Project).all():
+                project.materials
+    db.close()
+
+def test_dev_header_reports_count_and_budget(monkeypatch):
+    headers, user = create_user_helper("admin@example.com")
+    monkeypatch.setattr(query_audit, "QUERY_AUDIT", True)
+    monkeypatch.setitem(query_audit.ROUTE_BUDGETS, ("GET", "/projects/"), 0)
+    response = client.get("/projects/", headers=headers)
+    assert int(response.headers["X-Query-Count"]) >= 1
+    assert "X-Query-Warning" not in response.headers  # budget 0 = tanpa batas
+
+    monkeypatch.setitem(query_audit.ROUTE_BUDGETS, ("GET", "/projects/"), 1)
+    create_projects_helper(user.id, 1)
+    headers, _ = create_user_helper("dosen@example.com", role="dosen")
+    response = client.get("/projects/", headers=headers)
+    assert response.headers["X-Query-Warning"].startswith("budget exceeded")
+
+def test_parse_budgets():
+    assert query_audit.parse_budgets("GET /projects/=2, post /projects/{project_id}/assign/bulk=4") == {
+        ("GET", "/projects/"): 2,
+        ("POST", "/projects/{project_id}/assign/bulk"): 4,
+    }
@@ -0,0 +1,142 @@
+# app/tests/test_ratelimit.py
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app import database, hashing, models, query_audit, ratelimit
+from app.response_cache import FakeRedis
+
+client = TestClient(app)
+
+# ===== Fixture setup/teardown DB =====
+@pytest.fixture(autouse=True)
+def setup_db():
+    db = database.SessionLocal()
+    db.query(models.UserSession).delete()
+    db.query(models.User).delete()
+    db.commit()
+    db.close()
+    yield
+    db = database.SessionLocal()
+    db.query(models.UserSession).delete()
+    db.query(models.User).delete()
+    db.commit()
+    db.close()
+
+# ===== Helper =====
+def register_helper(email="korban@example.com", password="benar123"):
+    client.post("/auth/register", json={"email": email, "password": password})
+
+def login(email="korban@example.com", password="salah"):
+    return client.post("/auth/login", json={"email": email, "password": password})
+
+class YieldingRedis(FakeRedis):
+    # Setiap perintah langsung memberi giliran ke task lain, seperti round-trip ke Redis
+    async def get(self, name):
+        await asyncio.sleep(0)
+        return await super().get(name)
+
+    async def incr(self, name, amount=1):
+        await asyncio.sleep(0)
+        return await super().incr(name, amount)
+
+# ===== Tests =====
+def test_parse_rate():
+    assert ratelimit.parse_rate("5/300") == (5, 300.0)
+    with pytest.raises(ValueError):
+        ratelimit.parse_rate("lima")
+    with pytest.raises(ValueError):
+        ratelimit.parse_rate("0/60")
+
+def test_count_min_sketch_never_underestimates():
+    sketch = ratelimit.CountMinSketch(width=64, depth=4)
+    for i in range(500):
+        sketch.add(f"user{i % 50}@example.com")
+    assert all(sketch.estimate(f"user{i}@example.com") >= 10 for i in range(50))
+    assert sum(len(row) for row in sketch.rows) == 64 * 4  # memori tetap
+    sketch.clear()
+    assert sketch.estimate("user0@example.com") == 0
+
+def test_token_bucket_refills():
+    limiter = ratelimit.TokenBucketLimiter(capacity=2, window=0.1)
+
+    async def scenario():
+        assert await limiter.hit("ip") == 0
+        assert await limiter.hit("ip") == 0
+        assert await limiter.hit("ip") > 0
+        await asyncio.sleep(0.06)
+        assert await limiter.hit("ip") == 0
+
+    asyncio.run(scenario())
+
+@pytest.mark.parametrize("spec", ["memory", "fake://"])
+def test_account_window_backends(spec):
+    _, account = ratelimit.create_limiters(spec)
+
+    async def scenario():
+        for _ in range(account.limit - 1):
+            await account.add("a@example.com")
+        assert await account.check("a@example.com") == 0
+        await account.add("a@example.com")
+        retry_after = await account.check("a@example.com")
+        assert 0 < retry_after <= 2 * account.window
+        assert await account.check("b@example.com") == 0
+
+    asyncio.run(scenario())
+
+def test_redis_window_concurrent_hits_respect_limit():
+    redis = YieldingRedis()
+    limiter = ratelimit.RedisWindowLimiter(redis, limit=3, window=60, prefix="test:")
+
+    async def scenario():
+        results = await asyncio.gather(*(limiter.hit("ip") for _ in range(8)))
+        assert sum(retry_after == 0 for retry_after in results) == 3
+        # hit yang ditolak tidak ikut dihitung, counter punya TTL
+        [key] = [key async for key in redis.scan_iter("test:ip:*")]
+        assert int(await redis.get(key)) == 3
+        assert redis._data[key][1] is not None
+
+    asyncio.run(scenario())
+
+def test_failed_logins_lock_account_without_bcrypt(monkeypatch):
+    register_helper()
+    limit = ratelimit.login_account_limiter.limit
+    for _ in range(limit):
+        assert login().status_code == 401
+
+    calls = []
+
+    async def counting(*args):
+        calls.append(1)
+        return False, None
+
+    monkeypatch.setattr(hashing.pool, "verify_and_update", counting)
+    with query_audit.capture_queries() as audit:
+        response = login(password="benar123")
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+    assert calls == [] and audit.count == 0  # ditolak sebelum DB & bcrypt
+    assert ratelimit.stats.rejected_account >= 1
+
+    # akun lain tidak terpengaruh
+    register_helper("lain@example.com")
+    assert login("lain@example.com").status_code == 401
+
+def test_successful_logins_do_not_count_against_account():
+    register_helper()
+    for _ in range(ratelimit.login_account_limiter.limit + 1):
+        assert login(password="benar123").status_code == 200
+
+def test_ip_limit(monkeypatch):
+    monkeypatch.setattr(ratelimit, "login_ip_limiter", ratelimit.TokenBucketLimiter(capacity=3, window=60))
+    for i in range(3):
+        assert login(f"acak{i}@example.com").status_code == 401
+    response = login("acak9@example.com")
+    assert response.status_code == 429
+    assert "retry-after" in response.headers
+
+def test_disabled(monkeypatch):
+    monkeypatch.setattr(ratelimit, "RATE_LIMIT_ENABLED", False)
+    monkeypatch.setattr(ratelimit, "login_ip_limiter", ratelimit.TokenBucketLimiter(capacity=1, window=60))
+    for _ in range(3):
+        assert login().status_code == 401
@@ -0,0 +1,120 @@
+# app/tests/test_response_cache.py
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app import database, models, query_audit, response_cache
+from app.auth import create_access_token
+
+client = TestClient(app)
+
+# ===== Fixture setup/teardown DB =====
+@pytest.fixture(autouse=True)
+def setup_db():
+    db = database.SessionLocal()
+    db.query(models.ProjectAssignment).delete()
+    db.query(models.Material).delete()
+    db.query(models.Project).delete()
+    db.query(models.User).delete()
+    db.commit()
+    db.close()
+    yield
+    db = database.SessionLocal()
+    db.query(models.ProjectAssignment).delete()
+    db.query(models.Material).delete()
+    db.query(models.Project).delete()
+    db.query(models.User).delete()
+    db.commit()
+    db.close()
+
+# ===== Helper buat user/project =====
+def create_user_helper(email, role="admin"):
+    db = database.SessionLocal()
+    user = models.User(email=email, full_name="Test User", hashed_password="fakehash", role=role)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.close()
+    token = create_access_token({"sub": email})
+    return {"Authorization": f"Bearer {token}"}, user
+
+def create_project_helper(owner_id, title="Proj"):
+    db = database.SessionLocal()
+    project = models.Project(title=title, description="Desc", owner_id=owner_id)
+    db.add(project)
+    db.commit()
+    db.refresh(project)
+    db.close()
+    return project
+
+# ===== Tests =====
+def test_list_served_from_cache_until_write():
+    headers, admin = create_user_helper("admin@example.com")
+    create_project_helper(admin.id, "A")
+    first = client.get("/projects/?limit=5&skip=0", headers=headers)
+
+    # hit: cukup query versi, tanpa query list; urutan parameter tidak berpengaruh
+    with query_audit.assert_max_queries(1):
+        again = client.get("/projects/?skip=0&limit=5", headers=headers)
+    assert again.content == first.content
+
+    client.post("/projects/", json={"title": "B", "description": "x"}, headers=headers)
+    after = client.get("/projects/?limit=5", headers=headers).json()
+    assert sorted(p["title"] for p in after) == ["A", "B"]
+
+def test_student_cache_hit_skips_assignment_query():
+    _, admin = create_user_helper("admin@example.com")
+    headers1, s1 = create_user_helper("s1@example.com", role="mahasiswa")
+    headers2, s2 = create_user_helper("s2@example.com", role="mahasiswa")
+    project = create_project_helper(admin.id)
+    db = database.SessionLocal()
+    db.add(models.ProjectAssignment(user_id=s1.id, project_id=project.id))
+    db.commit()
+    db.close()
+
+    first = client.get("/projects/", headers=headers1)
+    hits = response_cache.stats.hits
+    # hit: cukup query versi, tanpa load id project yang di-assign
+    with query_audit.assert_max_queries(1):
+        again = client.get("/projects/", headers=headers1)
+    assert again.content == first.content
+    assert response_cache.stats.hits == hits + 1
+
+    # entry per mahasiswa: mahasiswa lain tidak memakai entry s1
+    assert client.get("/projects/", headers=headers2).json() == []
+
+def test_assignee_changes_invalidate_cached_projects():
+    headers, admin = create_user_helper("admin@example.com")
+    _, student = create_user_helper("student@example.com", role="mahasiswa")
+    project = create_project_helper(admin.id)
+    client.post("/projects/assign", json={"project_id": project.id, "user_id": student.id}, headers=headers)
+    before = client.get(f"/projects/{project.id}?include=assignees", headers=headers).json()
+    assert before["assignees"][0]["full_name"] == "Test User"
+
+    db = database.SessionLocal()
+    db.get(models.User, student.id).full_name = "Nama Baru"
+    db.commit()
+    db.close()
+
+    after = client.get(f"/projects/{project.id}?include=assignees", headers=headers).json()
+    assert after["assignees"][0]["full_name"] == "Nama Baru"
+
+def test_assign_invalidates_student_view():
+    admin_headers, admin = create_user_helper("admin@example.com")
+    headers, student = create_user_helper("student@example.com", role="mahasiswa")
+    project = create_project_helper(admin.id)
+    assert client.get("/projects/", headers=headers).json() == []
+
+    client.post(f"/projects/{project.id}/assign/bulk", json={"user_ids": [student.id]}, headers=admin_headers)
+    assert [p["id"] for p in client.get("/projects/", headers=headers).json()] == [project.id]
+
+def test_redis_backend_with_fake(monkeypatch):
+    monkeypatch.setattr(response_cache, "backend", response_cache.create_backend("fake://"))
+    headers, admin = create_user_helper("admin@example.com")
+    create_project_helper(admin.id)
+    first = client.get("/materials/", headers=headers)
+    hits = response_cache.stats.hits
+    assert client.get("/materials/", headers=headers).content == first.content
+    assert response_cache.stats.hits == hits + 1
+    asyncio.run(response_cache.backend.clear())
+    assert asyncio.run(response_cache.backend.client.get("anything")) is None
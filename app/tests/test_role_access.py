@@ -2,7 +2,7 @@
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
-from app import database, models
+from app import database, models, query_audit
 from app.auth import create_access_token
 
 client = TestClient(app)
@@ -137,4 +137,32 @@ def test_admin_sees_all_materials():
     materials = response.json()
     assert len(materials) >= 2
     assert any(m["id"] == m1.id for m in materials)
-    assert any(m["id"] == m2.id for m in materials)
\ No newline at end of file
+    assert any(m["id"] == m2.id for m in materials)
+
+# ===== TEST SCOPING EXISTS =====
+def test_exists_scoping_returns_only_assigned_rows():
+    _, admin = create_user_helper("admin_exists@test.com", "admin")
+    headers_mhs, mahasiswa = create_user_helper("mhs_exists@test.com", "mahasiswa")
+    _, other = create_user_helper("mhs_other@test.com", "mahasiswa")
+    p1, p2, p3 = (create_project_helper(admin.id) for _ in range(3))
+    m1, m2, m3 = (create_material_helper(p.id) for p in (p1, p2, p3))
+
+    db = database.SessionLocal()
+    db.add_all([
+        models.ProjectAssignment(user_id=mahasiswa.id, project_id=p1.id),
+        models.ProjectAssignment(user_id=mahasiswa.id, project_id=p3.id),
+        models.ProjectAssignment(user_id=other.id, project_id=p2.id),
+    ])
+    db.commit()
+    db.close()
+
+    with query_audit.capture_queries() as audit:
+        projects = client.get("/projects/", headers=headers_mhs).json()
+        materials = client.get("/materials/", headers=headers_mhs).json()
+    assert sorted(p["id"] for p in projects) == sorted([p1.id, p3.id])
+    assert sorted(m["id"] for m in materials) == sorted([m1.id, m3.id])
+
+    # assignment dicek di SQL (EXISTS), bukan lewat daftar id IN (...)
+    lists = [s for s, _ in audit.statements if "FROM projects" in s or "FROM materials" in s]
+    assert lists and all("EXISTS" in s for s in lists)
+    assert not any("project_assignments.project_id IN" in s for s, _ in audit.statements)
@@ -0,0 +1,106 @@
+# app/tests/test_search.py
+import pytest
+from types import SimpleNamespace
+from sqlalchemy.dialects import postgresql
+from fastapi.testclient import TestClient
+from app.main import app
+from app import database, models, search
+from app.auth import create_access_token
+
+client = TestClient(app)
+
+# ===== Fixture setup/teardown DB =====
+@pytest.fixture(autouse=True)
+def setup_db():
+    db = database.SessionLocal()
+    db.query(models.ProjectAssignment).delete()
+    db.query(models.Material).delete()
+    db.query(models.Project).delete()
+    db.query(models.User).delete()
+    db.commit()
+    db.close()
+    yield
+    db = database.SessionLocal()
+    db.query(models.ProjectAssignment).delete()
+    db.query(models.Material).delete()
+    db.query(models.Project).delete()
+    db.query(models.User).delete()
+    db.commit()
+    db.close()
+
+# ===== Helper buat user/project/material =====
+def create_user_helper(email, role="admin"):
+    db = database.SessionLocal()
+    user = models.User(email=email, full_name="Test User", hashed_password="fakehash", role=role)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.close()
+    token = create_access_token({"sub": email})
+    return {"Authorization": f"Bearer {token}"}, user
+
+def create_project_helper(owner_id, title, description="Desc"):
+    db = database.SessionLocal()
+    project = models.Project(title=title, description=description, owner_id=owner_id)
+    db.add(project)
+    db.commit()
+    db.refresh(project)
+    db.close()
+    return project
+
+def create_material_helper(project_id, title, content="Isi"):
+    db = database.SessionLocal()
+    material = models.Material(title=title, content=content, project_id=project_id)
+    db.add(material)
+    db.commit()
+    db.refresh(material)
+    db.close()
+    return material
+
+# ===== Tests =====
+def test_search_ranks_title_match_first():
+    headers, admin = create_user_helper("adminsearch@test.com")
+    body_match = create_project_helper(admin.id, "Robotika Dasar", "Belajar pemrograman python")
+    title_match = create_project_helper(admin.id, "Python Lanjut", "Struktur data")
+    create_project_helper(admin.id, "Basis Data", "SQL")
+
+    response = client.get("/search/", params={"q": "python", "type": "projects"}, headers=headers)
+    assert response.status_code == 200
+    ids = [p["id"] for p in response.json()["projects"]]
+    assert ids == [title_match.id, body_match.id]
+
+def test_search_covers_materials_and_escapes_wildcards():
+    headers, admin = create_user_helper("adminsearch2@test.com")
+    project = create_project_helper(admin.id, "Project")
+    material = create_material_helper(project.id, "Diskon 100%", "Isi")
+    create_material_helper(project.id, "Diskon 1000", "Isi")
+
+    response = client.get("/search/", params={"q": "100%"}, headers=headers)
+    assert [m["id"] for m in response.json()["materials"]] == [material.id]
+
+def test_search_scoped_for_mahasiswa():
+    _, admin = create_user_helper("adminsearch3@test.com")
+    headers_mhs, mahasiswa = create_user_helper("mhssearch@test.com", role="mahasiswa")
+    assigned = create_project_helper(admin.id, "Jaringan Komputer")
+    create_project_helper(admin.id, "Jaringan Saraf")
+
+    db = database.SessionLocal()
+    db.add(models.ProjectAssignment(user_id=mahasiswa.id, project_id=assigned.id))
+    db.commit()
+    db.close()
+
+    response = client.get("/search/", params={"q": "jaringan"}, headers=headers_mhs)
+    assert [p["id"] for p in response.json()["projects"]] == [assigned.id]
+
+def test_fuzzy_operator_only_in_search_predicate():
+    pg = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=postgresql.dialect()))
+
+    def compiled(predicate):
+        expr = predicate(pg, "modul", models.Project.title, models.Project.description)
+        return str(expr.compile(dialect=postgresql.dialect()))
+
+    # filter keyword list project tetap substring ILIKE; operator trigram % hanya untuk /search
+    assert "ILIKE" in compiled(search.keyword_filter)
+    assert "projects.title %" not in compiled(search.keyword_filter)
+    assert "projects.title %" in compiled(search.fuzzy_filter)
+
@@ -0,0 +1,42 @@
+# app/tests/test_serialization.py
+from datetime import datetime, timezone
+from typing import List
+import pytest
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import literal, select
+from app import database, models, schemas, serialization
+
+def make_project(created_at):
+    return models.Project(id=1, title="Proj", description=None, owner_id=7, created_at=created_at)
+
+# ===== Tests =====
+def test_fast_path_matches_pydantic_output():
+    adapter = TypeAdapter(List[schemas.ProjectResponse])
+    for created_at in (datetime(2026, 1, 2, 3, 4, 5, 123456), datetime(2026, 1, 2, tzinfo=timezone.utc)):
+        rows = [make_project(created_at)]
+        assert serialization.dumps(rows) == adapter.dump_json(adapter.validate_python(rows))
+
+def test_page_with_orm_items():
+    material = models.Material(id=3, project_id=1, title="M", content="x", created_at=datetime(2026, 1, 1))
+    body = serialization.dumps({"items": [material], "next_cursor": None})
+    assert body == (
+        b'{"items":[{"project_id":1,"title":"M","content":"x","id":3,'
+        b'"created_at":"2026-01-01T00:00:00"}],"next_cursor":null}'
+    )
+
+def test_row_tuples_serialised_by_column_name():
+    db = database.SessionLocal()
+    row = db.execute(select(literal(1).label("id"), literal("Proj").label("title"))).first()
+    db.close()
+    assert serialization.dumps([row]) == b'[{"id":1,"title":"Proj"}]'
+
+def test_model_renderer_validates_and_filters():
+    render = serialization.model_renderer(schemas.ProjectResponse)
+    project = {
+        "id": 1, "title": "Proj", "description": None, "owner_id": 7,
+        "created_at": datetime(2026, 1, 1), "internal": "rahasia",
+    }
+    assert render(project) == serialization.dumps([make_project(datetime(2026, 1, 1))])[1:-1]
+    with pytest.raises(ValidationError):
+        render({"id": "bukan angka", "title": "Proj"})
+
@@ -0,0 +1,164 @@
+# app/tests/test_sessions.py
+import asyncio
+import json
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app import database, hashing, models, query_audit, sessions
+from app.response_cache import FakeRedis
+
+client = TestClient(app)
+
+# ===== Fixture setup/teardown DB =====
+@pytest.fixture(autouse=True)
+def setup_db():
+    db = database.SessionLocal()
+    db.query(models.UserSession).delete()
+    db.query(models.User).delete()
+    db.commit()
+    db.close()
+    sessions.revocation_cache.clear()
+    yield
+    db = database.SessionLocal()
+    db.query(models.UserSession).delete()
+    db.query(models.User).delete()
+    db.commit()
+    db.close()
+
+# ===== Helper login =====
+def login_helper(email="sesi@example.com", password="pass123"):
+    client.post("/auth/register", json={"email": email, "password": password})
+    response = client.post("/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200
+    return response.json()
+
+def auth_header(tokens):
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+# ===== Tests =====
+def test_login_returns_refresh_token():
+    tokens = login_helper()
+    assert tokens["token_type"] == "bearer"
+    sid, _, secret = tokens["refresh_token"].partition(".")
+    assert sid and secret
+
+    db = database.SessionLocal()
+    row = db.get(models.UserSession, sid)
+    db.close()
+    assert row is not None
+    assert secret not in row.refresh_hash  # hanya hash yang disimpan
+
+def test_refresh_rotates_without_bcrypt(monkeypatch):
+    tokens = login_helper()
+
+    async def no_bcrypt(*args):
+        raise AssertionError("refresh tidak boleh memanggil bcrypt")
+
+    monkeypatch.setattr(hashing.pool, "verify_and_update", no_bcrypt)
+    with query_audit.assert_max_queries(query_audit.budget_for("POST", "/auth/refresh")):
+        response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    refreshed = response.json()
+    assert refreshed["refresh_token"] != tokens["refresh_token"]
+    assert client.get("/auth/me", headers=auth_header(refreshed)).json()["email"] == "sesi@example.com"
+
+def test_refresh_token_reuse_revokes_session():
+    tokens = login_helper()
+    refreshed = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).json()
+
+    # token lama dipakai lagi → 401 dan seluruh sesi ikut di-revoke
+    reused = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert reused.status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": refreshed["refresh_token"]}).status_code == 401
+    assert client.get("/auth/me", headers=auth_header(refreshed)).status_code == 401
+
+def test_invalid_refresh_token_does_not_revoke():
+    tokens = login_helper()
+    sid = tokens["refresh_token"].partition(".")[0]
+    assert client.post("/auth/refresh", json={"refresh_token": f"{sid}.tebakan"}).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": "asal"}).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 200
+
+def test_logout_revokes_access_and_refresh_tokens():
+    tokens = login_helper()
+    assert client.get("/auth/me", headers=auth_header(tokens)).status_code == 200
+    assert client.post("/auth/logout", headers=auth_header(tokens)).status_code == 204
+    assert client.get("/auth/me", headers=auth_header(tokens)).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+
+def test_revocation_check_is_cached():
+    tokens = login_helper()
+    client.get("/auth/me", headers=auth_header(tokens))
+    with query_audit.capture_queries() as audit:
+        client.get("/auth/me", headers=auth_header(tokens))
+    assert audit.count == 0  # principal + status sesi dari cache
+
+def test_revocation_check_reuses_request_session():
+    tokens = login_helper()
+    sessions.revocation_cache.clear()
+    before = database.pool_metrics.snapshot()["acquisitions"]
+    assert client.get("/auth/me", headers=auth_header(tokens)).status_code == 200
+    # cek revoke (store sql) + lookup user lewat satu koneksi milik request
+    assert database.pool_metrics.snapshot()["acquisitions"] - before == 1
+
+def test_redis_swap_is_atomic(monkeypatch):
+    client = FakeRedis()
+    store = sessions.RedisSessionStore(client)
+    real_get = client.get
+    rotations = [("h1", "h2"), ("h2", "h3")]  # satu rotasi per skenario
+
+    async def racing_get(name):
+        # rotasi lain selesai di antara WATCH dan EXEC
+        value = await real_get(name)
+        if rotations and json.loads(value)["refresh_hash"] == rotations[0][0]:
+            expected, new = rotations.pop(0)
+            assert await store.swap("s1", expected, new, time.time() + 60)
+        return value
+
+    async def scenario():
+        await store.add(sessions.SessionRecord("s1", 1, "redis@example.com", "h1", time.time() + 60))
+        monkeypatch.setattr(client, "get", racing_get)
+        assert not await store.swap("s1", "h1", "h1b", time.time() + 60)
+        assert (await store.get("s1")).refresh_hash == "h2"
+
+        await store.revoke("s1")  # bentrok dengan rotasi → diulang, revoke tetap tersimpan
+        record = await store.get("s1")
+        assert record.revoked and record.refresh_hash == "h3"
+        assert not rotations
+
+    asyncio.run(scenario())
+
+@pytest.mark.parametrize("spec", ["memory", "sql", "fake://"])
+def test_store_backends(spec):
+    store = sessions.create_store(spec)
+
+    async def scenario():
+        db = database.SessionLocal()
+        user = models.User(email="store@example.com", hashed_password="x", role="mahasiswa")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+        db.close()
+
+        now = time.time()
+        await store.add(sessions.SessionRecord("s1", user_id, "store@example.com", "h1", now + 60))
+        await store.add(sessions.SessionRecord("s2", user_id, "store@example.com", "h2", now - 1))
+        assert (await store.get("s1")).refresh_hash == "h1"
+        assert await store.get("tidak-ada") is None
+
+        assert await store.swap("s1", "h1", "h1b", now + 120)
+        assert not await store.swap("s1", "h1", "h1c", now + 120)  # sudah dirotasi
+        record = await store.get("s1")
+        assert (record.refresh_hash, record.previous_hash) == ("h1b", "h1")
+
+        await store.revoke("s1")
+        assert (await store.get("s1")).revoked
+        assert not await store.swap("s1", "h1b", "h1d", now + 120)
+
+        removed = await store.sweep(now)
+        if spec != "fake://":  # Redis: kedaluwarsa lewat TTL key
+            assert removed == 1
+            assert await store.get("s2") is None
+
+    asyncio.run(scenario())
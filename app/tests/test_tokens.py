@@ -0,0 +1,123 @@
+# app/tests/test_tokens.py
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+from app.main import app
+from app import auth, database, models, query_audit, tokens
+from app.auth import create_access_token
+
+client = TestClient(app)
+
+# ===== Fixture setup/teardown DB =====
+@pytest.fixture(autouse=True)
+def setup_db():
+    db = database.SessionLocal()
+    db.query(models.ProjectAssignment).delete()
+    db.query(models.Material).delete()
+    db.query(models.Project).delete()
+    db.query(models.User).delete()
+    db.commit()
+    db.close()
+    yield
+    db = database.SessionLocal()
+    db.query(models.ProjectAssignment).delete()
+    db.query(models.Material).delete()
+    db.query(models.Project).delete()
+    db.query(models.User).delete()
+    db.commit()
+    db.close()
+
+@pytest.fixture
+def keyring(monkeypatch):
+    # keyring terpisah per test supaya rotasi tidak bocor ke test lain
+    ring = tokens.Keyring({tokens.DEFAULT_KID: tokens.SECRET_KEY}, tokens.DEFAULT_KID)
+    monkeypatch.setattr(tokens, "keyring", ring)
+    tokens.claims_cache.clear()
+    yield ring
+    tokens.claims_cache.clear()
+
+# ===== Helper buat user =====
+def create_user_helper(email, role="admin"):
+    db = database.SessionLocal()
+    user = models.User(email=email, full_name="Test User", hashed_password="fakehash", role=role)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.close()
+    token = create_access_token({"sub": email})
+    return {"Authorization": f"Bearer {token}"}, user
+
+# ===== Tests =====
+def test_parse_keys():
+    assert tokens.parse_keys("") == {}
+    assert tokens.parse_keys("k1:s1, k2:s2") == {"k1": "s1", "k2": "s2"}
+    with pytest.raises(ValueError):
+        tokens.parse_keys("tanpa-secret")
+
+def test_verify_caches_decoded_claims(keyring, monkeypatch):
+    token = tokens.create_access_token({"sub": "a@example.com"})
+    calls = []
+    original = tokens.jwt.decode
+    monkeypatch.setattr(tokens.jwt, "decode", lambda *a, **kw: calls.append(1) or original(*a, **kw))
+    assert tokens.verify(token)["sub"] == "a@example.com"
+    assert tokens.verify(token)["sub"] == "a@example.com"
+    assert len(calls) == 1
+
+def test_expired_token_rejected(keyring):
+    token = tokens.create_access_token({"sub": "a@example.com"}, expires_delta=timedelta(seconds=-1))
+    with pytest.raises(Exception) as exc:
+        tokens.verify(token)
+    assert exc.value.status_code == 401
+    assert token not in tokens.claims_cache._data
+
+def test_rotation_keeps_old_tokens_until_retired(keyring):
+    old = tokens.create_access_token({"sub": "a@example.com"})
+    keyring.rotate("k2", "secret-baru")
+    new = tokens.create_access_token({"sub": "a@example.com"})
+    assert jwt.get_unverified_header(new)["kid"] == "k2"
+    assert tokens.verify(old)["sub"] == tokens.verify(new)["sub"] == "a@example.com"
+
+    keyring.retire(tokens.DEFAULT_KID)
+    with pytest.raises(Exception) as exc:
+        tokens.verify(old)  # termasuk yang sudah ter-cache
+    assert exc.value.status_code == 401
+    assert tokens.verify(new)["sub"] == "a@example.com"
+    with pytest.raises(ValueError):
+        keyring.retire("k2")
+
+def test_legacy_token_without_kid_and_unknown_kid(keyring):
+    expire = datetime.now(timezone.utc) + timedelta(minutes=5)
+    legacy = jwt.encode({"sub": "a@example.com", "exp": expire}, tokens.SECRET_KEY, algorithm=tokens.ALGORITHM)
+    assert tokens.verify(legacy)["sub"] == "a@example.com"
+    forged = jwt.encode({"sub": "a@example.com", "exp": expire}, "x", algorithm=tokens.ALGORITHM, headers={"kid": "lain"})
+    with pytest.raises(Exception) as exc:
+        tokens.verify(forged)
+    assert exc.value.status_code == 401
+
+def test_login_token_carries_uid_and_role():
+    client.post("/auth/register", json={"email": "login@example.com", "password": "pass123"})
+    response = client.post("/auth/login", json={"email": "login@example.com", "password": "pass123"})
+    claims = tokens.verify(response.json()["access_token"])
+    assert claims["sub"] == "login@example.com"
+    assert claims["role"] == "mahasiswa"
+    assert isinstance(claims["uid"], int)
+
+def test_require_roles_trusts_token_role_when_allowed(monkeypatch):
+    _, user = create_user_helper("dosen@example.com", role="dosen")
+    token = tokens.create_access_token(tokens.user_claims(user))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    auth.invalidate_principal()
+    with query_audit.capture_queries() as without_policy:
+        assert client.delete("/materials/999", headers=headers).status_code == 404
+
+    monkeypatch.setattr(tokens, "AUTH_TRUST_TOKEN_ROLE", True)
+    auth.invalidate_principal()
+    with query_audit.capture_queries() as with_policy:
+        assert client.delete("/materials/999", headers=headers).status_code == 404
+    assert with_policy.count == without_policy.count - 1  # tanpa lookup user
+
+    mahasiswa = tokens.create_access_token({"sub": "mhs@example.com", "uid": 99, "role": "mahasiswa"})
+    response = client.delete("/materials/999", headers={"Authorization": f"Bearer {mahasiswa}"})
+    assert response.status_code == 403
@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import HTTPException
+from jose import JWTError, jwt
+from app import models
+from app.cache import TTLCache
+
+# Verifikasi JWT dengan keyring (rotasi kunci lewat header "kid") dan cache
+# claims hasil decode. Token yang sama dipakai berkali-kali selama masa
+# berlakunya, jadi decode + cek HMAC cukup sekali per token; entry cache
+# kedaluwarsa bersamaan dengan claim "exp".
+
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+# Kunci lama (token tanpa "kid") — tetap diterima dengan kid "default"
+SECRET_KEY = os.getenv("SECRET_KEY", "supersecret")  # ganti dengan env var di production
+DEFAULT_KID = "default"
+# Beberapa kunci aktif: "kid1:secret1,kid2:secret2"; token baru ditandatangani JWT_ACTIVE_KID
+JWT_KEYS = os.getenv("JWT_KEYS", "")
+JWT_ACTIVE_KID = os.getenv("JWT_ACTIVE_KID", "")
+
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+# Batas atas umur entry; tetap tidak melewati "exp" token
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "300"))
+# true = require_roles boleh memakai claim role/uid tanpa lookup DB saat
+# principal belum ada di cache (perubahan role baru berlaku setelah token expired)
+AUTH_TRUST_TOKEN_ROLE = os.getenv("AUTH_TRUST_TOKEN_ROLE", "false").lower() in ("1", "true", "yes")
+
+
+def parse_keys(spec: str) -> dict:
+    keys = {}
+    for item in spec.split(","):
+        kid, sep, secret = item.strip().partition(":")
+        if not item.strip():
+            continue
+        if not sep or not kid or not secret:
+            raise ValueError(f"Format JWT_KEYS tidak valid: {item!r} (harus kid:secret)")
+        keys[kid] = secret
+    return keys
+
+
+class Keyring:
+    def __init__(self, keys: dict, active_kid: str):
+        if active_kid not in keys:
+            raise ValueError(f"JWT_ACTIVE_KID {active_kid!r} tidak ada di keyring")
+        self.keys = dict(keys)
+        self.active_kid = active_kid
+        self._lock = threading.Lock()
+
+    def get(self, kid: str) -> Optional[str]:
+        return self.keys.get(kid)
+
+    def rotate(self, kid: str, secret: str):
+        # Kunci baru jadi kunci tanda tangan; kunci lama tetap valid sampai di-retire
+        with self._lock:
+            self.keys = {**self.keys, kid: secret}
+            self.active_kid = kid
+
+    def retire(self, kid: str):
+        if kid == self.active_kid:
+            raise ValueError("Kunci aktif tidak bisa di-retire; rotate dulu")
+        with self._lock:
+            self.keys = {k: v for k, v in self.keys.items() if k != kid}
+        # claims yang sudah ter-cache dari kunci ini tidak boleh dipakai lagi
+        claims_cache.clear()
+
+
+def _default_keyring() -> Keyring:
+    extra = parse_keys(JWT_KEYS)
+    active = JWT_ACTIVE_KID or next(iter(extra), DEFAULT_KID)
+    return Keyring({DEFAULT_KID: SECRET_KEY, **extra}, active)
+
+
+keyring = _default_keyring()
+claims_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
+
+
+# --- Buat token ---
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    to_encode = data.copy()
+    expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    to_encode.update({"exp": expire})
+    kid = keyring.active_kid
+    return jwt.encode(to_encode, keyring.get(kid), algorithm=ALGORITHM, headers={"kid": kid})
+
+
+def user_claims(user: models.User) -> dict:
+    # sub tetap email (kompatibel dengan token lama); uid/role untuk jalur cepat require_roles
+    return {"sub": user.email, "uid": user.id, "role": user.role}
+
+
+# --- Verifikasi ---
+def _credentials_error():
+    return HTTPException(status_code=401, detail="Could not validate credentials")
+
+
+def decode(token: str) -> dict:
+    try:
+        kid = jwt.get_unverified_header(token).get("kid", DEFAULT_KID)
+    except JWTError:
+        raise _credentials_error()
+    secret = keyring.get(kid)
+    if secret is None:
+        raise _credentials_error()
+    try:
+        return jwt.decode(token, secret, algorithms=[ALGORITHM])
+    except JWTError:
+        raise _credentials_error()
+
+
+def verify(token: str) -> dict:
+    # Key cache = token utuh (termasuk signature), jadi token palsu tidak pernah cocok
+    claims = claims_cache.get(token)
+    if claims is not None:
+        return claims
+    claims = decode(token)
+    if claims.get("sub") is None:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    exp = claims.get("exp")
+    remaining = exp - time.time() if exp is not None else TOKEN_CACHE_TTL
+    claims_cache.set(token, claims, ttl=min(remaining, TOKEN_CACHE_TTL))
+    return claims
+
+
+def principal_from_claims(claims: dict) -> Optional[models.User]:
+    # Principal transient dari claim (tanpa DB); None kalau token lama tanpa uid/role
+    if claims.get("uid") is None or not claims.get("role"):
+        return None
+    return models.User(id=claims["uid"], email=claims["sub"], role=claims["role"])
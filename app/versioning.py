@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+from sqlalchemy import bindparam, event, func, update
+from sqlalchemy.orm import Session
+from app import models
+
+# Versi data per tabel (tabel change_counters) untuk ETag list endpoint.
+# Tabel yang berubah dikumpulkan selama transaksi (flush ORM maupun DML bulk)
+# lalu counter-nya di-increment sekali tepat sebelum commit, jadi lock baris
+# counter hanya dipegang sebentar dan rollback otomatis membatalkan increment.
+
+_CHANGED_TABLES = "changed_tables"
+
+_bump = (
+    update(models.ChangeCounter)
+    .where(models.ChangeCounter.name.in_(bindparam("names", expanding=True)))
+    .values(version=models.ChangeCounter.version + 1, updated_at=func.now())
+)
+
+
+def _mark_changed(session: Session, tables):
+    tables = {name for name in tables if name in models.VERSIONED_TABLES}
+    if tables:
+        session.info.setdefault(_CHANGED_TABLES, set()).update(tables)
+
+
+@event.listens_for(Session, "after_flush")
+def _flush_changed(session, flush_context):
+    objects = (*session.new, *session.dirty, *session.deleted)
+    _mark_changed(session, {obj.__table__.name for obj in objects if hasattr(obj, "__table__")})
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bulk_changed(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_changed(
+            orm_execute_state.session,
+            {mapper.local_table.name for mapper in orm_execute_state.all_mappers},
+        )
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_versions(session):
+    # before_commit jalan sebelum flush terakhir; flush dulu supaya semua perubahan tercatat
+    session.flush()
+    tables = session.info.pop(_CHANGED_TABLES, None)
+    if tables:
+        session.connection().execute(_bump, {"names": sorted(tables)})
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_versions(session):
+    session.info.pop(_CHANGED_TABLES, None)
+
+
+def get_versions(db: Session, tables) -> dict:
+    # {nama_tabel: (version, updated_at UTC)}
+    rows = db.query(
+        models.ChangeCounter.name, models.ChangeCounter.version, models.ChangeCounter.updated_at
+    ).filter(models.ChangeCounter.name.in_(tables))
+    versions = {}
+    for name, version, updated_at in rows:
+        if updated_at is not None and updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        versions[name] = (version, updated_at)
+    return versions
+
+
+def last_modified(versions: dict) -> datetime:
+    stamps = [updated_at for _, updated_at in versions.values() if updated_at is not None]
+    return max(stamps) if stamps else None
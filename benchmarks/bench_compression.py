@@ -0,0 +1,65 @@
+"""Micro-benchmark kompresi satu halaman list material (JSON).
+
+Mengukur CPU per halaman dan byte yang dihemat untuk beberapa level gzip dan
+brotli (kalau paket brotli terpasang), supaya COMPRESSION_GZIP_LEVEL /
+COMPRESSION_BROTLI_QUALITY bisa dipilih berdasarkan angka, bukan tebakan.
+Varian terkompresi disimpan di response cache, jadi biaya ini hanya dibayar
+sekali per versi data — kecuali untuk response streaming/non-cache.
+
+    python -m benchmarks.bench_compression --rows 50 --iterations 500
+"""
+import argparse
+import gzip
+import json
+import time
+
+from app import compression, serialization
+from benchmarks.bench_serialization import make_rows
+
+
+def _time(fn, iterations: int) -> float:
+    for _ in range(min(iterations, 20)):  # warm-up
+        fn()
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter_ns() - start) / iterations
+
+
+def run(rows: int = 50, iterations: int = 500) -> dict:
+    body = serialization.dumps(make_rows(rows))
+    candidates = [(f"gzip_{level}", lambda level=level: gzip.compress(body, compresslevel=level, mtime=0))
+                  for level in (1, 6, 9)]
+    if compression.brotli is not None:
+        candidates += [(f"br_{quality}", lambda quality=quality: compression.brotli.compress(body, quality=quality))
+                       for quality in (1, 4, 11)]
+
+    results = {}
+    for name, fn in candidates:
+        size = len(fn())
+        results[name] = {
+            "us_per_page": round(_time(fn, iterations) / 1000, 1),
+            "bytes": size,
+            "ratio": round(size / len(body), 3),
+            "bytes_saved": len(body) - size,
+        }
+    return {
+        "benchmark": "compression",
+        "rows": rows,
+        "iterations": iterations,
+        "identity_bytes": len(body),
+        "brotli_available": compression.brotli is not None,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.iterations), indent=2))
+
+
+if __name__ == "__main__":
+    main()
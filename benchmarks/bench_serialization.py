@@ -0,0 +1,77 @@
+"""Micro-benchmark serialisasi satu halaman list (default 50 baris ORM).
+
+Membandingkan jalur lama (jsonable_encoder + json.dumps), validasi pydantic
+response_model + dump_json (jalur FastAPI saat ini) dan jalur cepat
+serialization.dumps (attrgetter + orjson, tanpa model per baris).
+
+    python -m benchmarks.bench_serialization --rows 50 --iterations 2000
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app import models, schemas, serialization
+
+
+def make_rows(count: int):
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        models.Material(
+            id=i, project_id=i % 7, title=f"Materi {i}", content="Isi materi " * 20, created_at=created_at
+        )
+        for i in range(count)
+    ]
+
+
+def _time(fn, iterations: int) -> float:
+    for _ in range(min(iterations, 100)):  # warm-up
+        fn()
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter_ns() - start) / iterations
+
+
+def run(rows: int = 50, iterations: int = 2000) -> dict:
+    page = make_rows(rows)
+    adapter = TypeAdapter(List[schemas.MaterialResponse])
+
+    def legacy():
+        validated = [schemas.MaterialResponse.model_validate(row) for row in page]
+        return json.dumps(jsonable_encoder(validated)).encode()
+
+    def pydantic_dump_json():
+        return adapter.dump_json(adapter.validate_python(page))
+
+    def fast_path():
+        return serialization.dumps(page)
+
+    assert json.loads(fast_path()) == json.loads(pydantic_dump_json())
+    results = {name: _time(fn, iterations) for name, fn in (
+        ("jsonable_encoder", legacy),
+        ("pydantic_dump_json", pydantic_dump_json),
+        ("orjson_fast_path", fast_path),
+    )}
+    return {
+        "benchmark": "serialization",
+        "rows": rows,
+        "iterations": iterations,
+        **{f"{name}_us_per_page": round(ns / 1000, 1) for name, ns in results.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.iterations), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Audit index: EXPLAIN setiap bentuk query yang dikirim router.
+
+Dataset di-seed (benchmarks/seed.py), lalu endpoint list/detail/search/export/
+assign/create dipanggil untuk setiap role sambil menangkap semua SQL yang
+dijalankan. Setiap bentuk query unik (query_audit.statement_shape) di-EXPLAIN
+dengan parameter aslinya:
+
+- PostgreSQL: EXPLAIN (FORMAT JSON) → node "Seq Scan"
+- SQLite    : EXPLAIN QUERY PLAN → baris "SCAN <tabel>" tanpa index
+
+Exit code 1 kalau ada sequential scan pada tabel besar (>= --min-rows baris)
+yang tidak diizinkan skenarionya (export memang membaca semua baris; pencarian
+LIKE '%kw%' di SQLite tidak punya index trigram). Pakai database terpisah —
+seed mengosongkan semua tabel data:
+
+    DATABASE_URL=postgresql://.../pjblms_bench python -m benchmarks.explain_audit --projects 2000
+"""
+import argparse
+import json
+import re
+import sys
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, select
+
+from app import database, models, query_audit, ratelimit, response_cache, tokens
+from app.main import app
+from benchmarks import seed as seeding
+
+# Bentuk query yang bukan akses data (transaksi, pragma, dsb.)
+SKIPPED_PREFIXES = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE", "PRAGMA", "SET", "SHOW", "INSERT")
+SQLITE_BARE_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+
+# --- Skenario ---
+def _fixtures():
+    db = database.SessionLocal()
+    try:
+        def first_user(role):
+            return db.scalars(select(models.User).where(models.User.role == role).order_by(models.User.id)).first()
+
+        admin, dosen, mahasiswa = first_user("admin"), first_user("dosen"), first_user("mahasiswa")
+        own_project = db.scalars(select(models.Project.id).where(models.Project.owner_id == dosen.id)).first()
+        assigned_project = db.scalars(
+            select(models.ProjectAssignment.project_id).where(models.ProjectAssignment.user_id == mahasiswa.id)
+        ).first()
+        assigned = set(db.execute(
+            select(models.ProjectAssignment.project_id).where(models.ProjectAssignment.user_id == mahasiswa.id)
+        ).scalars())
+        free_project = db.scalars(
+            select(models.Project.id).where(models.Project.id.not_in(assigned)).order_by(models.Project.id)
+        ).first()
+        headers = {
+            user.role: {"Authorization": f"Bearer {tokens.create_access_token(tokens.user_claims(user))}"}
+            for user in (admin, dosen, mahasiswa)
+        }
+        return headers, {
+            "dosen_id": dosen.id,
+            "mahasiswa_id": mahasiswa.id,
+            "own_project": own_project,
+            "assigned_project": assigned_project,
+            "free_project": free_project,
+        }
+    finally:
+        db.close()
+
+
+def scenarios(ids: dict):
+    # (nama, role, method, url, body, boleh_seq_scan)
+    date_from = "2000-01-01T00:00:00"
+    items = []
+    for role in ("admin", "dosen", "mahasiswa"):
+        project = ids["assigned_project"] if role == "mahasiswa" else ids["own_project"]
+        items += [
+            (f"list_projects_{role}", role, "GET", "/projects/", None, False),
+            (f"list_projects_cursor_{role}", role, "GET", "/projects/?cursor=", None, False),
+            (f"list_projects_summary_{role}", role, "GET", "/projects/?view=summary", None, False),
+            (f"list_projects_date_{role}", role, "GET", f"/projects/?date_from={date_from}", None, False),
+            (f"list_projects_include_{role}", role, "GET", "/projects/?include=materials", None, False),
+            (f"get_project_{role}", role, "GET", f"/projects/{project}", None, False),
+            (f"list_materials_{role}", role, "GET", "/materials/", None, False),
+            (f"list_materials_cursor_{role}", role, "GET", "/materials/?cursor=", None, False),
+            (f"list_materials_project_{role}", role, "GET", f"/materials/?project_id={project}", None, False),
+            (f"search_{role}", role, "GET", "/search/?q=modul", None, "like"),
+            (f"export_materials_{role}", role, "GET", "/export/materials", None, True),
+        ]
+    items += [
+        ("list_projects_owner_admin", "admin", "GET", f"/projects/?owner_id={ids['dosen_id']}", None, False),
+        ("list_projects_assignees_admin", "admin", "GET", "/projects/?include=materials,assignees", None, False),
+        ("list_projects_keyword_admin", "admin", "GET", "/projects/?keyword=Project%201", None, "like"),
+        ("assign_project", "admin", "POST", "/projects/assign",
+         {"project_id": ids["free_project"], "user_id": ids["mahasiswa_id"]}, False),
+        ("create_material", "dosen", "POST", "/materials/",
+         {"project_id": ids["own_project"], "title": "Audit", "content": "audit"}, False),
+        ("login", None, "POST", "/auth/login",
+         {"email": seeding.email_for("mahasiswa", 0), "password": seeding.BENCH_PASSWORD}, False),
+    ]
+    return items
+
+
+# --- Tangkap SQL ---
+class Capture:
+    def __init__(self):
+        self.scenario = None
+        self.shapes = {}  # shape → {"statement", "parameters", "scenarios"}
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.scenario is None or executemany:
+            return
+        if statement.lstrip().upper().startswith(SKIPPED_PREFIXES):
+            return
+        entry = self.shapes.setdefault(query_audit.statement_shape(statement), {
+            "statement": statement, "parameters": parameters, "scenarios": {},
+        })
+        entry["scenarios"].setdefault(self.scenario[0], self.scenario[1])
+
+
+def capture_queries(headers: dict, ids: dict) -> dict:
+    capture = Capture()
+    engines = [database.engine] + ([database.async_engine.sync_engine] if database.async_engine is not None else [])
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", capture)
+    # Cache response/rate limit dimatikan supaya setiap skenario benar-benar query ke DB
+    response_cache.RESPONSE_CACHE_ENABLED = False
+    ratelimit.RATE_LIMIT_ENABLED = False
+    failures = []
+    try:
+        with TestClient(app) as client:
+            for name, role, method, url, body, allow_scan in scenarios(ids):
+                capture.scenario = (name, allow_scan)
+                response = client.request(method, url, json=body, headers=headers.get(role, {}))
+                capture.scenario = None
+                if response.status_code >= 400:
+                    failures.append({"scenario": name, "status": response.status_code})
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", capture)
+    return capture.shapes, failures
+
+
+# --- EXPLAIN ---
+def _pg_seq_scans(plan) -> list:
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        found.extend(_pg_seq_scans(child))
+    return found
+
+
+def explain(conn, statement: str, parameters):
+    # → (plan yang bisa dibaca, daftar tabel yang di-seq-scan)
+    if conn.dialect.name == "postgresql":
+        row = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+        plan = (json.loads(row) if isinstance(row, str) else row)[0]["Plan"]
+        return plan, _pg_seq_scans(plan)
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    details = [row[-1] for row in rows]
+    scans = [match.group(1) for match in map(SQLITE_BARE_SCAN.match, details) if match]
+    return details, scans
+
+
+def table_sizes(conn) -> dict:
+    return {
+        name: conn.execute(select(func.count()).select_from(table)).scalar()
+        for name, table in models.Base.metadata.tables.items()
+    }
+
+
+def audit(shapes: dict, min_rows: int) -> dict:
+    results, violations = [], 0
+    with database.engine.connect() as conn:
+        dialect = conn.dialect.name
+        conn.exec_driver_sql("ANALYZE")
+        sizes = table_sizes(conn)
+        for shape, entry in shapes.items():
+            plan, scans = explain(conn, entry["statement"], entry["parameters"])
+            large = sorted({table for table in scans if sizes.get(table, 0) >= min_rows})
+            # boleh scan kalau SEMUA skenario yang memakai bentuk ini mengizinkan
+            allowed = all(
+                allow is True or (allow == "like" and dialect == "sqlite")
+                for allow in entry["scenarios"].values()
+            )
+            violation = bool(large) and not allowed
+            violations += violation
+            results.append({
+                "shape": shape,
+                "scenarios": sorted(entry["scenarios"]),
+                "seq_scans": scans,
+                "large_seq_scans": large,
+                "allowed": allowed,
+                "violation": violation,
+                "plan": plan,
+            })
+        conn.rollback()
+    return {"dialect": dialect, "table_rows": sizes, "violations": violations, "queries": results}
+
+
+def run(args) -> dict:
+    dataset = seeding.seed_from_args(args) if not args.no_seed else None
+    headers, ids = _fixtures()
+    shapes, failures = capture_queries(headers, ids)
+    report = audit(shapes, args.min_rows)
+    return {
+        "benchmark": "explain_audit",
+        "dataset": dataset,
+        "min_rows": args.min_rows,
+        "failed_requests": failures,
+        **report,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--min-rows", type=int, default=1000, help="tabel dengan baris sebanyak ini dianggap besar")
+    parser.add_argument("--no-seed", action="store_true", help="pakai data yang sudah ada")
+    parser.add_argument("--output", help="tulis JSON ke file (default stdout)")
+    parser.add_argument("--verbose", action="store_true", help="ikutkan semua query, bukan hanya pelanggaran")
+    seeding.add_arguments(parser)
+    args = parser.parse_args()
+
+    report = run(args)
+    if not args.verbose:
+        report["queries"] = [query for query in report["queries"] if query["violation"]]
+    text = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    sys.exit(1 if report["violations"] or report["failed_requests"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""Load test hot path API pada concurrency tetap, hasil dalam JSON.
+
+Dataset sintetis di-seed dulu (benchmarks/seed.py, deterministik), lalu setiap
+skenario dijalankan `--requests` kali oleh `--concurrency` worker:
+
+- asgi    : in-process lewat httpx.ASGITransport (tanpa socket; overhead app saja)
+- uvicorn : server uvicorn lokal di thread terpisah (termasuk HTTP/socket)
+
+Laporan: throughput (req/s), p50/p95/p99/mean/max latency (ms) dan jumlah
+status per skenario, plus commit git & konfigurasi, supaya bisa dibandingkan
+antar commit. Pakai database terpisah — seed mengosongkan semua tabel data:
+
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.load_test \\
+        --target asgi --target uvicorn --concurrency 16 --requests 500 --output bench.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import socket
+import subprocess
+import threading
+import time
+
+import httpx
+import uvicorn
+
+from app import database, hashing, models, ratelimit
+from app.main import app
+from benchmarks import seed as seeding
+
+SCENARIOS = (
+    "login",
+    "list_projects_admin",
+    "list_projects_dosen",
+    "list_projects_mahasiswa",
+    "list_materials",
+    "assign_project",
+    "create_material",
+)
+# Env yang memengaruhi hasil; ikut dicatat di laporan
+RECORDED_ENV = (
+    "DATABASE_URL", "DB_ASYNC", "RESPONSE_CACHE_ENABLED", "HTTP_CACHE_ENABLED", "COMPRESSION_ENABLED",
+    "METRICS_ENABLED", "QUERY_AUDIT", "LOG_LEVEL", "BCRYPT_ROUNDS", "HASH_POOL_KIND", "HASH_POOL_WORKERS",
+)
+
+
+# --- Statistik ---
+def percentile(sorted_values, p: float) -> float:
+    # nearest-rank
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies, statuses, elapsed: float) -> dict:
+    ms = sorted(value * 1000 for value in latencies)
+    return {
+        "requests": len(ms),
+        "errors": sum(count for status, count in statuses.items() if status >= 400),
+        "status": {str(status): count for status, count in sorted(statuses.items())},
+        "throughput_rps": round(len(ms) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(ms, 50), 2),
+            "p95": round(percentile(ms, 95), 2),
+            "p99": round(percentile(ms, 99), 2),
+            "mean": round(sum(ms) / len(ms), 2) if ms else 0.0,
+            "max": round(ms[-1], 2) if ms else 0.0,
+        },
+    }
+
+
+# --- Skenario ---
+def _unassigned_pairs():
+    # Pasangan (project, mahasiswa) yang belum di-assign, urutan deterministik
+    db = database.SessionLocal()
+    try:
+        assigned = set(db.query(models.ProjectAssignment.project_id, models.ProjectAssignment.user_id))
+        project_ids = [pid for (pid,) in db.query(models.Project.id).order_by(models.Project.id)]
+        student_ids = [
+            uid for (uid,) in
+            db.query(models.User.id).filter(models.User.role == "mahasiswa").order_by(models.User.id)
+        ]
+    finally:
+        db.close()
+    return project_ids, (
+        (pid, uid) for uid in student_ids for pid in project_ids if (pid, uid) not in assigned
+    )
+
+
+class Scenarios:
+    def __init__(self, tokens: dict):
+        self.tokens = tokens
+        self.project_ids, self.pairs = _unassigned_pairs()
+        self.material_seq = itertools.count()
+
+    def headers(self, role: str) -> dict:
+        return {"Authorization": f"Bearer {self.tokens[role]}"}
+
+    def request(self, name: str):
+        # → (method, url, kwargs) untuk satu request skenario
+        if name == "login":
+            return "POST", "/auth/login", {"json": {"email": seeding.email_for("mahasiswa", 0), "password": seeding.BENCH_PASSWORD}}
+        if name.startswith("list_projects_"):
+            return "GET", "/projects/", {"headers": self.headers(name.rsplit("_", 1)[1])}
+        if name == "list_materials":
+            return "GET", "/materials/", {"headers": self.headers("admin")}
+        if name == "assign_project":
+            project_id, user_id = next(self.pairs)
+            return "POST", "/projects/assign", {
+                "json": {"project_id": project_id, "user_id": user_id}, "headers": self.headers("admin"),
+            }
+        if name == "create_material":
+            i = next(self.material_seq)
+            return "POST", "/materials/", {
+                "json": {"project_id": self.project_ids[i % len(self.project_ids)], "title": f"Bench {i}", "content": "isi " * 50},
+                "headers": self.headers("admin"),
+            }
+        raise ValueError(f"Skenario tidak dikenal: {name}")
+
+
+async def login_tokens(client: httpx.AsyncClient) -> dict:
+    tokens = {}
+    for role in ("admin", "dosen", "mahasiswa"):
+        response = await client.post(
+            "/auth/login", json={"email": seeding.email_for(role, 0), "password": seeding.BENCH_PASSWORD}
+        )
+        response.raise_for_status()
+        tokens[role] = response.json()["access_token"]
+    return tokens
+
+
+async def run_scenario(client, scenarios: Scenarios, name: str, requests: int, concurrency: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        method, url, kwargs = scenarios.request(name)
+        await client.request(method, url, **kwargs)
+
+    remaining = itertools.count()
+    latencies, statuses = [], {}
+
+    async def worker():
+        while next(remaining) < requests:
+            method, url, kwargs = scenarios.request(name)
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, statuses, time.perf_counter() - start)
+
+
+async def run_target(client, names, requests: int, concurrency: int, warmup: int) -> dict:
+    scenarios = Scenarios(await login_tokens(client))
+    return {name: await run_scenario(client, scenarios, name, requests, concurrency, warmup) for name in names}
+
+
+# --- Target ---
+class UvicornThread:
+    # uvicorn di thread sendiri (event loop terpisah) pada port bebas
+    def __init__(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("uvicorn gagal start")
+            time.sleep(0.05)
+        return f"http://127.0.0.1:{self.port}"
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+async def run_http(base_url: str, names, requests: int, concurrency: int, warmup: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        return await run_target(client, names, requests, concurrency, warmup)
+
+
+async def run_asgi(names, requests: int, concurrency: int, warmup: int) -> dict:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        return await run_target(client, names, requests, concurrency, warmup)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(args) -> dict:
+    # Semua request datang dari satu IP; rate limit login (in-process) dimatikan
+    # kecuali memang yang mau diukur
+    if not args.keep_rate_limit:
+        ratelimit.RATE_LIMIT_ENABLED = False
+    dataset = seeding.seed_from_args(args) if not args.no_seed else None
+    names = args.scenario or list(SCENARIOS)
+    results = {}
+    try:
+        for target in args.target or ["asgi"]:
+            if target == "asgi":
+                results[target] = asyncio.run(run_asgi(names, args.requests, args.concurrency, args.warmup))
+            elif args.url:
+                results[target] = asyncio.run(run_http(args.url, names, args.requests, args.concurrency, args.warmup))
+            else:
+                with UvicornThread() as base_url:
+                    results[target] = asyncio.run(run_http(base_url, names, args.requests, args.concurrency, args.warmup))
+    finally:
+        hashing.pool.shutdown()
+    return {
+        "benchmark": "load_test",
+        "git_commit": git_commit(),
+        "dataset": dataset,
+        "config": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "rate_limit": ratelimit.RATE_LIMIT_ENABLED,
+            "env": {name: os.environ[name] for name in RECORDED_ENV if name in os.environ},
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", action="append", choices=("asgi", "uvicorn"),
+                        help="bisa diulang; default asgi")
+    parser.add_argument("--url", help="uvicorn: pakai server yang sudah jalan (mis. http://127.0.0.1:8000)")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="bisa diulang; default semua")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="request per skenario")
+    parser.add_argument("--warmup", type=int, default=10, help="request warm-up per skenario (tidak dihitung)")
+    parser.add_argument("--keep-rate-limit", action="store_true", help="jangan matikan rate limit login")
+    parser.add_argument("--no-seed", action="store_true", help="pakai data yang sudah ada")
+    parser.add_argument("--output", help="tulis JSON ke file (default stdout)")
+    seeding.add_arguments(parser)
+    args = parser.parse_args()
+
+    report = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
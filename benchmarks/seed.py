@@ -0,0 +1,124 @@
+"""Seed dataset sintetis untuk benchmark/load test.
+
+Membuat admin, dosen, mahasiswa, project, material dan assignment dengan
+jumlah yang bisa diatur dan RNG ber-seed, jadi dataset sama persis antar
+commit. Semua tabel data DIKOSONGKAN dulu — pakai database terpisah:
+
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.seed --projects 200
+"""
+import argparse
+import json
+import random
+
+from app import database, models, utils
+
+BENCH_PASSWORD = "benchpass"
+BENCH_DOMAIN = "bench.example.com"
+
+
+def email_for(role: str, index: int) -> str:
+    return f"{role}{index}@{BENCH_DOMAIN}"
+
+
+def reset(db):
+    for model in (models.ProjectAssignment, models.Material, models.Project, models.User):
+        db.query(model).delete()
+    db.commit()
+
+
+def seed(
+    db,
+    dosen: int = 10,
+    mahasiswa: int = 200,
+    projects: int = 100,
+    materials_per_project: int = 10,
+    assignments_per_student: int = 3,
+    content_size: int = 400,
+    rng_seed: int = 42,
+) -> dict:
+    rng = random.Random(rng_seed)
+    reset(db)
+    # bcrypt sekali saja; semua akun benchmark memakai password yang sama
+    hashed = utils.hash_password(BENCH_PASSWORD)
+
+    def users(role, count):
+        return [
+            models.User(email=email_for(role, i), full_name=f"{role.title()} {i}", hashed_password=hashed, role=role)
+            for i in range(count)
+        ]
+
+    admins, lecturers, students = users("admin", 1), users("dosen", dosen), users("mahasiswa", mahasiswa)
+    db.add_all(admins + lecturers + students)
+    db.flush()
+
+    owners = lecturers or admins
+    project_rows = [
+        models.Project(title=f"Project {i}", description=f"Deskripsi project {i}", owner_id=rng.choice(owners).id)
+        for i in range(projects)
+    ]
+    db.add_all(project_rows)
+    db.flush()
+
+    words = ("modul", "latihan", "praktikum", "studi", "kasus", "laporan", "rubrik", "referensi")
+    db.add_all([
+        models.Material(
+            project_id=project.id,
+            title=f"Materi {project.id}-{i}",
+            content=" ".join(rng.choice(words) for _ in range(content_size // 8)),
+        )
+        for project in project_rows
+        for i in range(materials_per_project)
+    ])
+
+    assignments = 0
+    for student in students:
+        for project in rng.sample(project_rows, min(assignments_per_student, len(project_rows))):
+            db.add(models.ProjectAssignment(user_id=student.id, project_id=project.id))
+            assignments += 1
+    db.commit()
+
+    return {
+        "users": len(admins) + len(lecturers) + len(students),
+        "projects": projects,
+        "materials": projects * materials_per_project,
+        "assignments": assignments,
+        "rng_seed": rng_seed,
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--dosen", type=int, default=10)
+    parser.add_argument("--mahasiswa", type=int, default=200)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--materials-per-project", type=int, default=10)
+    parser.add_argument("--assignments-per-student", type=int, default=3)
+    parser.add_argument("--content-size", type=int, default=400)
+    parser.add_argument("--rng-seed", type=int, default=42)
+
+
+def seed_from_args(args) -> dict:
+    models.Base.metadata.create_all(bind=database.engine)
+    db = database.SessionLocal()
+    try:
+        return seed(
+            db,
+            dosen=args.dosen,
+            mahasiswa=args.mahasiswa,
+            projects=args.projects,
+            materials_per_project=args.materials_per_project,
+            assignments_per_student=args.assignments_per_student,
+            content_size=args.content_size,
+            rng_seed=args.rng_seed,
+        )
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    print(json.dumps(seed_from_args(parser.parse_args()), indent=2))
+
+
+if __name__ == "__main__":
+    main()